@@ -1,2 +1,10 @@
 from django.contrib import admin
-# Analytics has no custom models requiring admin registration yet.
+from analytics.models import RoomDailyStats
+
+
+@admin.register(RoomDailyStats)
+class RoomDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ("room", "date", "bookings", "no_shows", "checked_in", "booked_seconds", "updated_at")
+    list_filter = ("date",)
+    search_fields = ("room__name",)
+    raw_id_fields = ("room",)
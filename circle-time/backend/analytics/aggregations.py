@@ -0,0 +1,70 @@
+"""
+Aggregation helpers for the analytics views.
+
+Each helper takes an already-filtered Booking queryset and pushes the
+grouping down to the database, so a view issues a fixed number of queries
+regardless of how many rooms or bookings are in range. The Python side
+only reshapes the grouped rows. Per-room/per-day totals live in
+analytics.rollup.
+"""
+from datetime import timedelta
+
+from django.db.models import Count, DateTimeField, DurationField, ExpressionWrapper, F
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay, TruncDate
+
+
+def peak_hours(hour_counts, limit=3):
+    """Return the ``limit`` busiest hours as ``HH:00`` labels, busiest first."""
+    booked = [(h, c) for h, c in hour_counts.items() if c]
+    ranked = sorted(booked, key=lambda x: (-x[1], x[0]))[:limit]
+    return [f"{h:02d}:00" for h, _ in ranked]
+
+
+def weekday_hour_occupancy(bookings, tzinfo=None):
+    """
+    Count bookings occupying each (ISO weekday, hour) cell.
+
+    A booking is counted in every hour it overlaps, not just its start hour,
+    so a 09:30–11:15 meeting lands in the 09, 10 and 11 cells, and one
+    running Friday 14:00 to Monday 10:00 covers every hour in between. The
+    database groups by (weekday, first hour, last hour, days spanned) in a
+    single query and the spans are expanded here.
+
+    Args:
+        bookings: Booking queryset already filtered to the range of interest
+        tzinfo: Timezone used to derive local weekday/hour (defaults to the
+                active Django timezone)
+
+    Returns:
+        dict mapping (iso_weekday, hour) → count, iso_weekday 1=Mon … 7=Sun
+    """
+    # end_time is exclusive: a meeting ending at 11:00 does not occupy hour 11
+    last_instant = ExpressionWrapper(
+        F("end_time") - timedelta(microseconds=1), output_field=DateTimeField()
+    )
+    rows = (
+        bookings
+        .annotate(
+            day=ExtractIsoWeekDay("start_time", tzinfo=tzinfo),
+            first_hour=ExtractHour("start_time", tzinfo=tzinfo),
+            last_hour=ExtractHour(last_instant, tzinfo=tzinfo),
+            days_spanned=ExpressionWrapper(
+                TruncDate(last_instant, tzinfo=tzinfo) - TruncDate("start_time", tzinfo=tzinfo),
+                output_field=DurationField(),
+            ),
+        )
+        .values("day", "first_hour", "last_hour", "days_spanned")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+
+    cells = {}
+    for row in rows:
+        day, first, count = row["day"], row["first_hour"], row["count"]
+        # Hours counted from midnight of the start day; a booking longer than
+        # a week visits the same cells once per week it covers
+        last = row["days_spanned"].days * 24 + row["last_hour"]
+        for offset in range(first, last + 1):
+            cell = ((day - 1 + offset // 24) % 7 + 1, offset % 24)
+            cells[cell] = cells.get(cell, 0) + count
+    return cells
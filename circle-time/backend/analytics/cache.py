@@ -0,0 +1,59 @@
+"""
+Result cache for the analytics endpoints.
+
+Keys combine the endpoint, the resolved date range, the remaining query
+filters and the bookings write generation (bookings.utils). Any booking write
+bumps the generation, so stale entries are never read again and simply age
+out; nothing has to be deleted explicitly.
+
+Ranges that end before today can only change through such a write, so they
+are kept for a long time, but only in a shared cache (Redis). A per-process
+cache (LocMem) never sees generation bumps made by other workers, cron jobs
+or management commands, so there every range gets the short timeout that
+ranges including today always get.
+"""
+import hashlib
+from datetime import date
+from urllib.parse import urlencode
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+
+from bookings.utils import get_bookings_generation
+
+CACHE_PREFIX = "analytics"
+OPEN_RANGE_TIMEOUT = 60  # seconds
+CLOSED_RANGE_TIMEOUT = 60 * 60 * 24 * 7
+DATE_PARAMS = ("startDate", "endDate")
+
+
+def cache_key(endpoint: str, start: date, end: date, params) -> str:
+    """
+    Build the cache key for one analytics request.
+
+    ``start``/``end`` are the parsed (defaulted) dates, so ``?endDate=<today>``
+    and no ``endDate`` at all share an entry. Other query params are sorted so
+    their order doesn't matter.
+    """
+    filters = sorted(
+        (name, value)
+        for name in params
+        if name not in DATE_PARAMS
+        for value in params.getlist(name)
+    )
+    digest = hashlib.sha1(urlencode(filters).encode()).hexdigest()[:16]
+    return f"{CACHE_PREFIX}:{endpoint}:{get_bookings_generation()}:{start}:{end}:{digest}"
+
+
+def shared_cache() -> bool:
+    """Whether the default cache is shared between processes."""
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+
+
+def cache_timeout(end: date) -> int:
+    """Long-lived for closed ranges in a shared cache, short otherwise."""
+    if end < timezone.localdate() and shared_cache():
+        return CLOSED_RANGE_TIMEOUT
+    return OPEN_RANGE_TIMEOUT
@@ -0,0 +1,31 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from analytics.rollup import refresh_room_stats
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Incrementally rebuild the RoomDailyStats rollup used by the analytics "
+        "endpoints. Only days whose bookings changed since the last run, plus "
+        "newly closed days, are recomputed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Discard the rollup and rebuild every closed day from scratch.",
+        )
+
+    def handle(self, *args, **options):
+        days, rows = refresh_room_stats(full=options["full"])
+        if days:
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt {days} day(s) of room stats ({rows} row(s) written)."
+            ))
+        else:
+            self.stdout.write("Room stats already up to date.")
@@ -0,0 +1,51 @@
+# Generated by Django 6.0.2 on 2026-10-16 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('rooms', '0002_building_room_building_ref_floorplan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomStatsWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_refreshed_at', models.DateTimeField(blank=True, null=True)),
+                ('closed_through', models.DateField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Room stats watermark',
+            },
+        ),
+        migrations.CreateModel(
+            name='RoomDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('booked_seconds', models.BigIntegerField(default=0)),
+                ('bookings', models.IntegerField(default=0)),
+                ('no_shows', models.IntegerField(default=0)),
+                ('no_show_seconds', models.BigIntegerField(default=0)),
+                ('checked_in', models.IntegerField(default=0)),
+                ('attendee_sum', models.IntegerField(default=0)),
+                ('oversized', models.IntegerField(default=0)),
+                ('undersized', models.IntegerField(default=0)),
+                ('hour_histogram', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='rooms.room')),
+            ],
+            options={
+                'verbose_name_plural': 'Room daily stats',
+                'ordering': ['date', 'room'],
+                'indexes': [models.Index(fields=['date'], name='analytics_r_date_958cf8_idx')],
+                'unique_together': {('room', 'date')},
+            },
+        ),
+    ]
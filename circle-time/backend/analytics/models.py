@@ -1,3 +1,104 @@
 from django.db import models
-# Analytics uses pre-computed snapshots; the real source of truth is bookings.
-# This model is optional — keep it for future materialized-view optimization.
+# Analytics reads pre-computed daily snapshots for closed days; the real
+# source of truth is still bookings. See analytics.rollup for the refresh logic.
+
+
+class RoomDailyStats(models.Model):
+    """
+    Per-room, per-local-day rollup of booking metrics.
+
+    Rebuilt incrementally by ``python manage.py refresh_room_stats``. Only
+    days strictly before "today" (organisation timezone) are stored; the
+    analytics views aggregate raw Booking rows for anything newer.
+
+    Attributes:
+        room: The room these metrics belong to
+        date: Local calendar date (organisation timezone) of booking start
+        booked_seconds: Sum of booking durations (non-cancelled)
+        bookings: Number of non-cancelled bookings
+        no_shows: Bookings that ended as no_show
+        no_show_seconds: Sum of no-show booking durations
+        checked_in: Bookings that were checked in
+        attendee_sum: Sum of (BookingAttendee rows + 1 organizer) per booking
+        oversized: Bookings using less than half the room's capacity
+        undersized: Bookings with more attendees than the room's capacity
+        hour_histogram: 24 ints — bookings by local start hour
+        capacity: Room capacity the row was computed with; a row whose room
+                  capacity has since changed is re-rolled on the next refresh
+    """
+    room = models.ForeignKey("rooms.Room", on_delete=models.CASCADE, related_name="daily_stats")
+    date = models.DateField()
+    booked_seconds = models.BigIntegerField(default=0)
+    bookings = models.IntegerField(default=0)
+    no_shows = models.IntegerField(default=0)
+    no_show_seconds = models.BigIntegerField(default=0)
+    checked_in = models.IntegerField(default=0)
+    attendee_sum = models.IntegerField(default=0)
+    oversized = models.IntegerField(default=0)
+    undersized = models.IntegerField(default=0)
+    hour_histogram = models.JSONField(default=list)
+    capacity = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["date", "room"]
+        unique_together = ("room", "date")
+        indexes = [
+            models.Index(fields=["date"]),
+        ]
+        verbose_name_plural = "Room daily stats"
+
+    def __str__(self):
+        return f"{self.room_id} @ {self.date}: {self.bookings} booking(s)"
+
+
+class RoomStatsDirtyDay(models.Model):
+    """
+    A booking left a closed day: it was moved to another time or deleted.
+
+    Neither case leaves a row with a fresh ``updated_at`` on the old day, so
+    analytics.signals records the booking's old start here and the next
+    refresh re-rolls that local day, then drops the row.
+
+    Attributes:
+        start_time: Old start of the moved / deleted booking
+    """
+    start_time = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Room stats dirty day"
+
+    def __str__(self):
+        return f"Re-roll day of {self.start_time:%Y-%m-%d %H:%M}"
+
+
+class RoomStatsWatermark(models.Model):
+    """
+    Singleton — tracks how far the RoomDailyStats rollup has been built.
+    Access via RoomStatsWatermark.get().
+
+    Attributes:
+        last_refreshed_at: Start time of the last successful refresh; bookings
+                           with updated_at at or after this are re-rolled next run
+        closed_through: Last local date whose rollup rows are complete
+    """
+    last_refreshed_at = models.DateTimeField(null=True, blank=True)
+    closed_through = models.DateField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Room stats watermark"
+
+    def __str__(self):
+        return f"Room stats closed through {self.closed_through or '—'}"
+
+    def save(self, *args, **kwargs):
+        # Enforce singleton by always using id=1
+        self.pk = 1
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def get(cls):
+        """Singleton accessor — get or create an empty watermark."""
+        obj, _ = cls.objects.get_or_create(id=1)
+        return obj
@@ -0,0 +1,236 @@
+"""
+Vectorised room occupancy over a date range.
+
+Bookings become +1/−1 deltas on a per-room time grid; a cumulative sum gives
+how many bookings hold each room at every slot. Intersecting that with a
+business-hours mask derived from OrganisationSettings yields exact
+utilization (overlapping bookings and out-of-hours time no longer inflate
+it), peak concurrency and idle-stretch statistics.
+
+The grid step is the GCD of every boundary (booking edges clipped to whole
+minutes, business windows), so bookings on a 15-minute grid are evaluated
+on 15-minute slots with no loss of precision. Rooms are processed
+in blocks to keep memory bounded.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from bookings.constants import BookingStatus
+from bookings.models import Booking
+
+# Upper bound on (rooms × slots) cells materialised at once
+BLOCK_CELLS = 8_000_000
+
+
+def business_windows(start, end, org):
+    """
+    Business-hour windows between ``start`` and ``end`` (inclusive dates).
+
+    Returns:
+        list of (window_start, window_end) aware datetimes, one per business day
+    """
+    tz = org.get_tzinfo()
+    open_at, close_at = org.get_business_hours()
+    business_days = set(org.get_business_days())
+    windows = []
+    day = start
+    while day <= end:
+        if day.weekday() in business_days:
+            window_start = datetime.combine(day, open_at, tzinfo=tz)
+            window_end = datetime.combine(day, close_at, tzinfo=tz)
+            if window_end <= window_start:
+                window_end += timedelta(days=1)  # closes after midnight
+            windows.append((window_start, window_end))
+        day += timedelta(days=1)
+    return windows
+
+
+def occupancy_stats(n_rooms, rows, starts, ends, window_starts, window_ends, n_minutes):
+    """
+    Core grid computation on minute offsets from a common origin.
+
+    Only business time is materialised: the grid's columns are the business
+    windows laid end to end, each followed by one closed sentinel column so
+    idle stretches never run from one day's close into the next day's open.
+
+    Args:
+        n_rooms: Number of rooms (rows are 0 … n_rooms-1)
+        rows: int64 array — room row of each booking
+        starts, ends: int64 arrays — booking [start, end) in minutes, clipped
+                      to [0, n_minutes]
+        window_starts, window_ends: int64 arrays — sorted, non-overlapping
+                                    business windows in minutes
+        n_minutes: Length of the range in minutes
+
+    Returns:
+        dict of per-room int64 arrays (``business_minutes`` is a scalar):
+        booked_minutes, peak_concurrency (within business hours),
+        idle_stretches, idle_minutes, longest_idle_minutes, plus
+        ``peak_rooms_in_use`` across all rooms.
+    """
+    booked = np.zeros(n_rooms, dtype=np.int64)
+    peak = np.zeros(n_rooms, dtype=np.int64)
+    stretches = np.zeros(n_rooms, dtype=np.int64)
+    idle = np.zeros(n_rooms, dtype=np.int64)
+    longest = np.zeros(n_rooms, dtype=np.int64)
+    result = {
+        "business_minutes": 0,
+        "booked_minutes": booked,
+        "peak_concurrency": peak,
+        "idle_stretches": stretches,
+        "idle_minutes": idle,
+        "longest_idle_minutes": longest,
+        "peak_rooms_in_use": 0,
+    }
+    if not len(window_starts):
+        return result
+
+    boundaries = np.concatenate([starts, ends, window_starts, window_ends, [n_minutes]])
+    step = int(np.gcd.reduce(boundaries[boundaries > 0]))
+    window_starts, window_ends = window_starts // step, window_ends // step
+    lengths = window_ends - window_starts
+    offsets = np.concatenate([[0], np.cumsum(lengths + 1)])
+    n_cols = int(offsets[-1])
+    business = np.ones(n_cols, dtype=bool)
+    business[offsets[1:] - 1] = False  # sentinels
+    business_cols = int(business.sum())
+
+    def column(t):
+        # Window open at t (or the next one to open), then clamp into it;
+        # anything after the last window maps past the final column.
+        k = np.searchsorted(window_ends, t, side="right")
+        k_safe = np.minimum(k, len(lengths) - 1)
+        into = np.clip(t - window_starts[k_safe], 0, lengths[k_safe])
+        return np.where(k < len(lengths), offsets[k_safe] + into, n_cols)
+
+    keep = ends > starts
+    rows = rows[keep]
+    first, last = column(starts[keep] // step), column(ends[keep] // step)
+    keep = last > first
+    rows, first, last = rows[keep], first[keep], last[keep]
+    rooms_in_use = np.zeros(n_cols, dtype=np.int64)
+
+    width = n_cols + 1
+    block = max(1, BLOCK_CELLS // width)
+    order = np.argsort(rows, kind="stable")
+    rows, first, last = rows[order], first[order], last[order]
+    for lo in range(0, n_rooms, block):
+        hi = min(lo + block, n_rooms)
+        a, b = np.searchsorted(rows, [lo, hi])
+        base = (rows[a:b] - lo) * width
+        cells = (hi - lo) * width
+        deltas = (
+            np.bincount(base + first[a:b], minlength=cells)
+            - np.bincount(base + last[a:b], minlength=cells)
+        ).astype(np.int16).reshape(hi - lo, width)
+        concurrency = np.cumsum(deltas[:, :-1], axis=1, dtype=np.int16)
+        occupied = concurrency > 0
+
+        free = business & ~occupied
+        idle[lo:hi] = np.count_nonzero(free, axis=1)
+        booked[lo:hi] = business_cols - idle[lo:hi]
+        peak[lo:hi] = concurrency.max(axis=1)
+        rooms_in_use += np.count_nonzero(occupied, axis=0)
+
+        # Maximal free stretches: rising and falling edges of the free mask.
+        # Sentinels are never free, so every run ends inside its own row.
+        flat = free.ravel()
+        rising = np.flatnonzero(flat[1:] & ~flat[:-1]) + 1
+        if flat.size and flat[0]:
+            rising = np.concatenate([[0], rising])
+        falling = np.flatnonzero(flat[:-1] & ~flat[1:]) + 1
+        run_rows = rising // n_cols
+        run_lengths = falling - rising
+        stretches[lo:hi] = np.bincount(run_rows, minlength=hi - lo)
+        np.maximum.at(longest, run_rows + lo, run_lengths)
+
+    result.update({
+        "business_minutes": business_cols * step,
+        "booked_minutes": booked * step,
+        "idle_minutes": idle * step,
+        "longest_idle_minutes": longest * step,
+        "peak_rooms_in_use": int(rooms_in_use.max()),
+    })
+    return result
+
+
+def room_occupancy(start, end, rooms, org):
+    """
+    Business-hours occupancy per room for ``start`` … ``end`` (inclusive dates).
+
+    Bookings are clipped to the range, so a meeting running across the range
+    edge only counts its in-range part. Cancelled bookings are ignored.
+
+    Args:
+        start, end: Date range (organisation-local calendar days)
+        rooms: Iterable of Room instances
+        org: OrganisationSettings (business days, hours, timezone)
+
+    Returns:
+        (per_room, summary) — per_room maps room_id → dict with
+        businessMinutes, bookedMinutes, utilization (%), peakConcurrency,
+        idleStretches, averageIdleMinutes, longestIdleMinutes; summary holds
+        businessMinutes, bookedMinutes, utilization and peakRoomsInUse across
+        all rooms.
+    """
+    tz = org.get_tzinfo()
+    room_ids = [room.id for room in rooms]
+    row_of = {room_id: i for i, room_id in enumerate(room_ids)}
+    origin = datetime.combine(start, datetime.min.time(), tzinfo=tz)
+    stop = datetime.combine(end + timedelta(days=1), datetime.min.time(), tzinfo=tz)
+    # Same-tzinfo datetime subtraction ignores DST shifts; timestamps don't
+    base = origin.timestamp()
+    n_minutes = int(stop.timestamp() - base) // 60
+
+    spans = (
+        Booking.objects
+        .filter(room_id__in=room_ids, start_time__lt=stop, end_time__gt=origin)
+        .exclude(status=BookingStatus.CANCELLED.value)
+        .order_by("room_id")
+        .values_list("room_id", "start_time", "end_time")
+        .iterator()
+    )
+    rows, starts, ends = [], [], []
+    for room_id, booking_start, booking_end in spans:
+        rows.append(row_of[room_id])
+        starts.append(booking_start.timestamp() - base)
+        ends.append(booking_end.timestamp() - base)
+    # Partial minutes count as occupied: floor the start, ceil the end
+    starts = np.clip(np.floor(np.array(starts, dtype=np.float64) / 60), 0, n_minutes).astype(np.int64)
+    ends = np.clip(np.ceil(np.array(ends, dtype=np.float64) / 60), 0, n_minutes).astype(np.int64)
+
+    windows = business_windows(start, end, org)
+    window_starts = np.array([int(ws.timestamp() - base) // 60 for ws, _ in windows], dtype=np.int64)
+    window_ends = np.array([int(we.timestamp() - base) // 60 for _, we in windows], dtype=np.int64)
+    window_ends = np.minimum(window_ends, n_minutes)
+
+    stats = occupancy_stats(
+        len(room_ids), np.array(rows, dtype=np.int64), starts, ends,
+        window_starts, window_ends, n_minutes,
+    )
+
+    business_minutes = stats["business_minutes"]
+    per_room = {}
+    for i, room_id in enumerate(room_ids):
+        booked = int(stats["booked_minutes"][i])
+        stretches = int(stats["idle_stretches"][i])
+        per_room[room_id] = {
+            "businessMinutes": business_minutes,
+            "bookedMinutes": booked,
+            "utilization": round(booked / business_minutes * 100, 1) if business_minutes else 0,
+            "peakConcurrency": int(stats["peak_concurrency"][i]),
+            "idleStretches": stretches,
+            "averageIdleMinutes": round(int(stats["idle_minutes"][i]) / stretches, 1) if stretches else 0,
+            "longestIdleMinutes": int(stats["longest_idle_minutes"][i]),
+        }
+
+    total_business = business_minutes * len(room_ids)
+    total_booked = int(stats["booked_minutes"].sum())
+    summary = {
+        "businessMinutes": total_business,
+        "bookedMinutes": total_booked,
+        "utilization": round(total_booked / total_business * 100, 1) if total_business else 0,
+        "peakRoomsInUse": stats["peak_rooms_in_use"],
+    }
+    return per_room, summary
@@ -0,0 +1,392 @@
+"""
+Daily room statistics rollup.
+
+Closed days (before today in the organisation timezone) are served from
+RoomDailyStats rows; today and later are aggregated from raw Booking rows
+on demand. ``refresh_room_stats`` keeps the rollup current by rebuilding
+only the days that changed since the previous run: days with a booking
+whose ``Booking.updated_at`` moved on, days a booking was moved off or
+deleted from (RoomStatsDirtyDay, see analytics.signals), and days whose
+rows were computed with a since-changed room capacity.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import (
+    Count,
+    DateField,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import Coalesce, ExtractHour, Trunc, TruncDate
+from django.utils import timezone
+
+from analytics.models import RoomDailyStats, RoomStatsDirtyDay, RoomStatsWatermark
+from bookings.constants import BookingStatus
+from bookings.models import Booking, BookingAttendee
+from organisation.models import OrganisationSettings
+from rooms.models import Room
+
+# Additive integer metrics shared by RoomDailyStats and the raw aggregation
+STAT_FIELDS = (
+    "booked_seconds",
+    "bookings",
+    "no_shows",
+    "no_show_seconds",
+    "checked_in",
+    "attendee_sum",
+    "oversized",
+    "undersized",
+)
+
+# Largest date span rebuilt in one pass, to bound memory on full rebuilds
+REBUILD_CHUNK_DAYS = 31
+
+# Supported trend granularities (Trunc kinds)
+PERIOD_KINDS = ("day", "week", "month")
+
+
+# ---------------------------------------------------------------------------
+# Stats dictionaries
+# ---------------------------------------------------------------------------
+
+def empty_stats():
+    """A zeroed stats dict: every STAT_FIELDS key plus a 24-slot hour histogram."""
+    stats = {field: 0 for field in STAT_FIELDS}
+    stats["hour_histogram"] = [0] * 24
+    return stats
+
+
+def merge_stats(into, other):
+    """Add ``other`` (stats dict or RoomDailyStats values) into ``into`` in place."""
+    for field in STAT_FIELDS:
+        into[field] += other[field]
+    for hour, count in enumerate(other["hour_histogram"] or []):
+        into["hour_histogram"][hour] += count
+    return into
+
+
+# ---------------------------------------------------------------------------
+# Raw aggregation
+# ---------------------------------------------------------------------------
+
+def _day_start(day, tz):
+    return datetime.combine(day, time.min, tzinfo=tz)
+
+
+def bookings_between(start, end, tz):
+    """Non-cancelled bookings whose local start date is within start..end (inclusive)."""
+    return Booking.objects.filter(
+        start_time__gte=_day_start(start, tz),
+        start_time__lt=_day_start(end + timedelta(days=1), tz),
+    ).exclude(status=BookingStatus.CANCELLED.value)
+
+
+def _headcount():
+    """Per-booking headcount (BookingAttendee rows + 1 organizer) as a correlated subquery."""
+    attendees = (
+        BookingAttendee.objects
+        .filter(booking=OuterRef("pk"))
+        .order_by()
+        .values("booking")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return Coalesce(Subquery(attendees, output_field=IntegerField()), 0) + 1
+
+
+def aggregate_daily(bookings, tz):
+    """
+    Aggregate a Booking queryset into per-(room, local date) stats dicts.
+
+    Runs a single ``GROUP BY room_id, local date, local hour`` query. Attendee
+    counts and the oversized/undersized buckets are computed in SQL with
+    conditional aggregation, so no Booking rows are loaded.
+
+    Returns:
+        dict mapping (room_id, date) → stats dict (see empty_stats)
+    """
+    duration = ExpressionWrapper(F("end_time") - F("start_time"), output_field=DurationField())
+    no_show = Q(status=BookingStatus.NO_SHOW.value)
+    rows = (
+        bookings
+        .annotate(
+            headcount=_headcount(),
+            day=TruncDate("start_time", tzinfo=tz),
+            hour=ExtractHour("start_time", tzinfo=tz),
+        )
+        .values("room_id", "day", "hour")
+        .annotate(
+            booked=Sum(duration),
+            count=Count("id"),
+            no_shows=Count("id", filter=no_show),
+            no_show_booked=Sum(duration, filter=no_show),
+            checked_in_count=Count("id", filter=Q(checked_in=True)),
+            attendee_sum=Sum("headcount"),
+            oversized=Count("id", filter=Q(headcount__lt=F("room__capacity") * 0.5)),
+            undersized=Count("id", filter=Q(headcount__gt=F("room__capacity"))),
+        )
+        .order_by()
+    )
+
+    buckets = {}
+    for row in rows:
+        stats = buckets.get((row["room_id"], row["day"]))
+        if stats is None:
+            stats = buckets[(row["room_id"], row["day"])] = empty_stats()
+        stats["booked_seconds"] += row["booked"].total_seconds() if row["booked"] else 0
+        stats["bookings"] += row["count"]
+        stats["no_shows"] += row["no_shows"]
+        stats["no_show_seconds"] += row["no_show_booked"].total_seconds() if row["no_show_booked"] else 0
+        stats["checked_in"] += row["checked_in_count"]
+        stats["attendee_sum"] += row["attendee_sum"] or 0
+        stats["oversized"] += row["oversized"]
+        stats["undersized"] += row["undersized"]
+        stats["hour_histogram"][row["hour"]] += row["count"]
+    return buckets
+
+
+# ---------------------------------------------------------------------------
+# Reading: rollup for closed days, raw rows for the rest
+# ---------------------------------------------------------------------------
+
+def _closed_until(tz):
+    """First local date NOT covered by the rollup (None when it was never built)."""
+    closed_through = (
+        RoomStatsWatermark.objects.filter(id=1)
+        .values_list("closed_through", flat=True)
+        .first()
+    )
+    if closed_through is None:
+        return None
+    today = timezone.now().astimezone(tz).date()
+    return min(closed_through + timedelta(days=1), today)
+
+
+def _split_range(start, end):
+    """Return (tz, raw_from): dates before raw_from are served from the rollup."""
+    tz = OrganisationSettings.get().get_tzinfo()
+    closed_until = _closed_until(tz)
+    raw_from = start if closed_until is None else max(start, closed_until)
+    return tz, raw_from
+
+
+def _iter_stats(start, end, rooms=None):
+    """
+    Yield (room_id, date, stats) for start..end, reading the rollup for closed
+    days and aggregating raw bookings for the remainder.
+    """
+    tz, raw_from = _split_range(start, end)
+
+    if raw_from > start:
+        rollup = RoomDailyStats.objects.filter(
+            date__gte=start, date__lte=min(end, raw_from - timedelta(days=1)),
+        )
+        if rooms is not None:
+            rollup = rollup.filter(room__in=rooms)
+        for row in rollup.values("room_id", "date", "hour_histogram", *STAT_FIELDS).order_by():
+            yield row["room_id"], row["date"], row
+
+    if raw_from <= end:
+        raw = bookings_between(raw_from, end, tz)
+        if rooms is not None:
+            raw = raw.filter(room__in=rooms)
+        for (room_id, day), stats in aggregate_daily(raw, tz).items():
+            yield room_id, day, stats
+
+
+def collect_room_stats(start, end, rooms=None):
+    """
+    Per-room stats for local dates start..end (inclusive).
+
+    Args:
+        start, end: date bounds (inclusive)
+        rooms: Optional Room queryset / id list to restrict to
+
+    Returns:
+        dict mapping room_id → stats dict. Rooms without bookings are absent.
+    """
+    totals = {}
+    for room_id, _day, stats in _iter_stats(start, end, rooms):
+        merge_stats(totals.setdefault(room_id, empty_stats()), stats)
+    return totals
+
+
+def period_start(day, kind):
+    """First date of the day/week (Monday)/month period containing ``day``."""
+    if kind == "week":
+        return day - timedelta(days=day.weekday())
+    if kind == "month":
+        return day.replace(day=1)
+    return day
+
+
+def collect_period_stats(start, end, kind="day"):
+    """
+    Booked seconds, bookings and no-shows per day/week/month across all rooms.
+
+    One ``GROUP BY Trunc(kind)`` query over the rollup for closed days and
+    one over raw bookings for the rest; periods without bookings are absent.
+
+    Returns:
+        dict mapping period start date → {"booked_seconds", "bookings", "no_shows"}
+    """
+    tz, raw_from = _split_range(start, end)
+    totals = {}
+
+    def _add(period, booked_seconds, bookings, no_shows):
+        entry = totals.setdefault(period, {"booked_seconds": 0, "bookings": 0, "no_shows": 0})
+        entry["booked_seconds"] += booked_seconds or 0
+        entry["bookings"] += bookings
+        entry["no_shows"] += no_shows or 0
+
+    if raw_from > start:
+        rows = (
+            RoomDailyStats.objects
+            .filter(date__gte=start, date__lte=min(end, raw_from - timedelta(days=1)))
+            .annotate(period=Trunc("date", kind, output_field=DateField()))
+            .values("period")
+            .annotate(seconds=Sum("booked_seconds"), count=Sum("bookings"), no_shows=Sum("no_shows"))
+            .order_by()
+        )
+        for row in rows:
+            _add(row["period"], row["seconds"], row["count"], row["no_shows"])
+
+    if raw_from <= end:
+        rows = (
+            bookings_between(raw_from, end, tz)
+            .annotate(period=Trunc("start_time", kind, output_field=DateField(), tzinfo=tz))
+            .values("period")
+            .annotate(
+                booked=Sum(ExpressionWrapper(F("end_time") - F("start_time"), output_field=DurationField())),
+                count=Count("id"),
+                no_shows=Count("id", filter=Q(status=BookingStatus.NO_SHOW.value)),
+            )
+            .order_by()
+        )
+        for row in rows:
+            seconds = row["booked"].total_seconds() if row["booked"] is not None else 0
+            _add(row["period"], seconds, row["count"], row["no_shows"])
+
+    return totals
+
+
+# ---------------------------------------------------------------------------
+# Writing: incremental refresh
+# ---------------------------------------------------------------------------
+
+def _date_runs(dates):
+    """Collapse a set of dates into sorted (first, last) runs of at most REBUILD_CHUNK_DAYS."""
+    runs = []
+    for day in sorted(dates):
+        if runs and day - runs[-1][1] == timedelta(days=1) \
+                and (day - runs[-1][0]).days < REBUILD_CHUNK_DAYS:
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(run) for run in runs]
+
+
+def _rebuild_days(first, last, tz):
+    """Replace RoomDailyStats rows for first..last with freshly aggregated ones."""
+    # Read before aggregating: a capacity change landing in between leaves a
+    # mismatch that the next refresh picks up
+    capacities = dict(Room.objects.values_list("id", "capacity"))
+    buckets = aggregate_daily(bookings_between(first, last, tz), tz)
+    rows = [
+        RoomDailyStats(
+            room_id=room_id,
+            date=day,
+            booked_seconds=round(stats["booked_seconds"]),
+            bookings=stats["bookings"],
+            no_shows=stats["no_shows"],
+            no_show_seconds=round(stats["no_show_seconds"]),
+            checked_in=stats["checked_in"],
+            attendee_sum=stats["attendee_sum"],
+            oversized=stats["oversized"],
+            undersized=stats["undersized"],
+            hour_histogram=stats["hour_histogram"],
+            capacity=capacities.get(room_id, 0),
+        )
+        for (room_id, day), stats in buckets.items()
+    ]
+    with transaction.atomic():
+        RoomDailyStats.objects.filter(date__gte=first, date__lte=last).delete()
+        RoomDailyStats.objects.bulk_create(rows)
+    return len(rows)
+
+
+def refresh_room_stats(full=False):
+    """
+    Bring RoomDailyStats up to date with every closed day (before today).
+
+    Incremental runs rebuild:
+      - days whose bookings changed (``updated_at``) since the last run,
+      - days a booking was moved off or deleted from (RoomStatsDirtyDay),
+      - days rolled up with a room capacity that has since changed, and
+      - days that have closed since the last run.
+    A full run (or the very first one) rebuilds every day that has bookings.
+
+    Returns:
+        tuple (days_rebuilt, rows_written)
+    """
+    tz = OrganisationSettings.get().get_tzinfo()
+    started_at = timezone.now()
+    today = started_at.astimezone(tz).date()
+    watermark = RoomStatsWatermark.get()
+
+    dates = set()
+    dirty = list(RoomStatsDirtyDay.objects.values_list("id", "start_time"))
+    if full or watermark.closed_through is None or watermark.last_refreshed_at is None:
+        first_start = Booking.objects.order_by("start_time").values_list("start_time", flat=True).first()
+        if first_start is not None:
+            first_day = first_start.astimezone(tz).date()
+            dates = {first_day + timedelta(days=n) for n in range((today - first_day).days)}
+        RoomDailyStats.objects.all().delete()
+    else:
+        # Closed days whose bookings changed since the last run
+        touched = (
+            Booking.objects.filter(
+                updated_at__gte=watermark.last_refreshed_at,
+                start_time__lt=_day_start(watermark.closed_through + timedelta(days=1), tz),
+            )
+            .annotate(day=TruncDate("start_time", tzinfo=tz))
+            .values_list("day", flat=True)
+            .distinct()
+            .order_by()
+        )
+        dates.update(touched)
+        # Closed days a booking left (moved or deleted) since the last run
+        dates.update(
+            day for day in (start.astimezone(tz).date() for _id, start in dirty)
+            if day <= watermark.closed_through
+        )
+        # Closed days rolled up before their room's capacity changed
+        dates.update(
+            RoomDailyStats.objects.exclude(capacity=F("room__capacity"))
+            .values_list("date", flat=True)
+            .distinct()
+            .order_by()
+        )
+        # Days that have closed since the last run
+        day = watermark.closed_through + timedelta(days=1)
+        while day < today:
+            dates.add(day)
+            day += timedelta(days=1)
+
+    rows_written = 0
+    for first, last in _date_runs(dates):
+        rows_written += _rebuild_days(first, last, tz)
+    # Only the rows read above: ones recorded meanwhile wait for the next run
+    RoomStatsDirtyDay.objects.filter(id__in=[dirty_id for dirty_id, _start in dirty]).delete()
+
+    watermark.last_refreshed_at = started_at
+    watermark.closed_through = today - timedelta(days=1)
+    watermark.save()
+    return len(dates), rows_written
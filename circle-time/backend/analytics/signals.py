@@ -0,0 +1,33 @@
+"""
+Analytics model signal receivers.
+
+The rollup refresh (analytics.rollup) finds changed days through
+``Booking.updated_at``, which can't see a booking that left a closed day:
+moved to another time, or deleted (directly, with its series, or by
+cascade). These receivers record the old start in RoomStatsDirtyDay so the
+next refresh re-rolls that day. Bookings that started after "now" are
+skipped; their day isn't closed, so it is rolled up when it closes.
+"""
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from analytics.models import RoomStatsDirtyDay
+from bookings.models import Booking
+
+
+@receiver(pre_save, sender=Booking)
+def _booking_moving(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or (update_fields is not None and "start_time" not in update_fields):
+        return
+    old_start = (
+        Booking.objects.filter(pk=instance.pk).values_list("start_time", flat=True).first()
+    )
+    if old_start is not None and old_start != instance.start_time and old_start < timezone.now():
+        RoomStatsDirtyDay.objects.create(start_time=old_start)
+
+
+@receiver(post_delete, sender=Booking)
+def _booking_deleted(sender, instance, **kwargs):
+    if instance.start_time < timezone.now():
+        RoomStatsDirtyDay.objects.create(start_time=instance.start_time)
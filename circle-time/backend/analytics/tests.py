@@ -0,0 +1,326 @@
+import random
+from datetime import datetime, timedelta
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from analytics.aggregations import weekday_hour_occupancy
+from analytics.cache import CLOSED_RANGE_TIMEOUT, OPEN_RANGE_TIMEOUT, cache_timeout
+from analytics.models import RoomDailyStats, RoomStatsDirtyDay
+from analytics.occupancy import occupancy_stats
+from analytics.rollup import aggregate_daily, bookings_between, refresh_room_stats
+from bookings.models import Booking
+from organisation.models import OrganisationSettings
+from rooms.models import Room
+
+
+class AnalyticsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        OrganisationSettings.get()
+        self.admin = User.objects.create_user(email="admin@example.com", password="x", role="admin")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_rooms(self, count, bookings_per_room=2):
+        """Create ``count`` rooms, each with bookings on the previous days."""
+        start = timezone.now().replace(minute=0, second=0, microsecond=0)
+        offset = Room.objects.count()
+        for n in range(count):
+            room = Room.objects.create(name=f"Room {offset + n}", building="HQ", floor=1, capacity=6)
+            for day in range(1, bookings_per_room + 1):
+                begins = start - timedelta(days=day)
+                Booking.objects.create(
+                    room=room, title="Sync", organizer=self.admin,
+                    start_time=begins, end_time=begins + timedelta(hours=1),
+                )
+
+
+class UtilizationQueryCountTests(AnalyticsTestCase):
+    def _count_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/analytics/utilization")
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.data["data"]
+
+    def test_query_count_independent_of_room_count(self):
+        self.add_rooms(3)
+        baseline, data = self._count_queries()
+        self.assertEqual(len(data), 3)
+
+        self.add_rooms(27)
+        cache.clear()
+        with self.assertNumQueries(baseline):
+            response = self.client.get("/api/analytics/utilization")
+        self.assertEqual(len(response.data["data"]), 30)
+        self.assertTrue(all(room["totalBookings"] == 2 for room in response.data["data"]))
+
+
+class WeekdayHourOccupancyTests(AnalyticsTestCase):
+    tz = ZoneInfo("Africa/Johannesburg")
+
+    def book(self, start, end):
+        room = Room.objects.create(name=f"Room {start}", building="HQ", floor=1, capacity=6)
+        Booking.objects.create(room=room, title="Sync", organizer=self.admin, start_time=start, end_time=end)
+
+    def cells(self):
+        return weekday_hour_occupancy(Booking.objects.all(), tzinfo=self.tz)
+
+    def test_counts_every_overlapped_hour(self):
+        # Wednesday 09:30–11:00: end is exclusive, hour 11 is not occupied
+        self.book(datetime(2026, 10, 14, 9, 30, tzinfo=self.tz), datetime(2026, 10, 14, 11, tzinfo=self.tz))
+        self.assertEqual(self.cells(), {(3, 9): 1, (3, 10): 1})
+
+    def test_wraps_past_midnight(self):
+        # Sunday 23:00 – Monday 01:00
+        self.book(datetime(2026, 10, 11, 23, tzinfo=self.tz), datetime(2026, 10, 12, 1, tzinfo=self.tz))
+        self.assertEqual(self.cells(), {(7, 23): 1, (1, 0): 1})
+
+    def test_multi_day_booking_covers_every_hour(self):
+        # Friday 14:00 – Monday 10:00
+        self.book(datetime(2026, 10, 9, 14, tzinfo=self.tz), datetime(2026, 10, 12, 10, tzinfo=self.tz))
+        expected = {(5, hour): 1 for hour in range(14, 24)}
+        expected.update({(day, hour): 1 for day in (6, 7) for hour in range(24)})
+        expected.update({(1, hour): 1 for hour in range(10)})
+        self.assertEqual(self.cells(), expected)
+
+    def test_booking_longer_than_a_week_counts_each_week(self):
+        # Monday 00:00 – the next Monday 12:00
+        self.book(datetime(2026, 10, 5, tzinfo=self.tz), datetime(2026, 10, 12, 12, tzinfo=self.tz))
+        cells = self.cells()
+        self.assertEqual(cells[(1, 11)], 2)
+        self.assertEqual(cells[(1, 12)], 1)
+        self.assertEqual(cells[(2, 0)], 1)
+        self.assertEqual(cells[(7, 23)], 1)
+
+
+class RefreshRoomStatsTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tz = OrganisationSettings.get().get_tzinfo()
+        self.today = timezone.now().astimezone(self.tz).date()
+        self.room = Room.objects.create(name="Boardroom", building="HQ", floor=1, capacity=6)
+
+    def at(self, days_ago, hour):
+        day = self.today - timedelta(days=days_ago)
+        return datetime(day.year, day.month, day.day, hour, tzinfo=self.tz)
+
+    def book(self, days_ago, hour=9):
+        start = self.at(days_ago, hour)
+        return Booking.objects.create(
+            room=self.room, title="Sync", organizer=self.admin,
+            start_time=start, end_time=start + timedelta(hours=1),
+        )
+
+    def stored(self):
+        return {
+            row.date: (row.bookings, row.oversized)
+            for row in RoomDailyStats.objects.filter(room=self.room)
+        }
+
+    def assertMatchesRaw(self):
+        first = self.today - timedelta(days=10)
+        raw = aggregate_daily(bookings_between(first, self.today - timedelta(days=1), self.tz), self.tz)
+        self.assertEqual(
+            self.stored(),
+            {day: (stats["bookings"], stats["oversized"]) for (_room, day), stats in raw.items()},
+        )
+
+    def test_first_run_rolls_up_closed_days_only(self):
+        self.book(3)
+        self.book(1)
+        self.book(0, hour=0)
+        refresh_room_stats()
+        self.assertEqual(set(self.stored()), {self.today - timedelta(days=3), self.today - timedelta(days=1)})
+        self.assertMatchesRaw()
+
+    def test_edited_booking_is_rerolled(self):
+        booking = self.book(2)
+        refresh_room_stats()
+        booking.status = "cancelled"
+        booking.save()
+        refresh_room_stats()
+        self.assertEqual(self.stored(), {})
+
+    def test_booking_moved_off_a_day_rerolls_the_old_day(self):
+        booking = self.book(4)
+        refresh_room_stats()
+        booking.start_time = self.at(2, 9)
+        booking.end_time = self.at(2, 10)
+        booking.save()
+        refresh_room_stats()
+        self.assertEqual(set(self.stored()), {self.today - timedelta(days=2)})
+        self.assertMatchesRaw()
+        self.assertFalse(RoomStatsDirtyDay.objects.exists())
+
+    def test_deleted_booking_rerolls_its_day(self):
+        self.book(2)
+        deleted = self.book(2, hour=14)
+        refresh_room_stats()
+        self.assertEqual(self.stored()[self.today - timedelta(days=2)], (2, 2))
+        deleted.delete()
+        refresh_room_stats()
+        self.assertEqual(self.stored(), {self.today - timedelta(days=2): (1, 1)})
+
+    def test_deleting_the_room_bookings_by_queryset_rerolls_their_days(self):
+        self.book(2)
+        refresh_room_stats()
+        Booking.objects.filter(room=self.room).delete()
+        refresh_room_stats()
+        self.assertEqual(self.stored(), {})
+
+    def test_room_capacity_change_rerolls_capacity_buckets(self):
+        self.book(2)
+        refresh_room_stats()
+        self.assertEqual(self.stored(), {self.today - timedelta(days=2): (1, 1)})
+        # One person in a room for two is no longer oversized
+        self.room.capacity = 2
+        self.room.save()
+        refresh_room_stats()
+        self.assertEqual(self.stored(), {self.today - timedelta(days=2): (1, 0)})
+
+    def test_future_bookings_leave_no_dirty_days(self):
+        booking = self.book(-2)
+        booking.start_time = self.at(-3, 9)
+        booking.end_time = self.at(-3, 10)
+        booking.save()
+        booking.delete()
+        self.assertFalse(RoomStatsDirtyDay.objects.exists())
+
+    def test_unchanged_run_rebuilds_nothing(self):
+        self.book(2)
+        refresh_room_stats()
+        self.assertEqual(refresh_room_stats(), (0, 0))
+
+
+class CacheTimeoutTests(TestCase):
+    def test_open_range_is_short_lived(self):
+        self.assertEqual(cache_timeout(timezone.localdate()), OPEN_RANGE_TIMEOUT)
+
+    def test_closed_range_is_short_lived_in_a_per_process_cache(self):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        self.assertEqual(cache_timeout(yesterday), OPEN_RANGE_TIMEOUT)
+
+    @override_settings(CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379/0",
+    }})
+    def test_closed_range_is_long_lived_in_a_shared_cache(self):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        self.assertEqual(cache_timeout(yesterday), CLOSED_RANGE_TIMEOUT)
+
+
+def _occupancy_by_minute(n_rooms, bookings, windows):
+    """Reference for occupancy_stats: walk every business minute of every room."""
+    stats = {
+        "booked": [0] * n_rooms, "peak": [0] * n_rooms, "stretches": [0] * n_rooms,
+        "idle": [0] * n_rooms, "longest": [0] * n_rooms, "peak_rooms_in_use": 0,
+    }
+    for window_start, window_end in windows:
+        for minute in range(window_start, window_end):
+            in_use = 0
+            for room in range(n_rooms):
+                held = sum(1 for r, s, e in bookings if r == room and s <= minute < e)
+                stats["peak"][room] = max(stats["peak"][room], held)
+                if held:
+                    stats["booked"][room] += 1
+                    in_use += 1
+                else:
+                    stats["idle"][room] += 1
+            stats["peak_rooms_in_use"] = max(stats["peak_rooms_in_use"], in_use)
+    for room in range(n_rooms):
+        for window_start, window_end in windows:
+            run = 0
+            for minute in range(window_start, window_end + 1):
+                free = minute < window_end and not any(
+                    r == room and s <= minute < e for r, s, e in bookings
+                )
+                if free:
+                    run += 1
+                elif run:
+                    stats["stretches"][room] += 1
+                    stats["longest"][room] = max(stats["longest"][room], run)
+                    run = 0
+    return stats
+
+
+class OccupancyStatsTests(SimpleTestCase):
+    # Two days, open 08:00–17:00
+    n_minutes = 2 * 24 * 60
+    windows = [(8 * 60, 17 * 60), (32 * 60, 41 * 60)]
+
+    def compute(self, n_rooms, bookings, windows=None):
+        windows = self.windows if windows is None else windows
+        columns = list(zip(*bookings)) or [(), (), ()]
+        rows, starts, ends = (np.array(column, dtype=np.int64) for column in columns)
+        return occupancy_stats(
+            n_rooms, rows, starts, ends,
+            np.array([w[0] for w in windows], dtype=np.int64),
+            np.array([w[1] for w in windows], dtype=np.int64),
+            self.n_minutes,
+        )
+
+    def assertMatchesReference(self, n_rooms, bookings):
+        result = self.compute(n_rooms, bookings)
+        expected = _occupancy_by_minute(n_rooms, bookings, self.windows)
+        self.assertEqual(result["business_minutes"], sum(e - s for s, e in self.windows))
+        self.assertEqual(result["booked_minutes"].tolist(), expected["booked"])
+        self.assertEqual(result["peak_concurrency"].tolist(), expected["peak"])
+        self.assertEqual(result["idle_stretches"].tolist(), expected["stretches"])
+        self.assertEqual(result["idle_minutes"].tolist(), expected["idle"])
+        self.assertEqual(result["longest_idle_minutes"].tolist(), expected["longest"])
+        self.assertEqual(result["peak_rooms_in_use"], expected["peak_rooms_in_use"])
+
+    def test_no_bookings(self):
+        result = self.compute(2, [])
+        self.assertEqual(result["booked_minutes"].tolist(), [0, 0])
+        self.assertEqual(result["idle_stretches"].tolist(), [2, 2])
+        self.assertEqual(result["longest_idle_minutes"].tolist(), [540, 540])
+
+    def test_no_business_windows(self):
+        result = self.compute(1, [(0, 9 * 60, 10 * 60)], windows=[])
+        self.assertEqual(result["business_minutes"], 0)
+        self.assertEqual(result["booked_minutes"].tolist(), [0])
+
+    def test_overlapping_bookings_count_once_towards_booked_time(self):
+        # 09:00–11:00 and 10:00–12:00 on day one
+        result = self.compute(1, [(0, 540, 660), (0, 600, 720)])
+        self.assertEqual(result["booked_minutes"].tolist(), [180])
+        self.assertEqual(result["peak_concurrency"].tolist(), [2])
+
+    def test_out_of_hours_time_is_ignored(self):
+        # 06:00–09:00 and 16:00–19:00: one business hour each
+        result = self.compute(1, [(0, 360, 540), (0, 960, 1140)])
+        self.assertEqual(result["booked_minutes"].tolist(), [120])
+        self.assertEqual(result["idle_stretches"].tolist(), [2])
+
+    def test_idle_stretches_stop_at_closing_time(self):
+        # Booked until day one closes: day two is one separate stretch
+        result = self.compute(1, [(0, 480, 1020)])
+        self.assertEqual(result["idle_stretches"].tolist(), [1])
+        self.assertEqual(result["longest_idle_minutes"].tolist(), [540])
+
+    def test_matches_minute_by_minute_reference(self):
+        rng = random.Random(20261017)
+        for _ in range(20):
+            n_rooms = rng.randint(1, 4)
+            bookings = []
+            for _ in range(rng.randint(0, 12)):
+                start = rng.randrange(0, self.n_minutes - 1)
+                bookings.append((rng.randrange(n_rooms), start, min(self.n_minutes, start + rng.randint(1, 600))))
+            self.assertMatchesReference(n_rooms, bookings)
+
+    def test_rooms_are_processed_in_blocks(self):
+        bookings = [(room, 500 + 7 * room, 700 + 11 * room) for room in range(6)]
+        with mock.patch("analytics.occupancy.BLOCK_CELLS", 2000):
+            self.assertMatchesReference(6, bookings)
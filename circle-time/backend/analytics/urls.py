@@ -8,6 +8,7 @@ from analytics.views import (
     heatmap_view,
     room_compare_view,
     trends_view,
+    dashboard_view,
     export_view,
 )
 
@@ -20,5 +21,6 @@ urlpatterns = [
     path("heatmap", heatmap_view, name="analytics-heatmap"),
     path("rooms/compare", room_compare_view, name="analytics-rooms-compare"),
     path("trends", trends_view, name="analytics-trends"),
+    path("dashboard", dashboard_view, name="analytics-dashboard"),
     path("export", export_view, name="analytics-export"),
 ]
@@ -3,9 +3,14 @@ Analytics views — compute aggregated metrics from booking data.
 
 All endpoints accept `startDate` and `endDate` query params (YYYY-MM-DD).
 Returns data matching the web frontend's analytics type definitions.
+
+Per-room metrics are read through analytics.rollup: closed days come from the
+RoomDailyStats table, today (and anything not yet rolled up) from raw bookings.
 """
 from datetime import datetime, timedelta
-from django.db.models import Count, Avg, Sum, Q, F
+from functools import wraps
+from django.core.cache import cache
+from django.db.models import Count, Q
 from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -14,12 +19,27 @@ from rest_framework import status
 
 from rooms.models import Room
 from bookings.models import Booking
+from organisation.models import OrganisationSettings
+from analytics.cache import cache_key, cache_timeout
+from analytics.occupancy import room_occupancy
+from analytics.aggregations import peak_hours, weekday_hour_occupancy
+from analytics.rollup import (
+    PERIOD_KINDS,
+    collect_period_stats,
+    collect_room_stats,
+    empty_stats,
+    merge_stats,
+    period_start,
+)
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
 def _parse_date_range(request):
     """Extract startDate / endDate from query params."""
     start_str = request.query_params.get("startDate")
@@ -32,6 +52,31 @@ def _parse_date_range(request):
     return start, end
 
 
+def _cached(endpoint):
+    """
+    Serve a successful analytics response from the cache when possible.
+
+    Requests with an unparseable date range fall through to the view so it
+    can return its usual 400.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            start, end = _parse_date_range(request)
+            if start is None:
+                return view(request, *args, **kwargs)
+            key = cache_key(endpoint, start, end, request.query_params)
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+            response = view(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, cache_timeout(end))
+            return response
+        return wrapper
+    return decorator
+
+
 def _bookings_in_range(start, end):
     return Booking.objects.filter(
         start_time__date__gte=start,
@@ -45,6 +90,7 @@ def _bookings_in_range(start, end):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@_cached("kpi")
 def kpi_view(request):
     """KPI summary: Total Rooms, Avg Utilization, Ghosting Rate, Total Bookings."""
     start, end = _parse_date_range(request)
@@ -54,34 +100,31 @@ def kpi_view(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    total_rooms = Room.objects.count()
-    bookings = _bookings_in_range(start, end)
-    total_bookings = bookings.count()
-    no_shows = bookings.filter(status="no_show").count()
-    checked_in = bookings.filter(checked_in=True).count()
+    rooms = list(Room.objects.all())
+    _, occupancy = room_occupancy(start, end, rooms, OrganisationSettings.get())
+    data = _kpi_data(len(rooms), collect_room_stats(start, end), occupancy)
+    return Response({"success": True, "data": data})
+
+
+def _kpi_data(total_rooms, room_totals, occupancy):
+    totals = empty_stats()
+    for room_stats in room_totals.values():
+        merge_stats(totals, room_stats)
+    total_bookings = totals["bookings"]
+    no_shows = totals["no_shows"]
 
     ghosting_rate = round((no_shows / total_bookings * 100) if total_bookings > 0 else 0, 1)
 
-    # Utilization: total booked hours / (rooms × business hours × working days)
-    days = max((end - start).days, 1)
-    business_hours_per_day = 12  # 07:00 – 19:00
-    total_available_hours = total_rooms * business_hours_per_day * days
-    total_booked_seconds = 0
-    for b in bookings:
-        duration = (b.end_time - b.start_time).total_seconds()
-        total_booked_seconds += duration
-    total_booked_hours = total_booked_seconds / 3600
-    avg_util = round((total_booked_hours / total_available_hours * 100) if total_available_hours > 0 else 0, 1)
-
-    data = [
+    # Utilization: occupied business minutes / (rooms × business minutes)
+    avg_util = occupancy["utilization"]
+
+    return [
         {"label": "Total Rooms", "value": total_rooms, "change": 0, "changeType": "neutral", "unit": "rooms"},
         {"label": "Avg Utilization", "value": avg_util, "change": 2.3, "changeType": "positive", "unit": "%"},
         {"label": "Ghosting Rate", "value": ghosting_rate, "change": -1.2, "changeType": "positive", "unit": "%"},
         {"label": "Total Bookings", "value": total_bookings, "change": 5.0, "changeType": "positive", "unit": "bookings"},
     ]
 
-    return Response({"success": True, "data": data})
-
 
 # ---------------------------------------------------------------------------
 # GET /api/analytics/utilization
@@ -89,6 +132,7 @@ def kpi_view(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@_cached("utilization")
 def utilization_view(request):
     """Utilization data per room."""
     start, end = _parse_date_range(request)
@@ -103,38 +147,32 @@ def utilization_view(request):
     if building:
         rooms = rooms.filter(building__iexact=building)
 
-    days = max((end - start).days, 1)
-    business_hours = 12
-    available_hours = business_hours * days
+    rooms = list(rooms)
+    totals = collect_room_stats(start, end, rooms=rooms)
+    occupancy, _ = room_occupancy(start, end, rooms, OrganisationSettings.get())
+    return Response({"success": True, "data": _utilization_data(rooms, totals, occupancy)})
+
 
+def _utilization_data(rooms, totals, occupancy):
     result = []
     for room in rooms:
-        room_bookings = _bookings_in_range(start, end).filter(room=room)
-        total_booked = sum(
-            (b.end_time - b.start_time).total_seconds() / 3600
-            for b in room_bookings
-        )
-        util_rate = round((total_booked / available_hours * 100) if available_hours > 0 else 0, 1)
-        total_count = room_bookings.count()
-
-        # Determine peak hours
-        hour_counts = {}
-        for b in room_bookings:
-            h = b.start_time.hour
-            hour_counts[h] = hour_counts.get(h, 0) + 1
-        sorted_hours = sorted(hour_counts.items(), key=lambda x: -x[1])[:3]
-        peak_hours = [f"{h:02d}:00" for h, _ in sorted_hours]
+        room_totals = totals.get(room.id) or empty_stats()
+        room_occ = occupancy[room.id]
 
         result.append({
             "roomId": str(room.id),
             "roomName": room.name,
-            "utilizationRate": util_rate,
-            "totalBookings": total_count,
-            "totalHoursBooked": round(total_booked, 1),
-            "peakHours": peak_hours,
+            "utilizationRate": room_occ["utilization"],
+            "totalBookings": room_totals["bookings"],
+            "totalHoursBooked": round(room_totals["booked_seconds"] / 3600, 1),
+            "businessHoursBooked": round(room_occ["bookedMinutes"] / 60, 1),
+            "peakHours": peak_hours(dict(enumerate(room_totals["hour_histogram"]))),
+            "peakConcurrency": room_occ["peakConcurrency"],
+            "idleStretches": room_occ["idleStretches"],
+            "averageIdleMinutes": room_occ["averageIdleMinutes"],
+            "longestIdleMinutes": room_occ["longestIdleMinutes"],
         })
-
-    return Response({"success": True, "data": result})
+    return result
 
 
 # ---------------------------------------------------------------------------
@@ -143,6 +181,7 @@ def utilization_view(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@_cached("ghosting")
 def ghosting_view(request):
     """Ghosting data per room."""
     start, end = _parse_date_range(request)
@@ -152,17 +191,18 @@ def ghosting_view(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    rooms = Room.objects.all()
+    data = _ghosting_data(Room.objects.all(), collect_room_stats(start, end))
+    return Response({"success": True, "data": data})
+
+
+def _ghosting_data(rooms, totals):
     result = []
     for room in rooms:
-        room_bookings = _bookings_in_range(start, end).filter(room=room)
-        total = room_bookings.count()
-        no_shows = room_bookings.filter(status="no_show").count()
+        room_totals = totals.get(room.id) or empty_stats()
+        total = room_totals["bookings"]
+        no_shows = room_totals["no_shows"]
         ghosting_rate = round((no_shows / total * 100) if total > 0 else 0, 1)
-
-        wasted_minutes = 0
-        for b in room_bookings.filter(status="no_show"):
-            wasted_minutes += (b.end_time - b.start_time).total_seconds() / 60
+        wasted_minutes = room_totals["no_show_seconds"] / 60
 
         result.append({
             "roomId": str(room.id),
@@ -172,8 +212,7 @@ def ghosting_view(request):
             "totalBookings": total,
             "averageWastedMinutes": round(wasted_minutes / no_shows if no_shows > 0 else 0, 1),
         })
-
-    return Response({"success": True, "data": result})
+    return result
 
 
 # ---------------------------------------------------------------------------
@@ -182,6 +221,7 @@ def ghosting_view(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@_cached("ghosting-departments")
 def ghosting_departments_view(request):
     """Ghosting rate grouped by organizer department."""
     start, end = _parse_date_range(request)
@@ -191,23 +231,28 @@ def ghosting_departments_view(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    bookings_qs = _bookings_in_range(start, end).select_related("organizer")
-    # Group by department
+    return Response({"success": True, "data": _departments_data(start, end)})
+
+
+def _departments_data(start, end):
+    rows = (
+        _bookings_in_range(start, end)
+        .values("organizer__department")
+        .annotate(total=Count("id"), no_shows=Count("id", filter=Q(status="no_show")))
+        .order_by()
+    )
+    # Blank and missing departments both report as "Unknown"
     dept_stats: dict[str, dict] = {}
-    for b in bookings_qs:
-        dept = b.organizer.department or "Unknown"
-        if dept not in dept_stats:
-            dept_stats[dept] = {"total": 0, "no_shows": 0}
-        dept_stats[dept]["total"] += 1
-        if b.status == "no_show":
-            dept_stats[dept]["no_shows"] += 1
+    for row in rows:
+        stats = dept_stats.setdefault(row["organizer__department"] or "Unknown", {"total": 0, "no_shows": 0})
+        stats["total"] += row["total"]
+        stats["no_shows"] += row["no_shows"]
 
     result = []
     for name, stats in sorted(dept_stats.items()):
         rate = round((stats["no_shows"] / stats["total"] * 100) if stats["total"] > 0 else 0, 1)
         result.append({"name": name, "rate": rate, "totalBookings": stats["total"], "noShows": stats["no_shows"]})
-
-    return Response({"success": True, "data": result})
+    return result
 
 
 # ---------------------------------------------------------------------------
@@ -216,6 +261,7 @@ def ghosting_departments_view(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@_cached("capacity")
 def capacity_view(request):
     """Capacity efficiency data per room."""
     start, end = _parse_date_range(request)
@@ -225,22 +271,22 @@ def capacity_view(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    rooms = Room.objects.all()
+    data = _capacity_data(Room.objects.all(), collect_room_stats(start, end))
+    return Response({"success": True, "data": data})
+
+
+def _capacity_data(rooms, totals):
     result = []
     for room in rooms:
-        room_bookings = _bookings_in_range(start, end).filter(room=room)
-        total = room_bookings.count()
-
-        # Average attendees from BookingAttendee count
-        attendee_counts = []
-        for b in room_bookings:
-            attendee_counts.append(b.booking_attendees.count() + 1)  # +1 for organizer
+        room_totals = totals.get(room.id) or empty_stats()
+        total = room_totals["bookings"]
 
-        avg_attendees = round(sum(attendee_counts) / len(attendee_counts), 1) if attendee_counts else 0
+        # Average attendees (BookingAttendee rows + organizer) per booking
+        avg_attendees = round(room_totals["attendee_sum"] / total, 1) if total else 0
         cap_util = round((avg_attendees / room.capacity * 100) if room.capacity > 0 else 0, 1)
 
-        oversized = sum(1 for c in attendee_counts if c < room.capacity * 0.5)
-        undersized = sum(1 for c in attendee_counts if c > room.capacity)
+        oversized = room_totals["oversized"]
+        undersized = room_totals["undersized"]
 
         result.append({
             "roomId": str(room.id),
@@ -251,8 +297,7 @@ def capacity_view(request):
             "oversizedBookings": oversized,
             "undersizedBookings": undersized,
         })
-
-    return Response({"success": True, "data": result})
+    return result
 
 
 # ---------------------------------------------------------------------------
@@ -261,6 +306,7 @@ def capacity_view(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@_cached("heatmap")
 def heatmap_view(request):
     """Heatmap data: day × hour grid."""
     start, end = _parse_date_range(request)
@@ -270,24 +316,24 @@ def heatmap_view(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    bookings = _bookings_in_range(start, end)
+    return Response({"success": True, "data": _heatmap_data(start, end, OrganisationSettings.get())})
+
 
-    # Build heatmap grid: Mon-Fri, hours 7-18
-    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+def _heatmap_data(start, end, org):
+    cells = weekday_hour_occupancy(_bookings_in_range(start, end), tzinfo=org.get_tzinfo())
+
+    # Build heatmap grid over the organisation's business days and hours
+    business_start, business_end = org.get_business_hours()
+    last_hour = business_end.hour + (1 if business_end.minute else 0)
     grid = []
-    for day in days:
-        for hour in range(7, 19):
-            count = bookings.filter(
-                start_time__week_day=(days.index(day) + 2) % 7 + 1,  # Django week_day: Sun=1
-                start_time__hour=hour,
-            ).count()
+    for day_index in org.get_business_days():
+        for hour in range(business_start.hour, last_hour):
             grid.append({
-                "day": day,
+                "day": DAY_NAMES[day_index],
                 "hour": hour,
-                "value": count,
+                "value": cells.get((day_index + 1, hour), 0),  # ISO weekday: Mon=1
             })
-
-    return Response({"success": True, "data": grid})
+    return grid
 
 
 # ---------------------------------------------------------------------------
@@ -296,6 +342,7 @@ def heatmap_view(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@_cached("room-compare")
 def room_compare_view(request):
     """Room comparison across multiple rooms."""
     start, end = _parse_date_range(request)
@@ -310,24 +357,20 @@ def room_compare_view(request):
     if room_ids_param:
         ids = [r.strip() for r in room_ids_param.split(",") if r.strip()]
         rooms = rooms.filter(id__in=ids)
+    rooms = list(rooms)
 
-    days = max((end - start).days, 1)
-    business_hours = 12
-    available_hours = business_hours * days
+    totals = collect_room_stats(start, end, rooms=rooms)
+    occupancy, _ = room_occupancy(start, end, rooms, OrganisationSettings.get())
 
     result = []
     for room in rooms:
-        room_bookings = _bookings_in_range(start, end).filter(room=room)
-        total = room_bookings.count()
-        no_shows = room_bookings.filter(status="no_show").count()
-        booked_hours = sum(
-            (b.end_time - b.start_time).total_seconds() / 3600 for b in room_bookings
-        )
-        util = round((booked_hours / available_hours * 100) if available_hours > 0 else 0, 1)
+        room_totals = totals.get(room.id) or empty_stats()
+        total = room_totals["bookings"]
+        no_shows = room_totals["no_shows"]
+        util = occupancy[room.id]["utilization"]
         ghost = round((no_shows / total * 100) if total > 0 else 0, 1)
 
-        attendee_counts = [b.booking_attendees.count() + 1 for b in room_bookings]
-        avg_att = round(sum(attendee_counts) / len(attendee_counts), 1) if attendee_counts else 0
+        avg_att = round(room_totals["attendee_sum"] / total, 1) if total else 0
         cap = round((avg_att / room.capacity * 100) if room.capacity > 0 else 0, 1)
 
         result.append({
@@ -348,8 +391,16 @@ def room_compare_view(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@_cached("trends")
 def trends_view(request):
-    """Trend data for a metric over time."""
+    """
+    Trend data for a metric over time.
+
+    Query params:
+        metric: utilization (default) | ghosting | bookings
+        granularity: day (default) | week | month — each point is labelled
+                     with the first date of its period
+    """
     start, end = _parse_date_range(request)
     if start is None:
         return Response(
@@ -358,36 +409,159 @@ def trends_view(request):
         )
 
     metric = request.query_params.get("metric", "utilization")
+    granularity = request.query_params.get("granularity", "day")
+    if granularity not in PERIOD_KINDS:
+        return Response(
+            {"success": False, "message": f"granularity must be one of {', '.join(PERIOD_KINDS)}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
 
-    result = []
+    periods = collect_period_stats(start, end, granularity)
+
+    # Utilization denominator: rooms × business hours × business days in the period
+    org = OrganisationSettings.get()
+    total_rooms = Room.objects.count()
+    business_start, business_end = org.get_business_hours()
+    business_hours_per_day = (
+        datetime.combine(start, business_end) - datetime.combine(start, business_start)
+    ).total_seconds() / 3600
+    business_days = set(org.get_business_days())
+
+    # Zero-fill every period in range without extra queries
+    available_hours = {}
     current = start
     while current <= end:
-        day_bookings = _bookings_in_range(current, current)
+        key = period_start(current, granularity)
+        available_hours.setdefault(key, 0)
+        if current.weekday() in business_days:
+            available_hours[key] += total_rooms * business_hours_per_day
+        current += timedelta(days=1)
+
+    result = []
+    for key, available in available_hours.items():
+        totals = periods.get(key, {"booked_seconds": 0, "bookings": 0, "no_shows": 0})
         if metric == "ghosting":
-            total = day_bookings.count()
-            no_shows = day_bookings.filter(status="no_show").count()
-            value = round((no_shows / total * 100) if total > 0 else 0, 1)
+            total = totals["bookings"]
+            value = round((totals["no_shows"] / total * 100) if total > 0 else 0, 1)
+        elif metric == "bookings":
+            value = totals["bookings"]
         else:  # utilization
-            value = round(day_bookings.count() * 1.0, 1)  # simple count per day
+            booked_hours = totals["booked_seconds"] / 3600
+            value = round((booked_hours / available * 100) if available > 0 else 0, 1)
         result.append({
-            "date": current.isoformat(),
+            "date": key.isoformat(),
             "value": value,
         })
-        current += timedelta(days=1)
 
     return Response({"success": True, "data": result})
 
 
+# ---------------------------------------------------------------------------
+# GET /api/analytics/dashboard
+# ---------------------------------------------------------------------------
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@_cached("dashboard")
+def dashboard_view(request):
+    """
+    Everything the analytics page loads on open, in one response.
+
+    The kpi, utilization, ghosting and capacity sections share a single read
+    of the per-room totals; departments and heatmap add one grouped query
+    each. Every section is identical to its standalone endpoint's ``data``.
+    """
+    start, end = _parse_date_range(request)
+    if start is None:
+        return Response(
+            {"success": False, "message": "Invalid date format. Use YYYY-MM-DD."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    org = OrganisationSettings.get()
+    rooms = list(Room.objects.all())
+    totals = collect_room_stats(start, end)
+    occupancy, occupancy_summary = room_occupancy(start, end, rooms, org)
+
+    # ?building= narrows the utilization section only, as on /utilization
+    building = request.query_params.get("building")
+    utilization_rooms = rooms
+    if building:
+        utilization_rooms = [r for r in rooms if r.building.lower() == building.lower()]
+
+    data = {
+        "kpi": _kpi_data(len(rooms), totals, occupancy_summary),
+        "utilization": _utilization_data(utilization_rooms, totals, occupancy),
+        "ghosting": _ghosting_data(rooms, totals),
+        "ghostingDepartments": _departments_data(start, end),
+        "capacity": _capacity_data(rooms, totals),
+        "heatmap": _heatmap_data(start, end, org),
+    }
+    return Response({"success": True, "data": data})
+
+
 # ---------------------------------------------------------------------------
 # GET /api/analytics/export
 # ---------------------------------------------------------------------------
 
+# Selectable export columns: key → (CSV header, values_list lookup)
+EXPORT_COLUMNS = {
+    "id": ("Booking ID", "id"),
+    "room": ("Room", "room__name"),
+    "title": ("Title", "title"),
+    "organizer": ("Organizer", "organizer__name"),
+    "start": ("Start", "start_time"),
+    "end": ("End", "end_time"),
+    "status": ("Status", "status"),
+    "checkedIn": ("Checked In", "checked_in"),
+}
+EXPORT_FORMATS = ("csv", "csv.gz")
+EXPORT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+def _export_rows(bookings, keys):
+    """Yield CSV lines for the requested columns, streaming from a server-side cursor."""
+    import csv
+
+    writer = csv.writer(_Echo())
+    yield writer.writerow([EXPORT_COLUMNS[k][0] for k in keys])
+    lookups = [EXPORT_COLUMNS[k][1] for k in keys]
+    for row in bookings.values_list(*lookups).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        # csv.writer str()s UUIDs and bools itself; datetimes keep their ISO form
+        yield writer.writerow([v.isoformat() if hasattr(v, "isoformat") else v for v in row])
+
+
+def _gzip_stream(chunks):
+    """Compress an iterable of str chunks into a gzip byte stream on the fly."""
+    import zlib
+
+    compressor = zlib.compressobj(wbits=31)  # 31 → gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def export_view(request):
-    """Export analytics as CSV. PDF is a future enhancement."""
-    import csv
-    from django.http import HttpResponse
+    """
+    Export bookings as a streamed CSV. PDF is a future enhancement.
+
+    Query params:
+        format: csv (default) | csv.gz — gzip is applied on the fly
+        columns: comma-separated subset of EXPORT_COLUMNS keys, in output order
+                 (default: all columns)
+    """
+    from django.http import StreamingHttpResponse
 
     start, end = _parse_date_range(request)
     if start is None:
@@ -397,24 +571,31 @@ def export_view(request):
         )
 
     fmt = request.query_params.get("format", "csv")
-    if fmt != "csv":
+    if fmt not in EXPORT_FORMATS:
         return Response(
-            {"success": False, "message": "Only CSV export is supported currently."},
+            {"success": False, "message": f"format must be one of {', '.join(EXPORT_FORMATS)}."},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    bookings = _bookings_in_range(start, end).select_related("room", "organizer")
-
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = f'attachment; filename="analytics_{start}_{end}.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(["Booking ID", "Room", "Title", "Organizer", "Start", "End", "Status", "Checked In"])
-    for b in bookings:
-        writer.writerow([
-            str(b.id), b.room.name, b.title, b.organizer.name,
-            b.start_time.isoformat(), b.end_time.isoformat(),
-            b.status, b.checked_in,
-        ])
+    columns_param = request.query_params.get("columns")
+    keys = [c.strip() for c in columns_param.split(",") if c.strip()] if columns_param else list(EXPORT_COLUMNS)
+    unknown = [k for k in keys if k not in EXPORT_COLUMNS]
+    if unknown or not keys:
+        return Response(
+            {
+                "success": False,
+                "message": f"Unknown column(s): {', '.join(unknown) or '(none)'}. "
+                           f"Valid columns: {', '.join(EXPORT_COLUMNS)}.",
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
 
+    # values_list only joins room/organizer when those columns are requested
+    rows = _export_rows(_bookings_in_range(start, end), keys)
+    filename = f"analytics_{start}_{end}.{fmt}"
+    if fmt == "csv.gz":
+        response = StreamingHttpResponse(_gzip_stream(rows), content_type="application/gzip")
+    else:
+        response = StreamingHttpResponse(rows, content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
     return response
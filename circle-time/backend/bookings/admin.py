@@ -1,5 +1,5 @@
 from django.contrib import admin
-from bookings.models import Booking, BookingAttendee
+from bookings.models import Booking, BookingAttendee, BookingSeries, BookingSeriesAttendee
 
 
 class AttendeeInline(admin.TabularInline):
@@ -15,3 +15,19 @@ class BookingAdmin(admin.ModelAdmin):
     search_fields = ("title", "room__name", "organizer__name")
     inlines = [AttendeeInline]
     raw_id_fields = ("organizer", "room")
+
+
+class SeriesAttendeeInline(admin.TabularInline):
+    model = BookingSeriesAttendee
+    extra = 0
+    raw_id_fields = ("user",)
+
+
+@admin.register(BookingSeries)
+class BookingSeriesAdmin(admin.ModelAdmin):
+    list_display = ("title", "room", "organizer", "recurrence_type", "start_date", "recurrence_end_date")
+    list_filter = ("recurrence_type",)
+    search_fields = ("title", "room__name", "organizer__name")
+    inlines = [SeriesAttendeeInline]
+    raw_id_fields = ("organizer", "room")
+    readonly_fields = ("materialised_through",)
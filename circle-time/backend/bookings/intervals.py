@@ -0,0 +1,237 @@
+"""
+In-memory interval index over active bookings.
+
+An IntervalIndex loads every confirmed / checked-in booking overlapping a
+time window with one query (plus the virtual series occurrences in it, see
+bookings.recurrence), then answers overlap and free-gap probes with
+bisect instead of a query per probe. Availability-style endpoints that test
+dozens of slots (or many rooms) build one index per request.
+
+Active bookings of a room never overlap (the booking_no_overlap constraint),
+so each room's start and end arrays are both sorted — which is what lets
+either array be bisected.
+
+Live indexes in this process are kept fresh by the Booking signals in
+bookings.signals, so a request that writes and then probes sees its own
+writes. Bulk writes send no signals, so ``bulk_create`` and
+``QuerySet.update()`` callers report them with ``bookings_saved`` /
+``bookings_removed``. A series write changes the virtual occurrences an
+index was loaded with, so indexes covering that room are unloaded and
+reload on their next probe (``series_changed``). Indexes are meant to be
+short-lived (a request, a batch job); they don't see writes made by other
+processes after they were loaded.
+"""
+import bisect
+import threading
+import weakref
+from datetime import timedelta
+
+from bookings.constants import BookingStatus
+
+ACTIVE_STATUSES = (BookingStatus.CONFIRMED.value, BookingStatus.CHECKED_IN.value)
+
+_live_indexes = weakref.WeakSet()
+
+
+class IntervalIndex:
+    """
+    Sorted [start, end) intervals of active bookings per room for one window.
+
+    Example:
+        >>> index = IntervalIndex(day_start, day_end, room_ids=[room.id])
+        >>> index.conflicts(room.id, slot_start, slot_end)
+        False
+        >>> index.free_gaps(room.id, (day_start, day_end), timedelta(minutes=30))
+        [(datetime(...09:00), datetime(...10:30)), ...]
+
+    Args:
+        start, end: Aware datetimes bounding every probe made on this index
+        room_ids: Optional rooms to load; ``None`` loads all rooms
+    """
+
+    def __init__(self, start, end, room_ids=None):
+        if start >= end:
+            raise ValueError("IntervalIndex window start must be before its end")
+        self.start = start
+        self.end = end
+        self.room_ids = set(room_ids) if room_ids is not None else None
+        self._rooms = None  # room_id → ([starts], [ends], [booking ids])
+        self._room_of = {}  # booking id → room_id
+        self._lock = threading.RLock()
+
+    # -- loading ------------------------------------------------------------
+
+    def _load(self):
+        from bookings.models import Booking
+        from bookings.recurrence import virtual_occurrences
+
+        qs = Booking.objects.filter(
+            status__in=ACTIVE_STATUSES,
+            start_time__lt=self.end,
+            end_time__gt=self.start,
+        )
+        if self.room_ids is not None:
+            qs = qs.filter(room_id__in=self.room_ids)
+
+        rows = list(qs.values_list("id", "room_id", "start_time", "end_time"))
+        # Series occurrences not yet stored as rows never overlap a stored
+        # booking either (series creation skips clashes, writes check them)
+        rows += [
+            (o.id, o.room_id, o.start_time, o.end_time)
+            for o in virtual_occurrences(self.start, self.end, room_ids=self.room_ids)
+        ]
+        rows.sort(key=lambda row: (row[1], row[2]))
+
+        rooms = {}
+        room_of = {}
+        for booking_id, room_id, start, end in rows:
+            starts, ends, ids = rooms.setdefault(room_id, ([], [], []))
+            starts.append(start)
+            ends.append(end)
+            ids.append(booking_id)
+            room_of[booking_id] = room_id
+        self._rooms, self._room_of = rooms, room_of
+        _live_indexes.add(self)
+
+    def _room(self, room_id):
+        if self._rooms is None:
+            with self._lock:
+                if self._rooms is None:
+                    self._load()
+        if self.room_ids is not None and room_id not in self.room_ids:
+            raise KeyError(f"Room {room_id} is not covered by this index")
+        return self._rooms.get(room_id, ([], [], []))
+
+    def _check_window(self, start, end):
+        if start < self.start or end > self.end:
+            raise ValueError(
+                f"Probe {start.isoformat()}–{end.isoformat()} is outside the loaded window "
+                f"{self.start.isoformat()}–{self.end.isoformat()}"
+            )
+
+    # -- queries ------------------------------------------------------------
+
+    def busy(self, room_id, start, end):
+        """
+        Active bookings of ``room_id`` overlapping [start, end).
+
+        Returns:
+            list of (start, end, booking_id), ordered by start
+        """
+        self._check_window(start, end)
+        with self._lock:
+            starts, ends, ids = self._room(room_id)
+            # First booking that ends after ``start`` is the first that can overlap
+            i = bisect.bisect_right(ends, start)
+            j = bisect.bisect_left(starts, end)
+            return list(zip(starts[i:j], ends[i:j], ids[i:j]))
+
+    def conflicts(self, room_id, start, end, exclude_booking_id=None) -> bool:
+        """
+        In-memory equivalent of bookings.utils.check_booking_conflicts.
+
+        Returns:
+            bool: True if an active booking other than ``exclude_booking_id``
+            overlaps [start, end)
+        """
+        return any(
+            booking_id != exclude_booking_id
+            for _, _, booking_id in self.busy(room_id, start, end)
+        )
+
+    def free_gaps(self, room_id, window, min_duration=timedelta(0)):
+        """
+        Free stretches of ``room_id`` inside ``window`` lasting at least
+        ``min_duration``.
+
+        Args:
+            room_id: Room to inspect
+            window: (start, end) tuple inside the loaded window
+            min_duration: Shortest gap worth returning (timedelta)
+
+        Returns:
+            list of (gap_start, gap_end) tuples, ordered by start
+        """
+        window_start, window_end = window
+        gaps = []
+        cursor = window_start
+        for start, end, _ in self.busy(room_id, window_start, window_end):
+            if start > cursor and start - cursor >= min_duration:
+                gaps.append((cursor, start))
+            cursor = max(cursor, end)
+        if window_end > cursor and window_end - cursor >= min_duration:
+            gaps.append((cursor, window_end))
+        return gaps
+
+    # -- signal hooks -------------------------------------------------------
+
+    def _discard(self, booking_id):
+        room_id = self._room_of.pop(booking_id, None)
+        if room_id is None:
+            return
+        starts, ends, ids = self._rooms[room_id]
+        i = ids.index(booking_id)
+        del starts[i], ends[i], ids[i]
+
+    def _apply(self, booking):
+        with self._lock:
+            if self._rooms is None:
+                return
+            self._discard(booking.id)
+            if (
+                booking.status not in ACTIVE_STATUSES
+                or booking.start_time >= self.end
+                or booking.end_time <= self.start
+                or (self.room_ids is not None and booking.room_id not in self.room_ids)
+            ):
+                return
+            starts, ends, ids = self._rooms.setdefault(booking.room_id, ([], [], []))
+            i = bisect.bisect_right(starts, booking.start_time)
+            starts.insert(i, booking.start_time)
+            ends.insert(i, booking.end_time)
+            ids.insert(i, booking.id)
+            self._room_of[booking.id] = booking.room_id
+
+    def _remove(self, booking_id):
+        with self._lock:
+            if self._rooms is not None:
+                self._discard(booking_id)
+
+    def _unload(self, room_id):
+        with self._lock:
+            if self._rooms is None or (self.room_ids is not None and room_id not in self.room_ids):
+                return
+            self._rooms, self._room_of = None, {}
+            _live_indexes.discard(self)
+
+
+def booking_saved(booking):
+    """Reflect a saved booking in every loaded index of this process."""
+    for index in list(_live_indexes):
+        index._apply(booking)
+
+
+def booking_deleted(booking):
+    """Drop a deleted booking from every loaded index of this process."""
+    for index in list(_live_indexes):
+        index._remove(booking.id)
+
+
+def bookings_saved(bookings):
+    """``booking_saved`` for rows written without signals (``bulk_create``)."""
+    for index in list(_live_indexes):
+        for booking in bookings:
+            index._apply(booking)
+
+
+def bookings_removed(booking_ids):
+    """Drop bookings deleted or made inactive by ``QuerySet.update()`` / ``delete()``."""
+    for index in list(_live_indexes):
+        for booking_id in booking_ids:
+            index._remove(booking_id)
+
+
+def series_changed(room_id):
+    """Unload every loaded index covering ``room_id``; it reloads on its next probe."""
+    for index in list(_live_indexes):
+        index._unload(room_id)
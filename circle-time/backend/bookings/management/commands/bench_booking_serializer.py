@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from bookings.models import Booking
+from bookings.serializers import BookingSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the per-row BookingSerializer with the list fast path on the "
+        "most recent bookings in the database. Read-only. Fails if the two "
+        "render different JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200, help="Bookings per run (default 200).")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per path; the best is reported.")
+
+    def _run(self, serialize):
+        best, body, queries = None, None, 0
+        for _ in range(self._repeat):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                body = JSONRenderer().render(serialize())
+                elapsed = time.perf_counter() - started
+            queries = len(captured)
+            best = elapsed if best is None else min(best, elapsed)
+        return best, queries, body
+
+    def handle(self, *args, **options):
+        self._repeat = max(1, options["repeat"])
+        ids = list(Booking.objects.order_by("-start_time").values_list("id", flat=True)[:options["rows"]])
+        if not ids:
+            raise CommandError("No bookings to serialise. Run `python manage.py seed` first.")
+
+        def queryset():
+            return Booking.objects.filter(id__in=ids).order_by("start_time", "id")
+
+        per_row = self._run(lambda: [BookingSerializer(b).data for b in queryset()])
+        fast = self._run(lambda: BookingSerializer(queryset(), many=True).data)
+
+        if per_row[2] != fast[2]:
+            raise CommandError("Fast path output differs from the per-row serializer.")
+
+        self.stdout.write(f"{len(ids)} bookings, best of {self._repeat} run(s):")
+        for label, (elapsed, queries, _) in (("per-row", per_row), ("list fast path", fast)):
+            self.stdout.write(f"  {label:<15} {elapsed * 1000:8.1f} ms  {queries:4d} queries")
+        self.stdout.write(self.style.SUCCESS(
+            f"Output identical ({len(fast[2])} bytes); {per_row[0] / fast[0]:.1f}x faster."
+        ))
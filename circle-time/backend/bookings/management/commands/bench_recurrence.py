@@ -0,0 +1,59 @@
+import time
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.rrule import occurrence_dates
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the expansion of a ten-year daily series by bookings.rrule and "
+        "dateutil.rrule: in full, and one week at its far end. Needs "
+        "python-dateutil (requirements-dev.txt). The two are checked against "
+        "each other on random rules by the bookings tests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per timing; the best is reported.")
+
+    def _time(self, fn):
+        best, result = None, None
+        for _ in range(self._repeat):
+            started = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def handle(self, *args, **options):
+        try:
+            from dateutil.rrule import rrulestr
+        except ImportError:
+            raise CommandError("python-dateutil is not installed: pip install -r requirements-dev.txt")
+        self._repeat = max(1, options["repeat"])
+
+        start = date(2026, 1, 1)
+        end = start + timedelta(days=3652)
+        dtstart = datetime.combine(start, datetime.min.time())
+        daily = rrulestr("FREQ=DAILY", dtstart=dtstart)
+        last_week = (end - timedelta(days=6), end)
+
+        rows = [
+            ("10 years, in full", *self._time(lambda: list(occurrence_dates(start, "daily", {}, until=end))),
+             *self._time(lambda: daily.between(dtstart, datetime.combine(end, datetime.min.time()), inc=True))),
+            ("last week only", *self._time(lambda: list(occurrence_dates(start, "daily", {}, *last_week))),
+             *self._time(lambda: daily.between(
+                 datetime.combine(last_week[0], datetime.min.time()),
+                 datetime.combine(last_week[1], datetime.min.time()),
+                 inc=True,
+             ))),
+        ]
+        self.stdout.write(f"Daily series, best of {self._repeat} run(s):")
+        for label, ours, our_dates, theirs, their_dates in rows:
+            if len(our_dates) != len(their_dates):
+                raise CommandError(f"{label}: {len(our_dates)} dates vs dateutil's {len(their_dates)}")
+            self.stdout.write(
+                f"  {label:<18} {len(our_dates):5d} dates  rrule {ours * 1000:8.3f} ms  "
+                f"dateutil {theirs * 1000:8.3f} ms"
+            )
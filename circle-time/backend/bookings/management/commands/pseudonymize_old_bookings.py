@@ -17,6 +17,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 
 from bookings.models import Booking
+from bookings.utils import bump_bookings_generation
 
 
 class Command(BaseCommand):
@@ -54,6 +55,8 @@ class Command(BaseCommand):
             title="[redacted]",
             description="",
         )
+        # QuerySet.update() skips post_save, so invalidate cached analytics here
+        bump_bookings_generation()
 
         self.stdout.write(self.style.SUCCESS(
             f"Pseudonymized {updated} booking(s) older than {days} days (cutoff: {cutoff.date()})."
@@ -0,0 +1,49 @@
+# Generated by Django 6.0.2 on 2026-10-17 09:12
+
+import bookings.models
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+def check_no_existing_overlaps(apps, schema_editor):
+    """Fail with a readable message instead of a bare constraint error."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT a.id, b.id FROM bookings_booking a
+            JOIN bookings_booking b
+              ON a.room_id = b.room_id AND a.id < b.id
+             AND a.start_time < b.end_time AND b.start_time < a.end_time
+            WHERE a.status IN ('confirmed', 'checked_in')
+              AND b.status IN ('confirmed', 'checked_in')
+            LIMIT 20
+            """
+        )
+        pairs = cursor.fetchall()
+    if pairs:
+        listed = "\n".join(f"  {a} overlaps {b}" for a, b in pairs)
+        raise RuntimeError(
+            "Cannot add booking_no_overlap: active bookings already overlap. "
+            "Cancel or move one booking of each pair, then re-run migrate.\n" + listed
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_booking_updated_at_index'),
+    ]
+
+    operations = [
+        # GiST has no uuid "=" operator class without btree_gist
+        BtreeGistExtension(),
+        migrations.RunPython(check_no_existing_overlaps, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status__in', ['confirmed', 'checked_in'])), expressions=[('room', '='), (bookings.models.TsTzRange('start_time', 'end_time', django.contrib.postgres.fields.ranges.RangeBoundary()), '&&')], name='booking_no_overlap'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_booking_no_overlap'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='bookings_bo_room_id_2520ec_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='bookingattendee',
+            name='bookings_bo_user_id_c8c1f9_idx',
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['room', 'start_time', 'id'], name='bookings_bo_room_id_d0272c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['organizer', 'start_time', 'id'], name='bookings_bo_organiz_2d3689_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookingattendee',
+            index=models.Index(fields=['user', 'booking'], name='bookings_bo_user_id_92cc03_idx'),
+        ),
+    ]
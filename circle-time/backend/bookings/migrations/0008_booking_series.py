@@ -0,0 +1,88 @@
+# Generated by Django 6.0.2 on 2026-10-17 09:12
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_booking_keyset_indexes'),
+        ('rooms', '0002_building_room_building_ref_floorplan'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingSeriesAttendee',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='occurrence_start',
+            field=models.DateTimeField(blank=True, help_text='Scheduled start of the series occurrence this row stands for', null=True),
+        ),
+        migrations.CreateModel(
+            name='BookingSeries',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=500)),
+                ('description', models.TextField(blank=True, default='')),
+                ('attendee_count', models.IntegerField(default=1)),
+                ('start_date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('duration', models.DurationField()),
+                ('timezone', models.CharField(max_length=64)),
+                ('recurrence_type', models.CharField(choices=[('none', 'None'), ('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly'), ('custom', 'Custom')], max_length=20)),
+                ('recurrence_pattern', models.JSONField(blank=True, default=dict)),
+                ('recurrence_end_date', models.DateField(blank=True, null=True)),
+                ('materialised_through', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('organizer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='organized_series', to=settings.AUTH_USER_MODEL)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_series', to='rooms.room')),
+            ],
+            options={
+                'verbose_name_plural': 'booking series',
+            },
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='series',
+            field=models.ForeignKey(blank=True, help_text='Series this booking is a materialised or overridden occurrence of', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='bookings.bookingseries'),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.UniqueConstraint(fields=('series', 'occurrence_start'), name='booking_series_occurrence_unique'),
+        ),
+        migrations.AddField(
+            model_name='bookingseriesattendee',
+            name='series',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='series_attendees', to='bookings.bookingseries'),
+        ),
+        migrations.AddField(
+            model_name='bookingseriesattendee',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attended_series', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='bookingseries',
+            index=models.Index(fields=['room', 'recurrence_end_date'], name='bookings_bo_room_id_b7952c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookingseries',
+            index=models.Index(fields=['materialised_through'], name='bookings_bo_materia_dd22b8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookingseriesattendee',
+            index=models.Index(fields=['user', 'series'], name='bookings_bo_user_id_ed2420_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='bookingseriesattendee',
+            unique_together={('series', 'user')},
+        ),
+    ]
@@ -1,8 +1,20 @@
 import uuid
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeBoundary, RangeOperators
 from django.db import models
 from django.conf import settings
 from bookings.constants import BookingStatus, RecurrenceType
 
+# Name of the exclusion constraint that rejects overlapping active bookings;
+# write paths match on it to turn the IntegrityError into a 409.
+BOOKING_OVERLAP_CONSTRAINT = "booking_no_overlap"
+
+
+class TsTzRange(models.Func):
+    """tstzrange(lower, upper, bounds) — half-open [start, end) by default."""
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
 
 class Booking(models.Model):
     """
@@ -33,6 +45,10 @@ class Booking(models.Model):
         recurrence_end_date: Last date in the recurring series
         parent_booking: For child bookings, reference to the first occurrence
         recurrence_pattern: JSON with pattern details (e.g., {"days": [0,2,4]})
+        series: BookingSeries this row is an occurrence of (materialised,
+                overridden or cancelled); None for one-off bookings
+        occurrence_start: The series' scheduled start for this occurrence,
+                          even if the row has since been moved
         created_at: Record creation timestamp
         updated_at: Record last update timestamp
     """
@@ -112,6 +128,19 @@ class Booking(models.Model):
         blank=True,
         help_text="JSON pattern details (e.g., {'days': [0,2,4], 'interval': 1})"
     )
+    series = models.ForeignKey(
+        "BookingSeries",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="occurrences",
+        help_text="Series this booking is a materialised or overridden occurrence of"
+    )
+    occurrence_start = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Scheduled start of the series occurrence this row stands for"
+    )
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -120,9 +149,34 @@ class Booking(models.Model):
     class Meta:
         ordering = ["start_time"]
         indexes = [
-            models.Index(fields=["room", "start_time"]),
+            # Keyset pagination seeks on (start_time, id) within a room or
+            # an organizer; see bookings.pagination
+            models.Index(fields=["room", "start_time", "id"]),
+            models.Index(fields=["organizer", "start_time", "id"]),
             models.Index(fields=["status", "start_time"]),
             models.Index(fields=["parent_booking"]),
+            models.Index(fields=["updated_at"]),
+        ]
+        constraints = [
+            # Same rule as check_booking_conflicts, enforced by PostgreSQL so
+            # concurrent writers can't both win: active bookings of one room
+            # may touch but never overlap.
+            ExclusionConstraint(
+                name=BOOKING_OVERLAP_CONSTRAINT,
+                expressions=[
+                    ("room", RangeOperators.EQUAL),
+                    (TsTzRange("start_time", "end_time", RangeBoundary()), RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(
+                    status__in=[BookingStatus.CONFIRMED.value, BookingStatus.CHECKED_IN.value]
+                ),
+            ),
+            # At most one row (materialised, overridden or cancelled) per
+            # series occurrence; materialisation relies on it to be idempotent
+            models.UniqueConstraint(
+                fields=["series", "occurrence_start"],
+                name="booking_series_occurrence_unique",
+            ),
         ]
 
     def __str__(self):
@@ -160,7 +214,8 @@ class BookingAttendee(models.Model):
         unique_together = ("booking", "user")
         indexes = [
             models.Index(fields=["booking"]),
-            models.Index(fields=["user"]),
+            # "My bookings": a user's memberships without a heap visit
+            models.Index(fields=["user", "booking"]),
         ]
 
     def __str__(self):
@@ -216,3 +271,80 @@ class BookingExtension(models.Model):
 
     def __str__(self):
         return f"{self.booking.title} extended by {self.extension_minutes} min"
+
+
+class BookingSeries(models.Model):
+    """
+    Rule-based recurring booking.
+
+    Only the rule is stored; occurrences are expanded on read for the window
+    a caller asks for (see bookings.recurrence). An occurrence becomes a
+    Booking row (``series`` + ``occurrence_start``) when it is overridden or
+    cancelled, or once it is about to start, so check-in, auto-release and
+    the analytics rollup keep working on rows. Storage and write cost are
+    O(exceptions), not O(occurrences), and a series may be open-ended.
+
+    Attributes:
+        room, organizer, title, description, attendee_count: Copied onto
+            each materialised occurrence
+        start_date: Anchor date; the first occurrence is on or after it
+        start_time: Local wall-clock start of every occurrence
+        duration: Length of every occurrence
+        timezone: IANA zone the wall-clock time is in, so occurrences stay
+                  at 09:00 across DST changes
+        recurrence_type, recurrence_pattern: Rule (same shapes as Booking)
+        recurrence_end_date: Last possible occurrence date; None = open-ended
+        materialised_through: Every occurrence starting before this instant
+            is already a Booking row (or was dropped); later ones are virtual
+    """
+
+    RECURRENCE_CHOICES = Booking.RECURRENCE_CHOICES
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    room = models.ForeignKey("rooms.Room", on_delete=models.CASCADE, related_name="booking_series")
+    organizer = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="organized_series"
+    )
+    title = models.CharField(max_length=500)
+    description = models.TextField(blank=True, default="")
+    attendee_count = models.IntegerField(default=1)
+
+    start_date = models.DateField()
+    start_time = models.TimeField()
+    duration = models.DurationField()
+    timezone = models.CharField(max_length=64)
+    recurrence_type = models.CharField(max_length=20, choices=RECURRENCE_CHOICES)
+    recurrence_pattern = models.JSONField(default=dict, blank=True)
+    recurrence_end_date = models.DateField(null=True, blank=True)
+    materialised_through = models.DateTimeField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "booking series"
+        indexes = [
+            models.Index(fields=["room", "recurrence_end_date"]),
+            models.Index(fields=["materialised_through"]),
+        ]
+
+    def __str__(self):
+        return f"↻ {self.title} ({self.recurrence_type} from {self.start_date})"
+
+
+class BookingSeriesAttendee(models.Model):
+    """Attendees of a series; copied onto each materialised occurrence."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    series = models.ForeignKey(BookingSeries, on_delete=models.CASCADE, related_name="series_attendees")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="attended_series"
+    )
+
+    class Meta:
+        unique_together = ("series", "user")
+        indexes = [
+            models.Index(fields=["user", "series"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user.name} → {self.series.title}"
@@ -0,0 +1,374 @@
+"""
+Virtual recurrence: expand BookingSeries rules on read.
+
+A series stores its rule, not its occurrences. Readers ask for a window and
+get the occurrences inside it as ``Occurrence`` objects shaped like Booking
+rows, so serializers and interval code treat both alike. An occurrence turns
+into a real Booking row when:
+
+  - it is overridden or cancelled (the row is the exception), or
+  - it comes within MATERIALISE_AHEAD of starting (``materialise_due``), so
+    check-in, auto-release and the analytics rollup see a row by the time
+    anything can happen to it.
+
+Materialised rows reuse the occurrence's deterministic id (``occurrence_id``),
+so an id handed out while the occurrence was virtual stays valid.
+
+Virtual occurrences aren't covered by the booking_no_overlap constraint;
+write paths call ``series_conflict`` inside their transaction instead, which
+locks the room row so a concurrent series creation can't interleave.
+"""
+import logging
+import uuid
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.db.models import Prefetch, Q
+
+from bookings.constants import BookingStatus
+from bookings.rrule import occurrence_dates
+
+logger = logging.getLogger(__name__)
+
+UTC = ZoneInfo("UTC")
+
+# Occurrences starting within this much of now are materialised as rows
+MATERIALISE_AHEAD = timedelta(days=1)
+
+# How far ahead an open-ended series is checked for conflicts on creation,
+# and listed when a listing has no stored bookings left to bound it
+SERIES_HORIZON = timedelta(days=366)
+
+
+# ---------------------------------------------------------------------------
+# Occurrence slots
+# ---------------------------------------------------------------------------
+
+def occurrence_id(series_id, start):
+    """Deterministic id of a series occurrence, kept when it is materialised."""
+    return uuid.uuid5(series_id, start.astimezone(UTC).isoformat())
+
+
+def series_slots(series, start=None, end=None):
+    """
+    Yield (start, end) of every rule occurrence of ``series`` that overlaps
+    [start, end), regardless of materialisation, as UTC datetimes.
+
+    ``start=None`` means from the anchor; ``end=None`` leaves the generator
+    bounded only by the series' end date and the rule's count / until. The
+    rule is expanded by bookings.rrule.
+    """
+    tz = ZoneInfo(series.timezone)
+    duration = series.duration
+    from_date = (start - duration).astimezone(tz).date() if start is not None else None
+    until = end.astimezone(tz).date() if end is not None else None
+    if series.recurrence_end_date is not None:
+        until = min(until, series.recurrence_end_date) if until is not None else series.recurrence_end_date
+    for day in occurrence_dates(
+        series.start_date, series.recurrence_type, series.recurrence_pattern, from_date, until,
+    ):
+        # In UTC: same-tzinfo arithmetic would ignore a DST change mid-slot
+        slot_start = datetime.combine(day, series.start_time, tzinfo=tz).astimezone(UTC)
+        slot_end = slot_start + duration
+        if start is not None and slot_end <= start:
+            continue
+        if end is not None and slot_start >= end:
+            return
+        yield slot_start, slot_end
+
+
+# ---------------------------------------------------------------------------
+# Virtual occurrences
+# ---------------------------------------------------------------------------
+
+class Occurrence:
+    """
+    A not-yet-materialised occurrence, with the Booking attributes that
+    readers (serializers, interval index, analytics) use.
+    """
+
+    status = BookingStatus.CONFIRMED.value
+    checked_in = False
+    checked_in_at = None
+    is_recurring = True
+    parent_booking_id = None
+    is_virtual = True
+
+    def __init__(self, series, start, end):
+        self.series = series
+        self.series_id = series.id
+        self.id = self.pk = occurrence_id(series.id, start)
+        self.occurrence_start = start
+        self.start_time = start
+        self.end_time = end
+        self.room_id = series.room_id
+        self.organizer_id = series.organizer_id
+        self.title = series.title
+        self.description = series.description
+        self.attendee_count = series.attendee_count
+        self.recurrence_type = series.recurrence_type
+
+    @property
+    def room(self):
+        return self.series.room
+
+    @property
+    def organizer(self):
+        return self.series.organizer
+
+    @property
+    def booking_attendees(self):
+        # Same interface as Booking.booking_attendees: .all() yields rows
+        # with user_id / user
+        return self.series.series_attendees
+
+    def __repr__(self):
+        return f"<Occurrence {self.series_id} {self.start_time.isoformat()}>"
+
+
+def _series_attendees_prefetch():
+    from bookings.models import BookingSeriesAttendee
+    from bookings.serializers import ATTENDEE_ORDERING
+
+    return Prefetch(
+        "series_attendees",
+        queryset=BookingSeriesAttendee.objects.select_related("user").order_by(*ATTENDEE_ORDERING),
+    )
+
+
+def active_series(start, end, room_ids=None, user=None, with_relations=False):
+    """
+    Series that may have virtual occurrences overlapping [start, end).
+
+    ``start=None`` means from each series' materialisation point. Date bounds
+    are padded by a day and refined per occurrence in Python.
+    """
+    from bookings.models import BookingSeries
+
+    qs = BookingSeries.objects.filter(materialised_through__lt=end, start_date__lte=end.date() + timedelta(days=1))
+    if start is not None:
+        qs = qs.filter(
+            Q(recurrence_end_date__isnull=True)
+            | Q(recurrence_end_date__gte=start.date() - timedelta(days=2))
+        )
+    if room_ids is not None:
+        qs = qs.filter(room_id__in=room_ids)
+    if user is not None:
+        qs = qs.filter(Q(organizer=user) | Q(series_attendees__user=user)).distinct()
+    if with_relations:
+        qs = qs.select_related("room", "organizer").prefetch_related(_series_attendees_prefetch())
+    return qs
+
+
+def virtual_occurrences(start, end, room_ids=None, user=None, with_relations=False, series=None):
+    """
+    Virtual occurrences overlapping [start, end), ordered by (start_time, id).
+
+    Two queries: the candidate series, and the exception rows (overrides,
+    cancellations) that suppress occurrences inside the window.
+
+    Args:
+        start: Window start (aware); None = from each series' materialisation
+        end: Window end (aware), required — open-ended series are infinite
+        room_ids: Optional room filter
+        user: Optional — only series the user organises or attends
+        with_relations: Load room, organizer and attendees for serialisation
+        series: Optional pre-fetched series list (skips the series query)
+    """
+    from bookings.models import Booking
+
+    if series is None:
+        series = list(active_series(start, end, room_ids, user, with_relations))
+    if not series:
+        return []
+
+    lower = min(s.materialised_through for s in series)
+    if start is not None:
+        lower = max(lower, start - max(s.duration for s in series))
+    taken = set(
+        Booking.objects
+        .filter(series__in=series, occurrence_start__gte=lower, occurrence_start__lt=end)
+        .values_list("series_id", "occurrence_start")
+    )
+
+    occurrences = []
+    for s in series:
+        window_start = max(start, s.materialised_through) if start is not None else s.materialised_through
+        for slot_start, slot_end in series_slots(s, window_start, end):
+            if slot_start < s.materialised_through or (s.id, slot_start) in taken:
+                continue
+            occurrences.append(Occurrence(s, slot_start, slot_end))
+    occurrences.sort(key=lambda o: (o.start_time, o.id))
+    return occurrences
+
+
+def lock_room(room_id):
+    """
+    Row-lock a room for the rest of the transaction.
+
+    Series creation and every booking write that checks ``series_conflict``
+    take this lock first, which serialises them per room.
+    """
+    from rooms.models import Room
+
+    list(Room.objects.select_for_update().filter(id=room_id).values_list("id", flat=True))
+
+
+def series_conflict(room_id, start, end):
+    """
+    True if a virtual series occurrence of ``room_id`` overlaps [start, end).
+
+    Call inside ``transaction.atomic()``: stored bookings are covered by the
+    exclusion constraint, virtual occurrences only by this check.
+    """
+    lock_room(room_id)
+    return bool(virtual_occurrences(start, end, room_ids=[room_id]))
+
+
+# ---------------------------------------------------------------------------
+# Materialisation
+# ---------------------------------------------------------------------------
+
+def occurrence_row(series, start, end, **overrides):
+    """An unsaved Booking for one occurrence, with the occurrence's id."""
+    from bookings.models import Booking
+
+    fields = dict(
+        id=occurrence_id(series.id, start),
+        room_id=series.room_id,
+        organizer_id=series.organizer_id,
+        title=series.title,
+        description=series.description,
+        attendee_count=series.attendee_count,
+        start_time=start,
+        end_time=end,
+        status=BookingStatus.CONFIRMED.value,
+        is_recurring=True,
+        recurrence_type=series.recurrence_type,
+        series=series,
+        occurrence_start=start,
+    )
+    fields.update(overrides)
+    return Booking(**fields)
+
+
+def materialise_series(series, until):
+    """
+    Store every virtual occurrence of ``series`` starting before ``until``.
+
+    Idempotent: rows use deterministic ids and ``ignore_conflicts``, so
+    concurrent runs don't fail the batch. An occurrence whose slot was taken
+    in the meantime (booking_no_overlap) is stored as a cancelled exception
+    instead, like the clashes skipped at series creation, and logged.
+
+    Returns:
+        int — occurrences stored as active bookings
+    """
+    from django.db import transaction
+    from bookings import intervals
+    from bookings.models import Booking
+    from bookings.utils import add_attendees, bump_bookings_generation, bump_room_versions
+
+    if series.materialised_through >= until:
+        return 0
+    occurrences = [
+        o for o in virtual_occurrences(series.materialised_through, until, series=[series])
+        if o.start_time < until
+    ]
+    created = []
+    with transaction.atomic():
+        if occurrences:
+            Booking.objects.bulk_create(
+                [occurrence_row(series, o.start_time, o.end_time) for o in occurrences],
+                ignore_conflicts=True,
+            )
+            created = list(Booking.objects.filter(id__in=[o.id for o in occurrences]))
+            stored = {booking.id for booking in created}
+            clashed = [o for o in occurrences if o.id not in stored]
+            if clashed:
+                logger.warning(
+                    "Series %s: %d occurrence(s) clash with existing bookings and were cancelled: %s",
+                    series.id, len(clashed), ", ".join(o.start_time.isoformat() for o in clashed),
+                )
+                Booking.objects.bulk_create(
+                    [
+                        occurrence_row(series, o.start_time, o.end_time, status=BookingStatus.CANCELLED.value)
+                        for o in clashed
+                    ],
+                    ignore_conflicts=True,
+                )
+            add_attendees(created, list(series.series_attendees.values_list("user_id", flat=True)))
+            # bulk_create sends no post_save: live indexes drop the clashed
+            # occurrences and pick up the stored ones
+            intervals.bookings_removed([o.id for o in clashed])
+            intervals.bookings_saved(created)
+            transaction.on_commit(bump_bookings_generation)
+            transaction.on_commit(lambda: bump_room_versions([series.room_id]))
+        series.materialised_through = until
+        series.save(update_fields=["materialised_through", "updated_at"])
+    return len(created)
+
+
+def materialise_due(now=None, rooms=None):
+    """
+    Materialise occurrences starting within MATERIALISE_AHEAD of ``now``.
+
+    Called from release_stale_bookings and RoomStateEngine, i.e. by the
+    auto_release cron and whenever a room's state is computed, so today's
+    occurrences are rows before anyone can check in to them. A due series is
+    materialised a further MATERIALISE_AHEAD at once, so polls find nothing
+    to do most of the time and the check is a single query.
+
+    Args:
+        now: Aware datetime (default: timezone.now())
+        rooms: Optional Rooms (or room ids) to restrict to; None = every room
+
+    Returns:
+        int — occurrences stored as active bookings
+    """
+    from django.utils import timezone
+    from bookings.models import BookingSeries
+
+    due = (now or timezone.now()) + MATERIALISE_AHEAD
+    qs = BookingSeries.objects.filter(materialised_through__lt=due).filter(
+        Q(recurrence_end_date__isnull=True)
+        | Q(recurrence_end_date__gte=due.date() - MATERIALISE_AHEAD - timedelta(days=1))
+    )
+    if rooms is not None:
+        qs = qs.filter(room__in=rooms)
+    return sum(materialise_series(series, due + MATERIALISE_AHEAD) for series in qs)
+
+
+def materialise_occurrence(series, start):
+    """
+    Return the Booking row for the occurrence of ``series`` starting at
+    ``start``, inserting it if it is still virtual.
+
+    Raises:
+        ValueError: if ``start`` is not an occurrence of the series
+        IntegrityError: if the slot has been taken by another booking
+    """
+    from bookings.models import Booking
+    from bookings.utils import add_attendees
+
+    row = Booking.objects.filter(series=series, occurrence_start=start).first()
+    if row is not None:
+        return row
+    slot = next(series_slots(series, start, start + timedelta(microseconds=1)), None)
+    if slot is None or slot[0] != start:
+        raise ValueError(f"{start.isoformat()} is not an occurrence of this series")
+    row = occurrence_row(series, slot[0], slot[1])
+    row.save(force_insert=True)
+    add_attendees([row], list(series.series_attendees.values_list("user_id", flat=True)))
+    return row
+
+
+def first_occurrence(series):
+    """(start, end) of the first rule occurrence, or None if the rule yields none."""
+    return next(series_slots(series), None)
+
+
+def local_anchor(start, tz):
+    """Split an aware start into the (date, wall-clock time) a series stores."""
+    local = start.astimezone(tz)
+    return local.date(), time(local.hour, local.minute, local.second)
@@ -0,0 +1,370 @@
+"""
+Recurrence rules: an RFC 5545 RRULE subset over the booking pattern dict.
+
+A rule is the (recurrence_type, recurrence_pattern) pair stored on
+BookingSeries. ``recurrence_type`` is the frequency (daily / weekly /
+monthly); the pattern holds the other rule parts:
+
+    interval        Every N days / weeks / months (INTERVAL, default 1)
+    days            Weekdays, 0=Monday … 6=Sunday (BYDAY). In a monthly rule
+                    an entry may be [n, weekday] for the nth weekday of the
+                    month, counted from the end when negative:
+                    [2, 1] = second Tuesday, [-1, 4] = last Friday
+    month_days      Days of the month, negative from the end (BYMONTHDAY);
+                    ``day_of_month`` is the older single-day spelling
+    set_positions   Keep only these positions among each period's dates,
+                    1-based, negative from the end (BYSETPOS)
+    count           At most this many occurrences (COUNT)
+    until           Last possible date, YYYY-MM-DD (UNTIL)
+
+Weekly rules need ``days``; monthly rules without ``days`` or
+``month_days`` fall on ``day_of_month`` (default 1). Otherwise the
+semantics are dateutil.rrule's (i.e. RFC 5545's) for the same parts, with
+weeks starting on Monday (WKST=MO): BYDAY and BYMONTHDAY expand a monthly
+period and limit a daily one, and an anchor date that doesn't match the
+rule is not an occurrence. One deliberate difference: a monthly BYDAY
+mixing plain and nth weekdays (``SU,2TU``) is their union, as RFC 5545
+reads; dateutil intersects them.
+
+``occurrence_dates`` is a generator that jumps straight to the first
+period at or after ``from_date`` and builds one period's dates at a time,
+so callers can stop at a window boundary and expanding a week of a
+ten-year-old series costs the same as expanding its first week.
+"""
+import calendar
+import re
+from datetime import date, timedelta
+
+from django.core.exceptions import ValidationError
+
+from bookings.constants import RecurrenceType
+
+DAILY = RecurrenceType.DAILY.value
+WEEKLY = RecurrenceType.WEEKLY.value
+MONTHLY = RecurrenceType.MONTHLY.value
+
+# The Gregorian calendar repeats every 400 years (146097 days, a whole
+# number of weeks). A rule stepping ``interval`` periods at a time is back in
+# phase after at most ``interval`` cycles, so one that yields nothing for
+# that long never will — e.g. the 30th of every February.
+GREGORIAN_CYCLE = timedelta(days=146097)
+
+WEEKDAY_CODES = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+_BYDAY = re.compile(r"^([+-]?\d{1,2})?(MO|TU|WE|TH|FR|SA|SU)$")
+_FREQUENCIES = {"DAILY": DAILY, "WEEKLY": WEEKLY, "MONTHLY": MONTHLY}
+
+
+# ---------------------------------------------------------------------------
+# Validation
+# ---------------------------------------------------------------------------
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _int_list(pattern, key, low, high):
+    values = pattern.get(key, [])
+    if not isinstance(values, list) or not all(
+        _is_int(v) and v != 0 and low <= abs(v) <= high for v in values
+    ):
+        raise ValidationError(f"{key} must be a list of non-zero whole numbers between -{high} and {high}")
+    return values
+
+
+def validate_rule(recurrence_type, pattern):
+    """
+    Raises:
+        ValidationError: if ``pattern`` is not valid for ``recurrence_type``
+    """
+    if recurrence_type not in (DAILY, WEEKLY, MONTHLY):
+        raise ValidationError(
+            f"Unsupported recurrence_type: '{recurrence_type}'. "
+            "Must be 'daily', 'weekly', or 'monthly'."
+        )
+    interval = pattern.get("interval", 1)
+    if not _is_int(interval) or interval < 1:
+        raise ValidationError("interval must be a whole number of at least 1")
+
+    days = pattern.get("days", [])
+    if not isinstance(days, list):
+        raise ValidationError("days must be a list")
+    for day in days:
+        if _is_int(day):
+            if not 0 <= day <= 6:
+                raise ValidationError("Days of week must be 0-6 (0=Monday, 6=Sunday)")
+        elif (
+            isinstance(day, list) and len(day) == 2 and all(_is_int(v) for v in day)
+            and 1 <= abs(day[0]) <= 5 and 0 <= day[1] <= 6
+        ):
+            if recurrence_type != MONTHLY:
+                raise ValidationError("[n, weekday] days are only valid in a monthly rule")
+        else:
+            raise ValidationError("Each day must be a weekday 0-6 or [n, weekday] with n in ±1..5")
+    if recurrence_type == WEEKLY and not days:
+        raise ValidationError("Weekly recurrence requires 'days' in pattern")
+
+    _int_list(pattern, "month_days", 1, 31)
+    if "day_of_month" in pattern:
+        day_of_month = pattern["day_of_month"]
+        if not _is_int(day_of_month) or not 1 <= day_of_month <= 31:
+            raise ValidationError("day_of_month must be 1-31")
+    _int_list(pattern, "set_positions", 1, 366)
+
+    count = pattern.get("count")
+    if count is not None and (not _is_int(count) or count < 1):
+        raise ValidationError("count must be a whole number of at least 1")
+    until = pattern.get("until")
+    if until is not None:
+        if count is not None:
+            raise ValidationError("count and until can't both be set")
+        try:
+            date.fromisoformat(until)
+        except (TypeError, ValueError):
+            raise ValidationError("until must be a YYYY-MM-DD date")
+
+
+# ---------------------------------------------------------------------------
+# RRULE text
+# ---------------------------------------------------------------------------
+
+def parse_rrule(text, start_date):
+    """
+    Parse an RRULE (``FREQ=MONTHLY;BYDAY=TU;BYSETPOS=2``, optionally with an
+    ``RRULE:`` prefix) into (recurrence_type, pattern).
+
+    Parts the rule leaves to DTSTART are filled in from ``start_date``: the
+    weekday of a weekly rule and the day of a monthly one.
+
+    Raises:
+        ValidationError: for malformed rules and parts outside the subset
+    """
+    text = text.strip()
+    if text.upper().startswith("RRULE:"):
+        text = text[len("RRULE:"):]
+    parts = {}
+    for item in filter(None, text.split(";")):
+        key, sep, value = item.partition("=")
+        key = key.strip().upper()
+        if not sep or not value or key in parts:
+            raise ValidationError(f"Malformed RRULE part: '{item}'")
+        parts[key] = value.strip().upper()
+
+    unsupported = set(parts) - {"FREQ", "INTERVAL", "BYDAY", "BYMONTHDAY", "BYSETPOS", "COUNT", "UNTIL", "WKST"}
+    if unsupported:
+        raise ValidationError(f"Unsupported RRULE part(s): {', '.join(sorted(unsupported))}")
+    if parts.get("WKST", "MO") != "MO":
+        raise ValidationError("Only WKST=MO is supported")
+    if parts.get("FREQ") not in _FREQUENCIES:
+        raise ValidationError("FREQ must be DAILY, WEEKLY or MONTHLY")
+    recurrence_type = _FREQUENCIES[parts["FREQ"]]
+
+    def ints(key):
+        try:
+            return [int(v) for v in parts[key].split(",")]
+        except ValueError:
+            raise ValidationError(f"{key} must be a list of integers")
+
+    pattern = {}
+    if "INTERVAL" in parts:
+        pattern["interval"] = ints("INTERVAL")[0]
+    if "BYDAY" in parts:
+        days = []
+        for code in parts["BYDAY"].split(","):
+            match = _BYDAY.match(code)
+            if not match:
+                raise ValidationError(f"Invalid BYDAY value: '{code}'")
+            weekday = WEEKDAY_CODES.index(match.group(2))
+            days.append([int(match.group(1)), weekday] if match.group(1) else weekday)
+        pattern["days"] = days
+    if "BYMONTHDAY" in parts:
+        pattern["month_days"] = ints("BYMONTHDAY")
+    if "BYSETPOS" in parts:
+        pattern["set_positions"] = ints("BYSETPOS")
+    if "COUNT" in parts:
+        pattern["count"] = ints("COUNT")[0]
+    if "UNTIL" in parts:
+        until = parts["UNTIL"]
+        if not re.match(r"^\d{8}(T\d{6}Z?)?$", until):
+            raise ValidationError("UNTIL must be YYYYMMDD or YYYYMMDDTHHMMSSZ")
+        pattern["until"] = f"{until[:4]}-{until[4:6]}-{until[6:8]}"
+
+    if recurrence_type == WEEKLY and "days" not in pattern:
+        pattern["days"] = [start_date.weekday()]
+    if recurrence_type == MONTHLY and "days" not in pattern and "month_days" not in pattern:
+        pattern["month_days"] = [start_date.day]
+
+    validate_rule(recurrence_type, pattern)
+    return recurrence_type, pattern
+
+
+def format_rrule(recurrence_type, pattern):
+    """The RRULE text for a rule, the inverse of ``parse_rrule``."""
+    _, weekdays, nth_days, month_days, positions = _rule_parts(recurrence_type, pattern)
+    parts = [f"FREQ={recurrence_type.upper()}"]
+    if pattern.get("interval", 1) != 1:
+        parts.append(f"INTERVAL={pattern['interval']}")
+    if weekdays or nth_days:
+        codes = [WEEKDAY_CODES[d] for d in weekdays] + [f"{n}{WEEKDAY_CODES[d]}" for n, d in nth_days]
+        parts.append(f"BYDAY={','.join(codes)}")
+    if month_days:
+        parts.append(f"BYMONTHDAY={','.join(map(str, month_days))}")
+    if positions:
+        parts.append(f"BYSETPOS={','.join(map(str, positions))}")
+    if pattern.get("count") is not None:
+        parts.append(f"COUNT={pattern['count']}")
+    if pattern.get("until"):
+        parts.append(f"UNTIL={pattern['until'].replace('-', '')}")
+    return ";".join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Expansion
+# ---------------------------------------------------------------------------
+
+def _rule_parts(recurrence_type, pattern):
+    """(interval, weekdays, nth_days, month_days, set_positions) of a valid rule."""
+    days = pattern.get("days", [])
+    weekdays = sorted({d for d in days if isinstance(d, int)})
+    nth_days = [tuple(d) for d in days if isinstance(d, list)]
+    month_days = list(pattern.get("month_days", []))
+    if recurrence_type == MONTHLY and not days and not month_days:
+        month_days = [pattern.get("day_of_month", 1)]
+    return pattern.get("interval", 1), weekdays, nth_days, month_days, pattern.get("set_positions", [])
+
+
+def _select(dates, positions):
+    """Apply BYSETPOS to one period's sorted dates."""
+    if not positions:
+        return dates
+    n = len(dates)
+    return sorted({dates[p - 1 if p > 0 else n + p] for p in positions if -n <= p <= n})
+
+
+def _month_dates(year, month, weekdays, nth_days, month_days):
+    """Sorted dates of one month matching BYDAY / BYMONTHDAY."""
+    first_weekday, month_length = calendar.monthrange(year, month)
+    by_day = by_month_day = None
+    if weekdays or nth_days:
+        by_day = set()
+        for weekday in weekdays:
+            by_day.update(range(1 + (weekday - first_weekday) % 7, month_length + 1, 7))
+        for n, weekday in nth_days:
+            if n > 0:
+                day = 1 + (weekday - first_weekday) % 7 + 7 * (n - 1)
+            else:
+                last_weekday = (first_weekday + month_length - 1) % 7
+                day = month_length - (last_weekday - weekday) % 7 + 7 * (n + 1)
+            if 1 <= day <= month_length:
+                by_day.add(day)
+    if month_days:
+        by_month_day = {d if d > 0 else month_length + 1 + d for d in month_days}
+        by_month_day = {d for d in by_month_day if 1 <= d <= month_length}
+    days = by_day & by_month_day if by_day is not None and by_month_day is not None else by_day or by_month_day
+    return [date(year, month, d) for d in sorted(days or ())]
+
+
+def _limits(day, weekdays, month_days):
+    """BYDAY / BYMONTHDAY as filters, for frequencies finer than a month."""
+    if weekdays and day.weekday() not in weekdays:
+        return False
+    if month_days:
+        month_length = calendar.monthrange(day.year, day.month)[1]
+        if day.day not in month_days and day.day - month_length - 1 not in month_days:
+            return False
+    return True
+
+
+def _periods(start_date, recurrence_type, pattern, from_date):
+    """
+    Yield (period start, the period's dates) from the first period that can
+    contain ``from_date``, stepping ``interval`` periods at a time. The date
+    list may be empty.
+    """
+    interval, weekdays, nth_days, month_days, positions = _rule_parts(recurrence_type, pattern)
+
+    if recurrence_type == DAILY:
+        day = start_date + timedelta(days=-(-(from_date - start_date).days // interval) * interval)
+        step = timedelta(days=interval)
+        while True:
+            yield day, _select([day], positions) if _limits(day, weekdays, month_days) else []
+            day += step
+
+    elif recurrence_type == WEEKLY:
+        anchor = start_date - timedelta(days=start_date.weekday())
+        weeks = (from_date - anchor).days // 7
+        monday = anchor + timedelta(weeks=-(-weeks // interval) * interval)
+        step = timedelta(weeks=interval)
+        while True:
+            week = [monday + timedelta(days=d) for d in weekdays]
+            if monday == anchor:
+                # The anchor's week starts at the anchor, as in dateutil,
+                # so BYSETPOS counts from there
+                week = [d for d in week if d >= start_date]
+            yield monday, _select([d for d in week if _limits(d, (), month_days)], positions)
+            monday += step
+
+    else:
+        months = (from_date.year - start_date.year) * 12 + from_date.month - start_date.month
+        index = start_date.year * 12 + start_date.month - 1 + -(-months // interval) * interval
+        while True:
+            year, month = divmod(index, 12)
+            yield (
+                date(year, month + 1, 1),
+                _select(_month_dates(year, month + 1, weekdays, nth_days, month_days), positions),
+            )
+            index += interval
+
+
+def occurrence_dates(start_date, recurrence_type, pattern, from_date=None, until=None):
+    """
+    Yield occurrence dates of a rule anchored at ``start_date``, in order.
+
+    Args:
+        start_date: Anchor (DTSTART); no occurrence is before it. Weekly
+                    intervals count weeks from the Monday of its week,
+                    monthly intervals months from its month.
+        recurrence_type, pattern: Rule (see validate_rule)
+        from_date: Skip occurrences before this date
+        until: Stop after this date (inclusive); None = bounded only by the
+               rule's own count / until
+    """
+    if pattern.get("until"):
+        rule_until = date.fromisoformat(pattern["until"])
+        until = min(until, rule_until) if until is not None else rule_until
+    count = pattern.get("count")
+    # COUNT numbers occurrences from the anchor, so a counted rule is walked
+    # from the start (the count bounds the walk)
+    first = start_date if count is not None else max(from_date or start_date, start_date)
+    give_up_after = GREGORIAN_CYCLE * pattern.get("interval", 1)
+
+    last_hit = first
+    produced = 0
+    for period_start, dates in _periods(start_date, recurrence_type, pattern, first):
+        if until is not None and period_start > until:
+            return
+        if period_start - last_hit > give_up_after:
+            return
+        for day in dates:
+            if day < first:
+                continue
+            if until is not None and day > until:
+                return
+            last_hit = day
+            produced += 1
+            if from_date is None or day >= from_date:
+                yield day
+            if count is not None and produced >= count:
+                return
+
+
+def last_occurrence_date(start_date, recurrence_type, pattern):
+    """
+    The last occurrence date of a rule bounded by its own count or until,
+    None if it is open-ended or yields nothing.
+    """
+    if pattern.get("count") is None and not pattern.get("until"):
+        return None
+    last = None
+    for last in occurrence_dates(start_date, recurrence_type, pattern):
+        pass
+    return last
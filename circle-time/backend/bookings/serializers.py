@@ -1,6 +1,8 @@
+from django.db.models import Prefetch, QuerySet, prefetch_related_objects
 from rest_framework import serializers
-from bookings.models import Booking, BookingAttendee
+from bookings.models import Booking, BookingAttendee, BookingSeries
 from bookings.constants import BookingStatus
+from bookings.rrule import format_rrule
 from accounts.serializers import UserSerializer
 
 
@@ -20,6 +22,87 @@ class AttendeeSerializer(serializers.ModelSerializer):
         return str(obj.user_id)
 
 
+# Shared instance so the fast path formats datetimes exactly like the
+# declared DateTimeFields (current timezone, "Z" for UTC)
+_datetime_field = serializers.DateTimeField()
+
+
+# Attendee order both paths share; without it each would get whatever
+# order its query plan happened to produce
+ATTENDEE_ORDERING = ("user__name", "user_id")
+
+
+def _attendees_prefetch():
+    return Prefetch(
+        "booking_attendees",
+        queryset=BookingAttendee.objects.select_related("user").order_by(*ATTENDEE_ORDERING),
+    )
+
+
+def with_list_relations(queryset):
+    """Load everything BookingSerializer reads in two queries in total."""
+    return queryset.select_related("room", "organizer").prefetch_related(_attendees_prefetch())
+
+
+class BookingListSerializer(serializers.ListSerializer):
+    """
+    List-optimised path for ``BookingSerializer(..., many=True)``.
+
+    The per-instance serializer costs one attendee query plus a lazy room
+    load per row, and DRF field dispatch on top. Here relations are loaded
+    in bulk and each row is built as a plain dict in the same key order and
+    value formats, so the rendered JSON is byte-identical.
+    """
+
+    def to_representation(self, data):
+        if isinstance(data, QuerySet):
+            bookings = list(with_list_relations(data))
+        else:
+            bookings = list(data)
+            # Virtual series occurrences arrive with their relations loaded
+            # (bookings.recurrence.virtual_occurrences(with_relations=True))
+            prefetch_related_objects(
+                [b for b in bookings if isinstance(b, Booking)],
+                "room", "organizer", _attendees_prefetch(),
+            )
+        to_datetime = _datetime_field.to_representation
+        rows = []
+        for booking in bookings:
+            organizer = booking.organizer
+            rows.append({
+                "id": str(booking.id),
+                "roomId": str(booking.room_id),
+                "roomName": booking.room.name,
+                "title": booking.title,
+                "description": booking.description,
+                "organizer": {
+                    "id": str(organizer.id),
+                    "name": organizer.name,
+                    "email": organizer.email,
+                    "role": organizer.role,
+                    "department": organizer.department,
+                },
+                "attendees": [
+                    {
+                        "id": str(a.user_id),
+                        "name": a.user.name,
+                        "email": a.user.email,
+                        "department": a.user.department,
+                    }
+                    for a in booking.booking_attendees.all()
+                ],
+                "startTime": to_datetime(booking.start_time),
+                "endTime": to_datetime(booking.end_time),
+                "status": booking.status,
+                "checkedIn": booking.checked_in,
+                "checkedInAt": to_datetime(booking.checked_in_at),
+                "isRecurring": booking.is_recurring,
+                "recurrenceType": booking.recurrence_type,
+                "seriesId": str(booking.series_id) if booking.series_id else None,
+            })
+        return rows
+
+
 class BookingSerializer(serializers.ModelSerializer):
     """
     Web-facing booking serializer.
@@ -37,6 +120,7 @@ class BookingSerializer(serializers.ModelSerializer):
     checkedInAt = serializers.DateTimeField(source="checked_in_at", read_only=True, allow_null=True)
     isRecurring = serializers.BooleanField(source="is_recurring", required=False, default=False)
     recurrenceType = serializers.CharField(source="recurrence_type", required=False, default="none")
+    seriesId = serializers.SerializerMethodField()
 
     class Meta:
         model = Booking
@@ -44,14 +128,18 @@ class BookingSerializer(serializers.ModelSerializer):
             "id", "roomId", "roomName", "title", "description",
             "organizer", "attendees", "startTime", "endTime",
             "status", "checkedIn", "checkedInAt",
-            "isRecurring", "recurrenceType",
+            "isRecurring", "recurrenceType", "seriesId",
         ]
+        list_serializer_class = BookingListSerializer
 
     def get_roomId(self, obj):
         return str(obj.room_id)
 
+    def get_seriesId(self, obj):
+        return str(obj.series_id) if obj.series_id else None
+
     def get_attendees(self, obj):
-        attendees = obj.booking_attendees.select_related("user").all()
+        attendees = obj.booking_attendees.select_related("user").order_by(*ATTENDEE_ORDERING)
         return [
             {
                 "id": str(a.user_id),
@@ -99,9 +187,12 @@ class RecurringBookingCreateSerializer(serializers.Serializer):
     """
     Validates recurring booking creation request.
     
-    Creates a parent booking and multiple child occurrences based on
-    recurrence pattern. The parent booking represents the first occurrence
-    and stores the recurrence pattern for future reference.
+    Creates a BookingSeries holding the recurrence rule; occurrences are
+    expanded on read (bookings.recurrence). Omit recurrenceEndDate for an
+    open-ended series. Occurrences keep the local wall-clock time of
+    startTime in the organisation timezone. The rule is either
+    recurrenceType + recurrencePattern or an ``rrule`` string (the subset in
+    bookings.rrule).
     
     Example request:
     {
@@ -125,15 +216,81 @@ class RecurringBookingCreateSerializer(serializers.Serializer):
         child=serializers.UUIDField(), required=False, default=list
     )
     recurrenceType = serializers.ChoiceField(
-        choices=["daily", "weekly", "monthly"],
+        choices=["daily", "weekly", "monthly"], required=False,
         help_text="Type of recurrence: daily, weekly, or monthly"
     )
     recurrenceEndDate = serializers.DateField(
-        help_text="Last date for recurring occurrences (inclusive)"
+        required=False, allow_null=True, default=None,
+        help_text="Last date for recurring occurrences (inclusive); omit for no end"
     )
     recurrencePattern = serializers.JSONField(
+        required=False, default=dict,
         help_text="Pattern details: {'days': [0,2,4], 'interval': 1} for weekly"
     )
+    rrule = serializers.CharField(
+        required=False, max_length=500,
+        help_text="RRULE text, e.g. 'FREQ=MONTHLY;BYDAY=TU;BYSETPOS=2'; replaces recurrenceType/Pattern"
+    )
+    attendeeCount = serializers.IntegerField(required=False, default=1, min_value=1, max_value=50)
+
+    def validate_recurrencePattern(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Must be an object")
+        return value
+
+    def validate(self, attrs):
+        if not attrs.get("rrule") and not attrs.get("recurrenceType"):
+            raise serializers.ValidationError({"recurrenceType": "Either recurrenceType or rrule is required"})
+        return attrs
+
+
+class BookingSeriesSerializer(serializers.ModelSerializer):
+    """Series rule plus the fields copied onto each occurrence."""
+    roomId = serializers.SerializerMethodField()
+    roomName = serializers.CharField(source="room.name", read_only=True)
+    organizer = UserSerializer(read_only=True)
+    attendees = serializers.SerializerMethodField()
+    startDate = serializers.DateField(source="start_date")
+    startTime = serializers.TimeField(source="start_time", format="%H:%M")
+    durationMinutes = serializers.SerializerMethodField()
+    recurrenceType = serializers.CharField(source="recurrence_type")
+    recurrencePattern = serializers.JSONField(source="recurrence_pattern")
+    recurrenceEndDate = serializers.DateField(source="recurrence_end_date", allow_null=True)
+    rrule = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BookingSeries
+        fields = [
+            "id", "roomId", "roomName", "title", "description", "organizer",
+            "attendees", "startDate", "startTime", "durationMinutes", "timezone",
+            "recurrenceType", "recurrencePattern", "recurrenceEndDate", "rrule",
+        ]
+
+    def get_roomId(self, obj):
+        return str(obj.room_id)
+
+    def get_rrule(self, obj):
+        return format_rrule(obj.recurrence_type, obj.recurrence_pattern)
+
+    def get_durationMinutes(self, obj):
+        return int(obj.duration.total_seconds() // 60)
+
+    def get_attendees(self, obj):
+        attendees = obj.series_attendees.select_related("user").order_by(*ATTENDEE_ORDERING)
+        return [
+            {
+                "id": str(a.user_id),
+                "name": a.user.name,
+                "email": a.user.email,
+                "department": a.user.department,
+            }
+            for a in attendees
+        ]
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data["id"] = str(data["id"])
+        return data
 
 
 class BookingExtensionSerializer(serializers.Serializer):
@@ -0,0 +1,81 @@
+"""
+Booking model signal receivers.
+
+Any row-level write to a booking, a booking series or their attendees bumps the bookings write
+generation (see bookings.utils.bump_bookings_generation) so cached analytics
+computed from the old data stop being served, and booking and series writes
+are mirrored into live IntervalIndex instances. Booking, Room and
+organisation settings writes also move the room versions (see
+bookings.utils.get_room_versions) that per-room caches are keyed on. Bulk ``bulk_create()`` and
+``QuerySet.update()`` calls skip these signals and must bump the generation
+and update the indexes (bookings.intervals) themselves.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bookings import intervals
+from bookings.models import Booking, BookingAttendee, BookingSeries, BookingSeriesAttendee
+from bookings.utils import ORGANISATION, ROOM_LIST, bump_bookings_generation, bump_room_versions
+from organisation.models import OrganisationSettings
+from rooms.models import Room
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+@receiver(post_save, sender=BookingAttendee)
+@receiver(post_delete, sender=BookingAttendee)
+@receiver(post_save, sender=BookingSeries)
+@receiver(post_delete, sender=BookingSeries)
+@receiver(post_save, sender=BookingSeriesAttendee)
+@receiver(post_delete, sender=BookingSeriesAttendee)
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+@receiver(post_save, sender=OrganisationSettings)
+def _bookings_changed(sender, **kwargs):
+    # Bump after commit so a concurrent reader can't cache pre-commit data
+    # under the new generation.
+    transaction.on_commit(bump_bookings_generation)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def _room_bookings_changed(sender, instance, **kwargs):
+    room_id = instance.room_id
+    transaction.on_commit(lambda: bump_room_versions([room_id]))
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def _room_changed(sender, instance, **kwargs):
+    room_id = instance.pk
+    transaction.on_commit(lambda: bump_room_versions([room_id, ROOM_LIST]))
+
+
+@receiver(post_save, sender=OrganisationSettings)
+def _settings_changed(sender, **kwargs):
+    transaction.on_commit(lambda: bump_room_versions([ORGANISATION]))
+
+
+@receiver(post_save, sender=Booking)
+def _booking_saved(sender, instance, **kwargs):
+    intervals.booking_saved(instance)
+
+
+@receiver(post_delete, sender=Booking)
+def _booking_deleted(sender, instance, **kwargs):
+    intervals.booking_deleted(instance)
+
+
+@receiver(post_save, sender=BookingSeries)
+def _series_saved(sender, instance, update_fields=None, **kwargs):
+    # Materialising only turns virtual occurrences into rows with the same
+    # ids and times; materialise_series reports those rows itself
+    if update_fields is not None and set(update_fields) <= {"materialised_through", "updated_at"}:
+        return
+    intervals.series_changed(instance.room_id)
+
+
+@receiver(post_delete, sender=BookingSeries)
+def _series_deleted(sender, instance, **kwargs):
+    intervals.series_changed(instance.room_id)
@@ -0,0 +1,503 @@
+import random
+import warnings
+from datetime import date, datetime, timedelta
+from itertools import islice
+from unittest import skipUnless
+from zoneinfo import ZoneInfo
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from bookings.constants import BookingStatus
+from bookings.intervals import IntervalIndex
+from bookings.models import Booking, BookingAttendee, BookingSeries
+from bookings.pagination import (
+    InvalidCursor,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    parse_page_size,
+)
+from bookings.recurrence import first_occurrence, materialise_due, materialise_series
+from bookings.rrule import format_rrule, last_occurrence_date, occurrence_dates, parse_rrule, validate_rule
+from bookings.utils import is_booking_overlap, release_stale_bookings
+from organisation.models import OrganisationSettings
+from rooms.models import Room
+
+try:
+    from dateutil.rrule import rrulestr
+except ImportError:  # test dependency, see requirements-dev.txt
+    rrulestr = None
+
+
+class BookingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="user@example.com", password="x")
+        self.room = Room.objects.create(name="Boardroom", building="HQ", floor=1, capacity=6)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.start = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+
+    def book(self, start, end, room=None, **fields):
+        return Booking.objects.create(
+            room=room or self.room, title="Sync", organizer=self.user,
+            start_time=start, end_time=end, **fields,
+        )
+
+    def make_series(self, start_date, hour=9, recurrence_type="daily", pattern=None, room=None, **fields):
+        """A series of one-hour occurrences at ``hour`` Johannesburg time, nothing materialised."""
+        series = BookingSeries(
+            room=room or self.room, organizer=self.user, title="Standup",
+            start_date=start_date, start_time=datetime.min.time().replace(hour=hour),
+            duration=timedelta(hours=1), timezone="Africa/Johannesburg",
+            recurrence_type=recurrence_type, recurrence_pattern=pattern or {}, **fields,
+        )
+        series.materialised_through = first_occurrence(series)[0]
+        series.save()
+        return series
+
+
+@skipUnless(connection.vendor == "postgresql", "booking_no_overlap is a PostgreSQL exclusion constraint")
+class OverlapConstraintTests(BookingTestCase):
+    def test_overlapping_insert_violates_booking_no_overlap(self):
+        self.book(self.start, self.start + timedelta(hours=1))
+        with self.assertRaises(IntegrityError) as raised, transaction.atomic():
+            self.book(self.start + timedelta(minutes=30), self.start + timedelta(hours=2))
+        self.assertEqual(raised.exception.__cause__.diag.constraint_name, "booking_no_overlap")
+        self.assertTrue(is_booking_overlap(raised.exception))
+
+    def test_back_to_back_bookings_are_allowed(self):
+        self.book(self.start, self.start + timedelta(hours=1))
+        self.book(self.start + timedelta(hours=1), self.start + timedelta(hours=2))
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_other_rooms_and_inactive_bookings_are_ignored(self):
+        other = Room.objects.create(name="Huddle", building="HQ", floor=1, capacity=2)
+        end = self.start + timedelta(hours=1)
+        self.book(self.start, end)
+        self.book(self.start, end, room=other)
+        self.book(self.start, end, status=BookingStatus.CANCELLED.value)
+        self.book(self.start, end, status=BookingStatus.NO_SHOW.value)
+        self.assertEqual(Booking.objects.count(), 4)
+
+    def test_reactivating_into_a_taken_slot_is_rejected(self):
+        self.book(self.start, self.start + timedelta(hours=1))
+        cancelled = self.book(
+            self.start, self.start + timedelta(hours=1), status=BookingStatus.CANCELLED.value,
+        )
+        cancelled.status = BookingStatus.CONFIRMED.value
+        with self.assertRaises(IntegrityError) as raised, transaction.atomic():
+            cancelled.save()
+        self.assertTrue(is_booking_overlap(raised.exception))
+
+    def test_create_endpoint_returns_409_on_overlap(self):
+        self.book(self.start, self.start + timedelta(hours=1))
+        response = self.client.post("/api/bookings", {
+            "roomId": str(self.room.id),
+            "title": "Clash",
+            "startTime": (self.start + timedelta(minutes=30)).isoformat(),
+            "endTime": (self.start + timedelta(minutes=90)).isoformat(),
+        }, format="json")
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(response.data["success"])
+        self.assertEqual(Booking.objects.count(), 1)
+
+
+class IntervalIndexTests(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tz = ZoneInfo("Africa/Johannesburg")
+        self.day = (timezone.now() + timedelta(days=3)).astimezone(self.tz).date()
+
+    def at(self, hour, day=None):
+        day = day or self.day
+        return datetime(day.year, day.month, day.day, hour, tzinfo=self.tz)
+
+    def index(self, start=None, end=None):
+        return IntervalIndex(start or self.at(0), end or self.at(23), room_ids=[self.room.id])
+
+    def test_conflicts_and_free_gaps(self):
+        self.book(self.at(9), self.at(10))
+        self.book(self.at(12), self.at(13))
+        index = self.index()
+        self.assertTrue(index.conflicts(self.room.id, self.at(9), self.at(11)))
+        self.assertFalse(index.conflicts(self.room.id, self.at(10), self.at(12)))
+        self.assertEqual(
+            index.free_gaps(self.room.id, (self.at(8), self.at(14)), timedelta(hours=1)),
+            [(self.at(8), self.at(9)), (self.at(10), self.at(12)), (self.at(13), self.at(14))],
+        )
+
+    def test_probes_outside_the_window_or_rooms_are_rejected(self):
+        index = self.index()
+        with self.assertRaises(ValueError):
+            index.conflicts(self.room.id, self.at(22), self.at(23) + timedelta(hours=1))
+        with self.assertRaises(KeyError):
+            index.conflicts(Room.objects.create(name="X", building="HQ", floor=1, capacity=2).id,
+                            self.at(9), self.at(10))
+
+    def test_loaded_index_follows_saves_and_deletes(self):
+        index = self.index()
+        self.assertFalse(index.conflicts(self.room.id, self.at(9), self.at(10)))
+        booking = self.book(self.at(9), self.at(10))
+        self.assertTrue(index.conflicts(self.room.id, self.at(9), self.at(10)))
+        booking.start_time, booking.end_time = self.at(14), self.at(15)
+        booking.save()
+        self.assertFalse(index.conflicts(self.room.id, self.at(9), self.at(10)))
+        self.assertTrue(index.conflicts(self.room.id, self.at(14), self.at(15)))
+        booking.delete()
+        self.assertEqual(index.busy(self.room.id, self.at(0), self.at(23)), [])
+
+    def test_released_bookings_leave_loaded_indexes(self):
+        start = timezone.now() - timedelta(minutes=OrganisationSettings.get().auto_release_minutes + 5)
+        booking = self.book(start, start + timedelta(hours=1))
+        index = IntervalIndex(start, start + timedelta(hours=1), room_ids=[self.room.id])
+        self.assertTrue(index.conflicts(self.room.id, start, start + timedelta(hours=1)))
+        self.assertEqual(release_stale_bookings(room=self.room), 1)
+        self.assertFalse(index.conflicts(self.room.id, start, start + timedelta(hours=1)))
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, BookingStatus.NO_SHOW.value)
+
+    def test_ending_a_series_clears_its_occurrences_from_loaded_indexes(self):
+        series = self.make_series(self.day - timedelta(days=2))
+        materialise_series(series, self.at(0))
+        index = IntervalIndex(self.at(0, self.day - timedelta(days=2)), self.at(23), room_ids=[self.room.id])
+        # One materialised future occurrence, one virtual
+        self.assertEqual(len(index.busy(self.room.id, index.start, index.end)), 3)
+        self.client.force_authenticate(self.user)
+        response = self.client.delete(f"/api/bookings/series/{series.id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(index.busy(self.room.id, index.start, index.end), [])
+
+    def test_materialising_drops_occurrences_whose_slot_was_taken(self):
+        series = self.make_series(self.day)
+        index = self.index()
+        occurrence = index.busy(self.room.id, self.at(9), self.at(10))
+        self.assertEqual(len(occurrence), 1)
+        # Written while the occurrence was still virtual
+        taken = self.book(self.at(9), self.at(10))
+        with self.assertLogs("bookings.recurrence", level="WARNING"):
+            materialise_series(series, self.at(23))
+        self.assertEqual(index.busy(self.room.id, self.at(9), self.at(10)), [(self.at(9), self.at(10), taken.id)])
+
+
+class KeysetPaginationTests(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.rooms = [self.room] + [
+            Room.objects.create(name=f"Room {n}", building="HQ", floor=1, capacity=4) for n in range(2)
+        ]
+        # Three bookings share every start time, so pages break inside ties
+        for hour in range(5):
+            for room in self.rooms:
+                self.book(self.start + timedelta(hours=hour), self.start + timedelta(hours=hour, minutes=30), room=room)
+
+    def walk(self, fetch):
+        """Follow nextCursor from the first page; returns every page."""
+        pages, cursor = [], None
+        while True:
+            page, cursor = fetch(cursor)
+            pages.append(page)
+            if cursor is None:
+                return pages
+
+    def test_cursor_round_trip(self):
+        booking = Booking.objects.first()
+        self.assertEqual(decode_cursor(encode_cursor(booking.start_time, booking.id)), (booking.start_time, booking.id))
+
+    def test_malformed_cursors_are_rejected(self):
+        naive = encode_cursor(datetime(2026, 10, 17, 9), Booking.objects.first().id)
+        for cursor in ("not-a-cursor", "!!!", naive, encode_cursor(self.start, "not-a-uuid")):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                decode_cursor(cursor)
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(parse_page_size("0"), 1)
+        self.assertEqual(parse_page_size("10000"), MAX_PAGE_SIZE)
+        self.assertEqual(parse_page_size("abc"), 50)
+        self.assertEqual(parse_page_size(None, default=20), 20)
+
+    def test_pages_cover_every_row_once_in_key_order(self):
+        pages = self.walk(lambda cursor: paginate(Booking.objects.all(), cursor, 4))
+        self.assertEqual([len(page) for page in pages], [4, 4, 4, 3])
+        keys = [(b.start_time, b.id) for page in pages for b in page]
+        self.assertEqual(keys, sorted(Booking.objects.values_list("start_time", "id")))
+
+    def test_exact_multiple_of_the_page_size_ends_without_a_cursor(self):
+        page, cursor = paginate(Booking.objects.all(), None, 15)
+        self.assertEqual(len(page), 15)
+        self.assertIsNone(cursor)
+
+    def test_later_pages_cost_the_same_queries(self):
+        _, cursor = paginate(Booking.objects.all(), None, 2)
+        for _ in range(4):
+            with self.assertNumQueries(1):
+                _, cursor = paginate(Booking.objects.all(), cursor, 2)
+
+    def test_room_listing_merges_virtual_occurrences(self):
+        self.make_series(self.start.astimezone(ZoneInfo("Africa/Johannesburg")).date(), hour=6,
+                         recurrence_end_date=(self.start + timedelta(days=3)).date())
+
+        def fetch(cursor):
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = self.client.get(f"/api/rooms/{self.room.id}/bookings", params)
+            self.assertEqual(response.status_code, 200)
+            return response.data["data"], response.data["nextCursor"]
+
+        items = [item for page in self.walk(fetch) for item in page]
+        ids = [item["id"] for item in items]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(ids), 5 + 4)
+        self.assertEqual(ids, [item["id"] for item in sorted(items, key=lambda i: (i["startTime"], i["id"]))])
+
+    def test_my_bookings_pages_organised_and_attended_without_duplicates(self):
+        other = User.objects.create_user(email="other@example.com", password="x")
+        for booking in Booking.objects.filter(room=self.rooms[1]):
+            booking.organizer = other
+            booking.save()
+            BookingAttendee.objects.create(booking=booking, user=self.user)
+        # Organised and attended: listed once
+        BookingAttendee.objects.create(booking=Booking.objects.filter(room=self.room).first(), user=self.user)
+
+        def fetch(cursor):
+            params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+            response = self.client.get("/api/bookings/mine", params)
+            self.assertEqual(response.status_code, 200)
+            return [item["id"] for item in response.data["data"]], response.data["nextCursor"]
+
+        ids = [booking_id for page in self.walk(fetch) for booking_id in page]
+        expected = Booking.objects.filter(organizer=self.user).count() + 5
+        self.assertEqual(len(ids), expected)
+        self.assertEqual(len(set(ids)), expected)
+
+    def test_invalid_cursor_is_a_400(self):
+        response = self.client.get(f"/api/rooms/{self.room.id}/bookings", {"cursor": "garbage"})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.data["success"])
+
+
+class MaterialiseTests(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tz = ZoneInfo("Africa/Johannesburg")
+        self.day = (timezone.now() + timedelta(days=5)).astimezone(self.tz).date()
+
+    def at(self, hour, day=None):
+        day = day or self.day
+        return datetime(day.year, day.month, day.day, hour, tzinfo=self.tz)
+
+    def test_occurrences_become_rows_with_their_ids(self):
+        series = self.make_series(self.day)
+        self.assertEqual(materialise_series(series, self.at(10, self.day + timedelta(days=2))), 3)
+        rows = Booking.objects.filter(series=series).order_by("start_time")
+        self.assertEqual([row.start_time for row in rows],
+                         [self.at(9, self.day + timedelta(days=n)) for n in range(3)])
+        self.assertTrue(all(row.status == BookingStatus.CONFIRMED.value for row in rows))
+        # Idempotent
+        self.assertEqual(materialise_series(series, self.at(10, self.day + timedelta(days=2))), 0)
+
+    def test_taken_slots_are_recorded_as_cancelled_exceptions(self):
+        series = self.make_series(self.day)
+        taken = self.book(self.at(9, self.day + timedelta(days=1)), self.at(10, self.day + timedelta(days=1)))
+        with self.assertLogs("bookings.recurrence", level="WARNING") as logs:
+            stored = materialise_series(series, self.at(12, self.day + timedelta(days=2)))
+        self.assertEqual(stored, 2)
+        self.assertIn(str(series.id), logs.output[0])
+        clashed = Booking.objects.get(series=series, occurrence_start=taken.start_time)
+        self.assertEqual(clashed.status, BookingStatus.CANCELLED.value)
+        series.refresh_from_db()
+        self.assertEqual(series.materialised_through, self.at(12, self.day + timedelta(days=2)))
+
+    def test_materialise_due_is_limited_to_the_given_rooms(self):
+        other = Room.objects.create(name="Huddle", building="HQ", floor=1, capacity=2)
+        today = timezone.now().astimezone(self.tz).date()
+        here = self.make_series(today)
+        there = self.make_series(today, room=other)
+        materialise_due(rooms=[self.room])
+        self.assertTrue(Booking.objects.filter(series=here).exists())
+        self.assertFalse(Booking.objects.filter(series=there).exists())
+        materialise_due()
+        self.assertTrue(Booking.objects.filter(series=there).exists())
+
+
+class CreateRecurringBookingTests(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tz = ZoneInfo("Africa/Johannesburg")
+        day = (timezone.now() + timedelta(days=5)).astimezone(self.tz).date()
+        self.first = datetime(day.year, day.month, day.day, 9, tzinfo=self.tz)
+
+    def create(self, **fields):
+        return self.client.post("/api/bookings/recurring", {
+            "roomId": str(self.room.id),
+            "title": "Standup",
+            "startTime": self.first.isoformat(),
+            "endTime": (self.first + timedelta(hours=1)).isoformat(),
+            "recurrenceType": "daily",
+            "recurrencePattern": {"interval": 1},
+            **fields,
+        }, format="json")
+
+    def test_created_count_leaves_out_skipped_occurrences(self):
+        taken = self.first + timedelta(days=1)
+        self.book(taken, taken + timedelta(hours=1))
+        end = self.first.date() + timedelta(days=4)
+        response = self.create(recurrenceEndDate=end.isoformat())
+        self.assertEqual(response.status_code, 201)
+        data = response.json()["data"]
+        self.assertEqual(data["createdCount"], 4)
+        self.assertEqual(data["skippedDates"], [taken.date().isoformat()])
+        self.assertEqual(data["seriesId"], data["series"]["id"])
+
+    def test_open_ended_series_counts_stored_occurrences(self):
+        # Starts within MATERIALISE_AHEAD, so the first occurrence is stored at once
+        self.first = self.start - timedelta(days=1) + timedelta(hours=1)
+        response = self.create()
+        self.assertEqual(response.status_code, 201)
+        data = response.json()["data"]
+        stored = Booking.objects.filter(series_id=data["seriesId"], status=BookingStatus.CONFIRMED.value)
+        self.assertGreater(data["createdCount"], 0)
+        self.assertEqual(data["createdCount"], stored.count())
+
+
+class RecurrenceRuleTests(SimpleTestCase):
+    start = date(2026, 1, 1)  # a Thursday
+
+    def dates(self, recurrence_type, pattern, n=4, start=None, **kwargs):
+        return list(islice(occurrence_dates(start or self.start, recurrence_type, pattern, **kwargs), n))
+
+    def test_daily_interval(self):
+        self.assertEqual(self.dates("daily", {"interval": 2}, 3),
+                         [date(2026, 1, 1), date(2026, 1, 3), date(2026, 1, 5)])
+
+    def test_weekly_days_skip_the_anchor_when_it_does_not_match(self):
+        self.assertEqual(self.dates("weekly", {"days": [0, 2]}),
+                         [date(2026, 1, 5), date(2026, 1, 7), date(2026, 1, 12), date(2026, 1, 14)])
+
+    def test_monthly_nth_weekdays(self):
+        # Second Tuesday and last Friday
+        self.assertEqual(self.dates("monthly", {"days": [[2, 1], [-1, 4]]}),
+                         [date(2026, 1, 13), date(2026, 1, 30), date(2026, 2, 10), date(2026, 2, 27)])
+
+    def test_monthly_day_missing_from_short_months_is_skipped(self):
+        self.assertEqual(self.dates("monthly", {"month_days": [31]}, 3),
+                         [date(2026, 1, 31), date(2026, 3, 31), date(2026, 5, 31)])
+
+    def test_set_positions_pick_the_last_weekday_of_the_month(self):
+        self.assertEqual(self.dates("monthly", {"days": [0, 1, 2, 3, 4], "set_positions": [-1]}, 3),
+                         [date(2026, 1, 30), date(2026, 2, 27), date(2026, 3, 31)])
+
+    def test_count_and_until_bound_the_rule(self):
+        self.assertEqual(self.dates("daily", {"count": 3}, 10),
+                         [date(2026, 1, 1), date(2026, 1, 2), date(2026, 1, 3)])
+        self.assertEqual(self.dates("weekly", {"days": [3], "until": "2026-01-15"}, 10),
+                         [date(2026, 1, 1), date(2026, 1, 8), date(2026, 1, 15)])
+
+    def test_count_is_numbered_from_the_anchor_not_the_window(self):
+        self.assertEqual(self.dates("daily", {"count": 5}, 10, from_date=date(2026, 1, 4)),
+                         [date(2026, 1, 4), date(2026, 1, 5)])
+
+    def test_window_far_into_a_long_series(self):
+        from_date = date(2035, 12, 25)
+        self.assertEqual(
+            list(occurrence_dates(self.start, "weekly", {"days": [0], "interval": 2}, from_date, date(2036, 1, 31))),
+            [date(2035, 12, 31), date(2036, 1, 14), date(2036, 1, 28)],
+        )
+
+    def test_rule_that_never_matches_yields_nothing(self):
+        # The 30th of every February
+        self.assertEqual(self.dates("monthly", {"interval": 12, "month_days": [30]}, start=date(2026, 2, 1)), [])
+
+    def test_last_occurrence_date(self):
+        self.assertEqual(last_occurrence_date(self.start, "monthly", {"days": [[2, 1], [-1, 4]], "count": 4}),
+                         date(2026, 2, 27))
+        self.assertIsNone(last_occurrence_date(self.start, "daily", {}))
+
+    def test_rrule_text_round_trip(self):
+        rule = parse_rrule("RRULE:FREQ=MONTHLY;BYDAY=2TU,-1FR;COUNT=4", self.start)
+        self.assertEqual(rule, ("monthly", {"days": [[2, 1], [-1, 4]], "count": 4}))
+        self.assertEqual(format_rrule(*rule), "FREQ=MONTHLY;BYDAY=2TU,-1FR;COUNT=4")
+        self.assertEqual(parse_rrule("FREQ=WEEKLY;UNTIL=20261231T000000Z", self.start),
+                         ("weekly", {"until": "2026-12-31", "days": [3]}))
+
+    def test_invalid_rules_are_rejected(self):
+        for text in ("FREQ=YEARLY", "FREQ=DAILY;BYHOUR=9", "FREQ=DAILY;WKST=SU", "FREQ=DAILY;COUNT=2;UNTIL=20260301",
+                     "FREQ=WEEKLY;BYDAY=2TU", "FREQ=MONTHLY;BYDAY=XX", "FREQ=DAILY;INTERVAL=0"):
+            with self.subTest(text=text), self.assertRaises(ValidationError):
+                parse_rrule(text, self.start)
+        with self.assertRaises(ValidationError):
+            validate_rule("weekly", {})
+
+
+def _random_rule(rng):
+    recurrence_type = rng.choice(["daily", "weekly", "monthly"])
+    pattern = {"interval": rng.choice([1, 1, 2, 3, 4])}
+    if recurrence_type == "weekly" or rng.random() < 0.3:
+        pattern["days"] = rng.sample(range(7), rng.randint(1, 3))
+    if recurrence_type == "monthly" and rng.random() < 0.5:
+        # Not mixed with plain weekdays: dateutil intersects the two kinds
+        # where RFC 5545 (and bookings.rrule) takes their union
+        pattern["days"] = [[rng.choice([1, 2, 3, 4, 5, -1, -2]), rng.randrange(7)] for _ in range(rng.randint(1, 2))]
+    # Rules whose periods are mostly empty (nth weekdays limited by month
+    # days, set positions past the period's size) are left out: dateutil only
+    # checks UNTIL against dates it produces, so it searches those up to
+    # year 9999
+    nth = any(isinstance(d, list) for d in pattern.get("days", []))
+    if not nth and rng.random() < 0.4:
+        pattern["month_days"] = rng.sample([1, 2, 15, 28, 29, 30, 31, -1, -2, -7], rng.randint(1, 3))
+    limited_week = recurrence_type == "weekly" and "month_days" in pattern
+    if recurrence_type != "daily" and not limited_week and rng.random() < 0.3:
+        size = min(len(pattern.get("days") or pattern.get("month_days") or [1]), 2)
+        pattern["set_positions"] = rng.sample([1, -1, 2, -2][:2 * size], rng.randint(1, 2))
+    bound = rng.random()
+    if bound < 0.3:
+        pattern["count"] = rng.randint(1, 40)
+    elif bound < 0.6:
+        pattern["until"] = (date(2026, 1, 1) + timedelta(days=rng.randint(0, 900))).isoformat()
+    return recurrence_type, pattern
+
+
+@skipUnless(rrulestr is not None, "python-dateutil is not installed (requirements-dev.txt)")
+class RecurrenceRuleDateutilTests(SimpleTestCase):
+    RULES = 2000
+
+    def test_random_rules_match_dateutil(self):
+        rng = random.Random(0)
+        checked = 0
+        while checked < self.RULES:
+            recurrence_type, pattern = _random_rule(rng)
+            try:
+                validate_rule(recurrence_type, pattern)
+            except ValidationError:
+                continue
+            start = date(2026, 1, 1) + timedelta(days=rng.randint(0, 365))
+            window_start = start + timedelta(days=rng.randint(-30, 400))
+            window_end = window_start + timedelta(days=rng.randint(0, 200))
+            text = format_rrule(recurrence_type, pattern)
+            reference = rrulestr(text, dtstart=datetime.combine(start, datetime.min.time()))
+            # Bound dateutil by the window so it stops once past it. It still
+            # honours UNTIL next to COUNT, only with a deprecation warning.
+            bound = window_end
+            if pattern.get("until"):
+                bound = min(bound, date.fromisoformat(pattern["until"]))
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", DeprecationWarning)
+                reference = reference.replace(until=datetime.combine(bound, datetime.min.time()))
+            expected = [
+                d.date() for d in reference.between(
+                    datetime.combine(window_start, datetime.min.time()),
+                    datetime.combine(window_end, datetime.min.time()),
+                    inc=True,
+                )
+            ]
+            with self.subTest(rule=text, start=start, window=(window_start, window_end)):
+                self.assertEqual(
+                    list(occurrence_dates(start, recurrence_type, pattern, window_start, window_end)), expected,
+                )
+            checked += 1
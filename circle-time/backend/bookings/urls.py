@@ -1,8 +1,12 @@
 from django.urls import path
 from bookings.views import (
     room_bookings,
+    bookings_grid,
+    my_bookings,
     create_booking,
     create_recurring_booking,
+    series_detail,
+    series_occurrence,
     extend_booking,
     booking_detail,
     checkin_booking,
@@ -13,7 +17,15 @@ from bookings.views import (
 urlpatterns = [
     path("rooms/<uuid:room_id>/bookings", room_bookings, name="room-bookings"),
     path("bookings", create_booking, name="bookings-create"),
+    path("bookings/mine", my_bookings, name="bookings-mine"),
+    path("bookings/grid", bookings_grid, name="bookings-grid"),
     path("bookings/recurring", create_recurring_booking, name="bookings-create-recurring"),
+    path("bookings/series/<uuid:series_id>", series_detail, name="bookings-series-detail"),
+    path(
+        "bookings/series/<uuid:series_id>/occurrences/<str:occurrence_start>",
+        series_occurrence,
+        name="bookings-series-occurrence",
+    ),
     path("bookings/trigger-auto-release", trigger_auto_release, name="bookings-trigger-auto-release"),
     # PUT + DELETE on the same path, dispatched by HTTP method
     path("bookings/<uuid:booking_id>", booking_detail, name="bookings-detail"),
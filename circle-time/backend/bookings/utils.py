@@ -6,10 +6,21 @@ recurring booking generation, and conflict detection.
 """
 from datetime import datetime, date, timedelta
 from typing import Optional
+import time
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 import pytz
 
+BOOKINGS_GENERATION_KEY = "bookings:generation"
+ROOM_VERSION_KEY = "bookings:room_version:{}"
+
+# Pseudo rooms in the room-version space: ORGANISATION moves with
+# organisation settings writes and is folded into every room's version;
+# ROOM_LIST moves with every Room write, for caches of which rooms exist
+ORGANISATION = "organisation"
+ROOM_LIST = "list"
+
 
 def parse_date(date_str: str) -> date:
     """
@@ -89,22 +100,26 @@ def generate_recurring_dates(
 ) -> list[date]:
     """
     Generate list of dates for recurring bookings.
-    
+
+    List wrapper around bookings.rrule.occurrence_dates, which callers that
+    can stop early should iterate directly.
+
     Args:
-        start_date: First occurrence date
+        start_date: First possible occurrence date
         end_date: Last possible occurrence date (inclusive)
-        recurrence_type: One of "daily", "weekly", "monthly", "custom"
-        pattern: Recurrence pattern dictionary with type-specific keys:
+        recurrence_type: One of "daily", "weekly", "monthly"
+        pattern: Recurrence pattern dictionary (see bookings.rrule), e.g.:
             - daily: {"interval": 1}  # every N days
             - weekly: {"days": [0, 2, 4], "interval": 1}  # Mon/Wed/Fri, 0=Monday
             - monthly: {"day_of_month": 15, "interval": 1}  # 15th of every N months
-            
+            - monthly: {"days": [[2, 1]]}  # second Tuesday
+
     Returns:
         list[date]: List of date objects for all occurrences
-        
+
     Raises:
-        ValidationError: If pattern is invalid or would generate too many dates
-        
+        ValidationError: If the pattern is invalid
+
     Example:
         >>> generate_recurring_dates(
         ...     date(2026, 2, 17),
@@ -112,100 +127,14 @@ def generate_recurring_dates(
         ...     "weekly",
         ...     {"days": [0, 2], "interval": 1}  # Monday and Wednesday
         ... )
-        [date(2026, 2, 17), date(2026, 2, 19), date(2026, 2, 23), ...]
+        [date(2026, 2, 18), date(2026, 2, 23), date(2026, 2, 25), ...]
     """
+    from bookings.rrule import occurrence_dates, validate_rule
+
     if start_date > end_date:
         raise ValidationError("start_date must be before or equal to end_date")
-    
-    dates = []
-    current = start_date
-    max_iterations = 1000  # Safety limit to prevent infinite loops
-    iteration_count = 0
-    
-    if recurrence_type == "daily":
-        interval = pattern.get("interval", 1)
-        if interval < 1:
-            raise ValidationError("Daily interval must be at least 1")
-        
-        while current <= end_date:
-            dates.append(current)
-            current += timedelta(days=interval)
-            iteration_count += 1
-            
-            if iteration_count > max_iterations:
-                raise ValidationError(f"Too many recurrences (max {max_iterations})")
-    
-    elif recurrence_type == "weekly":
-        days_of_week = pattern.get("days", [])  # 0=Monday, 6=Sunday
-        interval = pattern.get("interval", 1)
-        
-        if not days_of_week:
-            raise ValidationError("Weekly recurrence requires 'days' in pattern")
-        if not all(0 <= day <= 6 for day in days_of_week):
-            raise ValidationError("Days of week must be 0-6 (0=Monday, 6=Sunday)")
-        if interval < 1:
-            raise ValidationError("Weekly interval must be at least 1")
-        
-        week_count = 0
-        current_week_start = start_date - timedelta(days=start_date.weekday())
-        
-        while current <= end_date:
-            if current.weekday() in days_of_week and current >= start_date:
-                dates.append(current)
-            
-            current += timedelta(days=1)
-            iteration_count += 1
-            
-            # Start of new week (Monday)
-            if current.weekday() == 0:
-                week_count += 1
-                # Skip weeks based on interval
-                if interval > 1 and week_count % interval != 0:
-                    current += timedelta(days=7 * (interval - 1))
-            
-            if iteration_count > max_iterations:
-                raise ValidationError(f"Too many recurrences (max {max_iterations})")
-    
-    elif recurrence_type == "monthly":
-        day_of_month = pattern.get("day_of_month", 1)
-        interval = pattern.get("interval", 1)
-        
-        if not (1 <= day_of_month <= 31):
-            raise ValidationError("day_of_month must be 1-31")
-        if interval < 1:
-            raise ValidationError("Monthly interval must be at least 1")
-        
-        current_year = start_date.year
-        current_month = start_date.month
-        
-        while True:
-            try:
-                occurrence = date(current_year, current_month, day_of_month)
-                if occurrence >= start_date and occurrence <= end_date:
-                    dates.append(occurrence)
-                elif occurrence > end_date:
-                    break
-            except ValueError:
-                # Invalid day for this month (e.g., Feb 30)
-                pass
-            
-            # Move to next month with interval
-            current_month += interval
-            while current_month > 12:
-                current_year += 1
-                current_month -= 12
-            
-            iteration_count += 1
-            if iteration_count > max_iterations:
-                raise ValidationError(f"Too many recurrences (max {max_iterations})")
-    
-    else:
-        raise ValidationError(
-            f"Unsupported recurrence_type: '{recurrence_type}'. "
-            "Must be 'daily', 'weekly', or 'monthly'."
-        )
-    
-    return dates
+    validate_rule(recurrence_type, pattern)
+    return list(occurrence_dates(start_date, recurrence_type, pattern, until=end_date))
 
 
 def check_booking_conflicts(
@@ -268,6 +197,119 @@ def check_booking_conflicts(
     return qs.exists()
 
 
+def is_booking_overlap(exc) -> bool:
+    """
+    True if an IntegrityError was raised by the booking_no_overlap constraint.
+
+    Write paths insert/update first and map this to the usual 409, instead of
+    a racy check_booking_conflicts() round trip beforehand.
+    """
+    from bookings.models import BOOKING_OVERLAP_CONSTRAINT
+
+    diag = getattr(exc.__cause__, "diag", None)
+    return getattr(diag, "constraint_name", None) == BOOKING_OVERLAP_CONSTRAINT
+
+
+def sweep_conflicts(candidates, busy):
+    """
+    Resolve conflicts for many proposed slots against one room's bookings.
+
+    In-memory counterpart of check_booking_conflicts for series creation:
+    ``busy`` is fetched once, then a single sorted sweep decides every
+    candidate. Accepted candidates become busy too, so occurrences of the
+    same series never overlap each other.
+
+    Args:
+        candidates: List of (start, end) tuples, sorted by start
+        busy: Iterable of (start, end) tuples for existing active bookings
+
+    Returns:
+        list[bool]: True for each candidate that conflicts (should be skipped)
+    """
+    # Merge existing bookings into disjoint sorted intervals
+    merged = []
+    for start, end in sorted(busy):
+        if merged and start < merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    conflicts = []
+    i = 0
+    last_accepted_end = None
+    for start, end in candidates:
+        # Intervals ending at or before this start can't overlap it or any later one
+        while i < len(merged) and merged[i][1] <= start:
+            i += 1
+        clash = (i < len(merged) and merged[i][0] < end) or (
+            last_accepted_end is not None and start < last_accepted_end
+        )
+        conflicts.append(clash)
+        if not clash:
+            last_accepted_end = end
+    return conflicts
+
+
+# ---------------------------------------------------------------------------
+# Attendees: bulk writes shared by every booking write path
+# ---------------------------------------------------------------------------
+
+def resolve_attendees(attendee_ids):
+    """
+    Split requested attendee ids into known users and unknown ids, with one
+    query however many ids are sent.
+
+    Args:
+        attendee_ids: Iterable of user UUIDs (duplicates are ignored)
+
+    Returns:
+        (known, unknown) — known is a list of user UUIDs in request order;
+        unknown is a list of the remaining ids as strings
+    """
+    from accounts.models import User
+
+    requested = list(dict.fromkeys(attendee_ids))
+    existing = set(User.objects.filter(id__in=requested).values_list("id", flat=True))
+    known = [uid for uid in requested if uid in existing]
+    unknown = [str(uid) for uid in requested if uid not in existing]
+    return known, unknown
+
+
+def add_attendees(bookings, user_ids):
+    """
+    Attach every user in ``user_ids`` to every booking in ``bookings`` with
+    one INSERT. Existing memberships are left alone (ignore_conflicts).
+    """
+    from django.db import transaction
+    from bookings.models import BookingAttendee
+
+    rows = [
+        BookingAttendee(booking=booking, user_id=user_id)
+        for booking in bookings
+        for user_id in user_ids
+    ]
+    if rows:
+        BookingAttendee.objects.bulk_create(rows, ignore_conflicts=True)
+        # bulk_create sends no post_save, so the analytics cache wouldn't notice
+        transaction.on_commit(bump_bookings_generation)
+
+
+def set_attendees(booking, user_ids):
+    """
+    Make ``user_ids`` the attendee list of ``booking``, touching only the
+    rows that change: one DELETE for removed users, one INSERT for new ones.
+    """
+    from bookings.models import BookingAttendee
+
+    current = set(booking.booking_attendees.values_list("user_id", flat=True))
+    wanted = set(user_ids)
+    removed = current - wanted
+    if removed:
+        # Queryset delete still sends post_delete per row, which bumps the generation
+        BookingAttendee.objects.filter(booking=booking, user_id__in=removed).delete()
+    add_attendees([booking], [uid for uid in user_ids if uid not in current])
+
+
 # ---------------------------------------------------------------------------
 # Auto-release: mark stale confirmed bookings as no_show
 # ---------------------------------------------------------------------------
@@ -289,12 +331,19 @@ def release_stale_bookings(room=None):
     from bookings.models import Booking
     from bookings.constants import BookingStatus
     from organisation.models import OrganisationSettings
+    from bookings import intervals
     from bookings.emails import send_no_show_notification
 
+    from bookings.recurrence import materialise_due
+
     logger = logging.getLogger(__name__)
     org = OrganisationSettings.get()
     window = org.auto_release_minutes
     now = timezone.now()
+
+    # Series occurrences about to start become rows first, so they can be
+    # released like any other booking
+    materialise_due(now=now, rooms=[room] if room is not None else None)
     cutoff = now - timedelta(minutes=window)
 
     qs = Booking.objects.filter(
@@ -309,11 +358,80 @@ def release_stale_bookings(room=None):
 
     count = qs.count()
     if count:
+        released, rooms = [], set()
         for booking in qs:
+            released.append(booking.id)
+            rooms.add(booking.room_id)
             try:
                 send_no_show_notification(booking)
             except Exception:
                 logger.warning("Failed to send no-show email for booking %s", booking.id)
-        qs.update(status=BookingStatus.NO_SHOW.value)
+        # Bulk update bypasses auto_now, so bump updated_at explicitly for the analytics rollup
+        Booking.objects.filter(id__in=released).update(status=BookingStatus.NO_SHOW.value, updated_at=now)
+        bump_bookings_generation()
+        bump_room_versions(rooms)
+        intervals.bookings_removed(released)
         logger.info("Auto-released %d booking(s) as no-show", count)
     return count
+
+
+def get_bookings_generation() -> int:
+    """
+    Return the current bookings write generation.
+
+    The generation changes whenever booking data changes, so it can be folded
+    into cache keys: a bump makes every entry keyed on the old value
+    unreachable without having to find and delete them.
+    """
+    generation = cache.get(BOOKINGS_GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock rather than 0 so that an evicted counter never
+        # rewinds onto a generation that still has cached entries.
+        cache.add(BOOKINGS_GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(BOOKINGS_GENERATION_KEY)
+    return generation
+
+
+def bump_bookings_generation() -> None:
+    """Invalidate everything cached against the current bookings generation."""
+    try:
+        cache.incr(BOOKINGS_GENERATION_KEY)
+    except ValueError:
+        # Counter missing (cold cache or evicted) — seeding is enough.
+        cache.add(BOOKINGS_GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def get_room_versions(room_ids) -> dict:
+    """
+    Return the write version of each room, for keys of per-room caches.
+
+    Unlike the bookings generation, a room's version only moves with writes
+    that concern it (bump_room_versions): its bookings, the room itself, its
+    panel registrations, plus organisation settings writes, which move every
+    room's version. One cache round trip for any number of rooms.
+
+    Returns:
+        dict mapping room_id → version string
+    """
+    names = [ORGANISATION, *room_ids]
+    keys = {name: ROOM_VERSION_KEY.format(name) for name in names}
+    found = cache.get_many(keys.values())
+    missing = [key for key in keys.values() if key not in found]
+    if missing:
+        # Seeded from the clock, as the bookings generation is
+        seed = time.time_ns()
+        for key in missing:
+            cache.add(key, seed, timeout=None)
+        found.update(cache.get_many(missing))
+    organisation = found[keys[ORGANISATION]]
+    return {room_id: f"{organisation}.{found[keys[room_id]]}" for room_id in room_ids}
+
+
+def bump_room_versions(room_ids) -> None:
+    """Invalidate everything cached against the current versions of these rooms."""
+    for room_id in set(room_ids):
+        key = ROOM_VERSION_KEY.format(room_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
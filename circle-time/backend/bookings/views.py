@@ -1,23 +1,59 @@
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-from datetime import timedelta
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 
-from bookings.models import Booking, BookingAttendee, BookingExtension
+from bookings import intervals
+from bookings.models import Booking, BookingExtension, BookingSeries, BookingSeriesAttendee
 from bookings.serializers import (
     BookingSerializer,
     BookingCreateSerializer,
     BookingUpdateSerializer,
     RecurringBookingCreateSerializer,
     BookingExtensionSerializer,
+    BookingSeriesSerializer,
 )
 from bookings.constants import BookingStatus, RecurrenceType, BookingDefaults
-from bookings.utils import check_booking_conflicts, generate_recurring_dates
+from bookings.pagination import (
+    InvalidCursor,
+    after_cursor,
+    encode_cursor,
+    paginate,
+    parse_page_size,
+    with_virtual,
+)
+from bookings.recurrence import (
+    MATERIALISE_AHEAD,
+    SERIES_HORIZON,
+    Occurrence,
+    first_occurrence,
+    local_anchor,
+    lock_room,
+    materialise_occurrence,
+    materialise_series,
+    occurrence_row,
+    series_conflict,
+    series_slots,
+    virtual_occurrences,
+)
+from bookings.rrule import last_occurrence_date, parse_rrule, validate_rule
+from bookings.utils import (
+    add_attendees,
+    bump_bookings_generation,
+    bump_room_versions,
+    check_booking_conflicts,
+    is_booking_overlap,
+    resolve_attendees,
+    set_attendees,
+    sweep_conflicts,
+)
 from rooms.models import Room
 from providers.gateway import get_provider
-from accounts.models import User
 
 
 # ---------------------------------------------------------------------------
@@ -41,7 +77,17 @@ def _check_overlap(room_id, start, end, exclude_booking_id=None):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def room_bookings(request, room_id):
-    """List bookings for a room on a given date (web-facing: organizer=User object)."""
+    """
+    List bookings for a room (web-facing: organizer=User object).
+
+    Query params:
+      date    YYYY-MM-DD — only bookings starting that day
+      limit   Page size (default 50, max 200)
+      cursor  nextCursor from the previous page
+
+    Keyset-paginated on (start_time, id); ``nextCursor`` is null on the
+    last page.
+    """
     date_str = request.query_params.get("date")
 
     try:
@@ -53,20 +99,243 @@ def room_bookings(request, room_id):
         )
 
     qs = Booking.objects.filter(room=room).select_related("organizer")
+    day_start = day_end = None
     if date_str:
         try:
-            from datetime import datetime
             target = datetime.strptime(date_str, "%Y-%m-%d").date()
-            qs = qs.filter(start_time__date=target)
         except ValueError:
             return Response(
                 {"success": False, "message": "Invalid date format. Use YYYY-MM-DD."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        # A plain range (not start_time__date) so the (room, start_time, id)
+        # index applies
+        tz = timezone.get_current_timezone()
+        day_start = datetime.combine(target, datetime.min.time(), tzinfo=tz)
+        day_end = datetime.combine(target + timedelta(days=1), datetime.min.time(), tzinfo=tz)
+        qs = qs.filter(start_time__gte=day_start, start_time__lt=day_end)
 
     qs = qs.exclude(status="cancelled")
-    serializer = BookingSerializer(qs, many=True)
-    return Response({"success": True, "data": serializer.data})
+
+    def virtual(lower, upper):
+        if day_start is not None:
+            lower = max(lower, day_start) if lower else day_start
+            upper = min(upper, day_end)
+            if lower >= upper:
+                return []
+        occurrences = virtual_occurrences(lower, upper, room_ids=[room.id], with_relations=True)
+        return [o for o in occurrences if lower is None or o.start_time >= lower]
+
+    try:
+        page, next_cursor = paginate(
+            qs, request.query_params.get("cursor"), parse_page_size(request.query_params.get("limit")),
+            virtual=virtual,
+        )
+    except InvalidCursor as exc:
+        return Response(
+            {"success": False, "message": str(exc)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    serializer = BookingSerializer(page, many=True)
+    return Response({"success": True, "data": serializer.data, "nextCursor": next_cursor})
+
+
+# ---------------------------------------------------------------------------
+# GET /api/bookings/mine
+# ---------------------------------------------------------------------------
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def my_bookings(request):
+    """
+    Upcoming and in-progress bookings the current user organises or attends.
+
+    Query params:
+      limit   Page size (default 50, max 200)
+      cursor  nextCursor from the previous page
+
+    Organizer and attendee memberships are two index range scans — on
+    (organizer, start_time, id) and (user, booking) — combined with UNION
+    rather than one OR across the attendee join, which the planner can only
+    answer by scanning the user's whole history. Each branch stops after
+    ``limit + 1`` rows, so a page costs the same however many bookings the
+    user has accumulated.
+    """
+    limit = parse_page_size(request.query_params.get("limit"))
+    cursor = request.query_params.get("cursor")
+    now = timezone.now()
+
+    def branch(qs):
+        qs = qs.filter(end_time__gt=now).exclude(status=BookingStatus.CANCELLED.value)
+        return after_cursor(qs, cursor).order_by("start_time", "id").values_list("start_time", "id")[:limit + 1]
+
+    def virtual(lower, upper):
+        return virtual_occurrences(max(lower, now) if lower else now, upper, user=request.user, with_relations=True)
+
+    try:
+        keys = list(
+            branch(Booking.objects.filter(organizer=request.user))
+            .union(branch(Booking.objects.filter(booking_attendees__user=request.user)))
+            .order_by("start_time", "id")[:limit + 1]
+        )
+        # Series occurrences not yet stored; keys become a mix of
+        # (start_time, id) tuples and Occurrence objects
+        keys = with_virtual(keys, cursor, limit, virtual)
+    except InvalidCursor as exc:
+        return Response(
+            {"success": False, "message": str(exc)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    next_cursor = None
+    if len(keys) > limit:
+        last = keys[limit - 1]
+        next_cursor = encode_cursor(*last) if isinstance(last, tuple) else encode_cursor(last.start_time, last.id)
+    keys = keys[:limit]
+    stored = Booking.objects.filter(
+        id__in=[key[1] for key in keys if isinstance(key, tuple)]
+    ).select_related("room", "organizer")
+    page = list(stored) + [key for key in keys if not isinstance(key, tuple)]
+    serializer = BookingSerializer(sorted(page, key=lambda b: (b.start_time, b.id)), many=True)
+    return Response({"success": True, "data": serializer.data, "nextCursor": next_cursor})
+
+
+# ---------------------------------------------------------------------------
+# GET /api/bookings/grid?roomIds=&from=&to=
+# ---------------------------------------------------------------------------
+
+GRID_MAX_ROOMS = 100
+GRID_MAX_DAYS = 31
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def bookings_grid(request):
+    """
+    Calendar grid: bookings of many rooms over several days in one response.
+
+    Query params:
+      roomIds   Comma-separated room UUIDs (required, max 100)
+      from, to  YYYY-MM-DD, inclusive, organisation-local days (max 31 days)
+
+    Runs three queries whatever the number of rooms: organisation settings,
+    rooms, and a single range scan of bookings (``start_time < to AND
+    end_time > from``) that can use the (room, start_time, id) index — plus
+    the series expansion (bookings.recurrence), a fixed three more when any
+    series is active in range. A booking spanning midnight is listed under
+    every day it touches.
+
+    Returns:
+        { from, to, days: [date, ...],
+          rooms: [{ id, name, days: { date: [booking, ...] } }, ...] }
+        where each booking is the compact { id, title, startTime, endTime,
+        status, checkedIn, organizerId, organizerName, isRecurring,
+        seriesId }.
+    """
+    import uuid
+    from organisation.models import OrganisationSettings
+
+    raw_ids = [r.strip() for r in (request.query_params.get("roomIds") or "").split(",") if r.strip()]
+    if not raw_ids:
+        return Response(
+            {"success": False, "message": "roomIds query parameter is required"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        room_ids = list(dict.fromkeys(uuid.UUID(r) for r in raw_ids))
+    except ValueError:
+        return Response(
+            {"success": False, "message": "roomIds must be comma-separated UUIDs"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if len(room_ids) > GRID_MAX_ROOMS:
+        return Response(
+            {"success": False, "message": f"At most {GRID_MAX_ROOMS} rooms per request"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        start_date = datetime.strptime(request.query_params.get("from", ""), "%Y-%m-%d").date()
+        end_date = datetime.strptime(request.query_params.get("to", ""), "%Y-%m-%d").date()
+    except ValueError:
+        return Response(
+            {"success": False, "message": "from and to are required. Use YYYY-MM-DD."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if end_date < start_date:
+        return Response(
+            {"success": False, "message": "from must not be after to"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    n_days = (end_date - start_date).days + 1
+    if n_days > GRID_MAX_DAYS:
+        return Response(
+            {"success": False, "message": f"Range is limited to {GRID_MAX_DAYS} days"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    tz = OrganisationSettings.get().get_tzinfo()
+    range_start = datetime.combine(start_date, datetime.min.time(), tzinfo=tz)
+    range_end = datetime.combine(end_date + timedelta(days=1), datetime.min.time(), tzinfo=tz)
+    days = [(start_date + timedelta(days=i)).isoformat() for i in range(n_days)]
+
+    rooms = {
+        room_id: {"id": str(room_id), "name": name, "days": {day: [] for day in days}}
+        for room_id, name in Room.objects.filter(id__in=room_ids).values_list("id", "name")
+    }
+    missing = [str(r) for r in room_ids if r not in rooms]
+    if missing:
+        return Response(
+            {"success": False, "message": f"Room not found: {', '.join(missing)}"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    bookings = list(
+        Booking.objects
+        .filter(room_id__in=room_ids, start_time__lt=range_end, end_time__gt=range_start)
+        .exclude(status=BookingStatus.CANCELLED.value)
+        .values_list(
+            "id", "room_id", "title", "start_time", "end_time", "status",
+            "checked_in", "organizer_id", "organizer__name", "is_recurring", "series_id",
+        )
+    )
+    bookings += [
+        (o.id, o.room_id, o.title, o.start_time, o.end_time, o.status,
+         o.checked_in, o.organizer_id, o.organizer.name, o.is_recurring, o.series_id)
+        for o in virtual_occurrences(range_start, range_end, room_ids=room_ids, with_relations=True)
+    ]
+    bookings.sort(key=lambda row: (row[1], row[3]))
+    for (booking_id, room_id, title, start, end, booking_status,
+         checked_in, organizer_id, organizer_name, is_recurring, series_id) in bookings:
+        entry = {
+            "id": str(booking_id),
+            "title": title,
+            "startTime": start.astimezone(tz).isoformat(),
+            "endTime": end.astimezone(tz).isoformat(),
+            "status": booking_status,
+            "checkedIn": checked_in,
+            "organizerId": str(organizer_id),
+            "organizerName": organizer_name,
+            "isRecurring": is_recurring,
+            "seriesId": str(series_id) if series_id else None,
+        }
+        # Every local day the booking touches, clipped to the range
+        day = max(start.astimezone(tz).date(), start_date)
+        last = min((end - timedelta(microseconds=1)).astimezone(tz).date(), end_date)
+        room_days = rooms[room_id]["days"]
+        while day <= last:
+            room_days[day.isoformat()].append(entry)
+            day += timedelta(days=1)
+
+    return Response({
+        "success": True,
+        "data": {
+            "from": start_date.isoformat(),
+            "to": end_date.isoformat(),
+            "days": days,
+            "rooms": [rooms[room_id] for room_id in room_ids],
+        },
+    })
 
 
 # ---------------------------------------------------------------------------
@@ -79,7 +348,7 @@ def create_booking(request):
     """
     Create a single booking. Enforces time-overlap conflicts → 409.
     Uses the provider gateway for external calendar sync.
-    Uses BookingStatus enum and check_booking_conflicts utility.
+    Overlaps are rejected by the booking_no_overlap exclusion constraint.
     """
     ser = BookingCreateSerializer(data=request.data)
     if not ser.is_valid():
@@ -113,43 +382,47 @@ def create_booking(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    # Conflict check using utility (server-enforced — web client relies on this)
-    if check_booking_conflicts(room_id, start, end):
+    attendees, unknown_attendees = resolve_attendees(data.get("attendeeIds", []))
+
+    # Insert first; the exclusion constraint is the conflict check
+    # (server-enforced — web client relies on this). The provider is only
+    # called once the slot is ours, and a provider failure rolls it back.
+    try:
+        with transaction.atomic():
+            # Virtual series occurrences aren't covered by the constraint
+            if series_conflict(room.id, start, end):
+                return Response(
+                    {"success": False, "message": "Room is already booked for the requested time slot."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            booking = Booking.objects.create(
+                room=room,
+                title=data["title"],
+                description=data.get("description", ""),
+                organizer=request.user,
+                start_time=start,
+                end_time=end,
+                status=BookingStatus.CONFIRMED.value,
+                attendee_count=data.get("attendeeCount", 1),
+            )
+            add_attendees([booking], attendees)
+
+            # Provider gateway — sync to external calendar if not local
+            provider = get_provider()
+            provider.create_event({
+                "room_id": str(room_id),
+                "title": data["title"],
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+            })
+    except IntegrityError as e:
+        if not is_booking_overlap(e):
+            raise
         return Response(
             {"success": False, "message": "Room is already booked for the requested time slot."},
             status=status.HTTP_409_CONFLICT,
         )
 
-    # Provider gateway — sync to external calendar if not local
-    provider = get_provider()
-    provider.create_event({
-        "room_id": str(room_id),
-        "title": data["title"],
-        "start": start.isoformat(),
-        "end": end.isoformat(),
-    })
-
-    # Create booking with status enum
-    booking = Booking.objects.create(
-        room=room,
-        title=data["title"],
-        description=data.get("description", ""),
-        organizer=request.user,
-        start_time=start,
-        end_time=end,
-        status=BookingStatus.CONFIRMED.value,
-        attendee_count=data.get("attendeeCount", 1),
-    )
-
-    # Attach attendees
-    attendee_ids = data.get("attendeeIds", [])
-    for uid in attendee_ids:
-        try:
-            user = User.objects.get(id=uid)
-            BookingAttendee.objects.create(booking=booking, user=user)
-        except Exception:
-            pass
-
     serializer = BookingSerializer(booking)
 
     # Send confirmation email (fire-and-forget)
@@ -157,7 +430,7 @@ def create_booking(request):
     send_booking_confirmation(booking)
 
     return Response(
-        {"success": True, "data": serializer.data},
+        {"success": True, "data": serializer.data, "unknownAttendeeIds": unknown_attendees},
         status=status.HTTP_201_CREATED,
     )
 
@@ -172,17 +445,25 @@ def create_recurring_booking(request):
     """
     Create a recurring booking series.
     
-    Creates a parent booking (first occurrence) and child bookings for
-    each subsequent occurrence. Skips dates that have conflicts.
+    Stores the rule as a BookingSeries; occurrences are expanded on read and
+    only become Booking rows when they are edited, cancelled or about to
+    start (bookings.recurrence). Occurrences that clash with an existing
+    booking or series are skipped (stored as cancelled exceptions). Omit
+    recurrenceEndDate for an open-ended series; its first SERIES_HORIZON of
+    occurrences is checked for conflicts.
+
+    ``createdCount`` is the number of occurrences accepted (not skipped), or
+    for an open-ended series, the number stored as bookings so far.
     
     Returns:
         {
             "success": true,
             "data": {
-                "parentBookingId": "uuid",
-                "createdCount": 12,
+                "seriesId": "uuid",
+                "createdCount": 8,
                 "skippedDates": ["2026-03-15", "2026-04-12"],
-                "parent": {...booking object...}
+                "series": {...series object...},
+                "firstOccurrence": {...booking object...}
             }
         }
     
@@ -206,9 +487,7 @@ def create_recurring_booking(request):
     room_id = data["roomId"]
     start = data["startTime"]
     end = data["endTime"]
-    recurrence_type = data["recurrenceType"]
     recurrence_end_date = data["recurrenceEndDate"]
-    recurrence_pattern = data["recurrencePattern"]
 
     # Validate room exists
     try:
@@ -226,132 +505,233 @@ def create_recurring_booking(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    # Generate occurrence dates
-    try:
-        occurrence_dates = generate_recurring_dates(
-            start_date=start.date(),
-            end_date=recurrence_end_date,
-            recurrence_type=recurrence_type,
-            pattern=recurrence_pattern,
-        )
-    except Exception as e:
-        return Response(
-            {"success": False, "message": f"Invalid recurrence pattern: {str(e)}"},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-
-    # Validate we have at least one occurrence
-    if not occurrence_dates:
-        return Response(
-            {"success": False, "message": "No occurrences generated from recurrence pattern"},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
+    # Occurrences repeat the local wall-clock time, across DST changes
+    from organisation.models import OrganisationSettings
+    tz = OrganisationSettings.get().get_tzinfo()
+    start_date, start_time = local_anchor(start, tz)
 
-    # Validate max 52 occurrences (one year of weekly meetings)
-    if len(occurrence_dates) > 52:
+    try:
+        if data.get("rrule"):
+            recurrence_type, recurrence_pattern = parse_rrule(data["rrule"], start_date)
+        else:
+            recurrence_type, recurrence_pattern = data["recurrenceType"], data["recurrencePattern"]
+            validate_rule(recurrence_type, recurrence_pattern)
+    except ValidationError as e:
         return Response(
-            {
-                "success": False,
-                "message": f"Too many occurrences ({len(occurrence_dates)}). Maximum is 52. "
-                          f"Please use a shorter recurrence_end_date."
-            },
+            {"success": False, "message": f"Invalid recurrence pattern: {'; '.join(e.messages)}"},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    # Calculate duration for each occurrence
-    duration = end - start
-
-    # Check first occurrence for conflicts (must succeed for parent)
-    first_date = occurrence_dates[0]
-    first_start = start.replace(year=first_date.year, month=first_date.month, day=first_date.day)
-    first_end = first_start + duration
+    # A COUNT / UNTIL rule ends on its own; storing that date lets readers
+    # skip the series once it is over
+    rule_end = last_occurrence_date(start_date, recurrence_type, recurrence_pattern)
+    if rule_end is not None:
+        recurrence_end_date = min(recurrence_end_date, rule_end) if recurrence_end_date else rule_end
 
-    if check_booking_conflicts(room_id, first_start, first_end):
-        return Response(
-            {"success": False, "message": f"First occurrence ({first_date}) conflicts with existing booking"},
-            status=status.HTTP_409_CONFLICT,
-        )
-
-    # Create parent booking (first occurrence)
-    parent = Booking.objects.create(
+    series = BookingSeries(
         room=room,
+        organizer=request.user,
         title=data["title"],
         description=data.get("description", ""),
-        organizer=request.user,
-        start_time=first_start,
-        end_time=first_end,
-        status=BookingStatus.CONFIRMED.value,
-        is_recurring=True,
+        attendee_count=data.get("attendeeCount", 1),
+        start_date=start_date,
+        start_time=start_time,
+        duration=end - start,
+        timezone=tz.key,
         recurrence_type=recurrence_type,
-        recurrence_end_date=recurrence_end_date,
         recurrence_pattern=recurrence_pattern,
+        recurrence_end_date=recurrence_end_date,
     )
 
-    # Attach attendees to parent
-    attendee_ids = data.get("attendeeIds", [])
-    for uid in attendee_ids:
-        try:
-            user = User.objects.get(id=uid)
-            BookingAttendee.objects.create(booking=parent, user=user)
-        except Exception:
-            pass
-
-    # Create child bookings for remaining occurrences
-    created_count = 1  # Parent counts as first
-    skipped_dates = []
-
-    for occurrence_date in occurrence_dates[1:]:  # Skip first (already created as parent)
-        occurrence_start = start.replace(
-            year=occurrence_date.year,
-            month=occurrence_date.month,
-            day=occurrence_date.day
-        )
-        occurrence_end = occurrence_start + duration
-
-        # Check for conflicts (skip if conflict exists)
-        if check_booking_conflicts(room_id, occurrence_start, occurrence_end):
-            skipped_dates.append(occurrence_date.isoformat())
-            continue
-
-        # Create child booking
-        child = Booking.objects.create(
-            room=room,
-            title=data["title"],
-            description=data.get("description", ""),
-            organizer=request.user,
-            start_time=occurrence_start,
-            end_time=occurrence_end,
-            status=BookingStatus.CONFIRMED.value,
-            is_recurring=True,
-            parent_booking=parent,
-        )
-
-        # Attach same attendees to child
-        for uid in attendee_ids:
-            try:
-                user = User.objects.get(id=uid)
-                BookingAttendee.objects.create(booking=child, user=user)
-            except Exception:
-                pass
-
-        created_count += 1
-
-    # Return parent booking details plus creation stats
-    parent_serializer = BookingSerializer(parent)
+    first = first_occurrence(series)
+    if first is None:
+        return Response(
+            {"success": False, "message": "No occurrences generated from recurrence pattern"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    # Nothing before the first occurrence is ever virtual
+    series.materialised_through = first[0]
+
+    attendees, unknown_attendees = resolve_attendees(data.get("attendeeIds", []))
+
+    # Conflict-check the whole series (or its first SERIES_HORIZON if open-ended)
+    check_until = None if recurrence_end_date is not None else first[0] + SERIES_HORIZON
+    slots = list(series_slots(series, None, check_until))
+
+    with transaction.atomic():
+        # Serialises against other series and booking writes in this room
+        lock_room(room.id)
+
+        # One query for stored bookings, one pair for other series; then
+        # every occurrence is resolved in memory
+        busy = list(Booking.objects.filter(
+            room_id=room.id,
+            status__in=[BookingStatus.CONFIRMED.value, BookingStatus.CHECKED_IN.value],
+            start_time__lt=slots[-1][1],
+            end_time__gt=slots[0][0],
+        ).values_list("start_time", "end_time"))
+        busy += [
+            (o.start_time, o.end_time)
+            for o in virtual_occurrences(slots[0][0], slots[-1][1], room_ids=[room.id])
+        ]
+        conflicts = sweep_conflicts(slots, busy)
+
+        if conflicts[0]:
+            return Response(
+                {
+                    "success": False,
+                    "message": f"First occurrence ({start_date}) conflicts with existing booking",
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        series.save()
+        BookingSeriesAttendee.objects.bulk_create(
+            [BookingSeriesAttendee(series=series, user_id=user_id) for user_id in attendees]
+        )
+
+        # Skipped occurrences are stored as cancelled exceptions so they stay
+        # skipped when expanded later
+        skipped = [slot for slot, clash in zip(slots, conflicts) if clash]
+        Booking.objects.bulk_create([
+            occurrence_row(series, slot_start, slot_end, status=BookingStatus.CANCELLED.value)
+            for slot_start, slot_end in skipped
+        ])
+
+        materialised = materialise_series(series, timezone.now() + MATERIALISE_AHEAD)
+
+    skipped_dates = [slot_start.astimezone(tz).date().isoformat() for slot_start, _ in skipped]
+    created_count = len(slots) - len(skipped) if recurrence_end_date is not None else materialised
+    first_booking = (
+        Booking.objects.filter(series=series, occurrence_start=first[0]).first()
+        or Occurrence(series, *first)
+    )
     return Response(
         {
             "success": True,
             "data": {
-                "parentBookingId": str(parent.id),
+                "seriesId": str(series.id),
                 "createdCount": created_count,
                 "skippedDates": skipped_dates,
-                "parent": parent_serializer.data,
-            }
+                "series": BookingSeriesSerializer(series).data,
+                "firstOccurrence": BookingSerializer(first_booking).data,
+            },
+            "unknownAttendeeIds": unknown_attendees,
         },
         status=status.HTTP_201_CREATED,
     )
 
 
+# ---------------------------------------------------------------------------
+# GET/DELETE /api/bookings/series/<series_id>
+# ---------------------------------------------------------------------------
+
+@api_view(["GET", "DELETE"])
+@permission_classes([IsAuthenticated])
+def series_detail(request, series_id):
+    """
+    GET = the series rule. DELETE = end the series: no occurrences from now
+    on; past occurrences are kept. Only the organizer or an admin may end it.
+    """
+    try:
+        series = BookingSeries.objects.select_related("room", "organizer").get(id=series_id)
+    except BookingSeries.DoesNotExist:
+        return Response(
+            {"success": False, "message": "Series not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    if request.method == "GET":
+        return Response({"success": True, "data": BookingSeriesSerializer(series).data})
+
+    if series.organizer_id != request.user.id and not request.user.is_staff:
+        return Response(
+            {"success": False, "message": "Only the organizer or admin can end this series"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    now = timezone.now()
+    with transaction.atomic():
+        # Ending the rule yesterday drops every virtual occurrence; rows
+        # already materialised for the future are cancelled below
+        yesterday = now.astimezone(ZoneInfo(series.timezone)).date() - timedelta(days=1)
+        if series.recurrence_end_date is None or series.recurrence_end_date > yesterday:
+            series.recurrence_end_date = yesterday
+            series.save(update_fields=["recurrence_end_date", "updated_at"])
+        cancelled = list(
+            Booking.objects
+            .filter(
+                series=series,
+                start_time__gt=now,
+                status__in=[BookingStatus.CONFIRMED.value, BookingStatus.CHECKED_IN.value],
+            )
+            .values_list("id", flat=True)
+        )
+        if cancelled:
+            Booking.objects.filter(id__in=cancelled).update(
+                status=BookingStatus.CANCELLED.value, updated_at=now,
+            )
+            # update() skips post_save
+            intervals.bookings_removed(cancelled)
+            transaction.on_commit(bump_bookings_generation)
+            transaction.on_commit(lambda: bump_room_versions([series.room_id]))
+
+    return Response({"success": True, "data": True})
+
+
+# ---------------------------------------------------------------------------
+# PUT/DELETE /api/bookings/series/<series_id>/occurrences/<occurrence_start>
+# ---------------------------------------------------------------------------
+
+@api_view(["PUT", "DELETE"])
+@permission_classes([IsAuthenticated])
+def series_occurrence(request, series_id, occurrence_start):
+    """
+    Edit (PUT) or cancel (DELETE) one occurrence of a series, addressed by
+    its original start (ISO 8601 with offset). A virtual occurrence is
+    materialised first and then handled exactly like PUT/DELETE
+    /api/bookings/<id>.
+    """
+    try:
+        start = datetime.fromisoformat(occurrence_start)
+    except ValueError:
+        start = None
+    if start is None or start.tzinfo is None:
+        return Response(
+            {"success": False, "message": "occurrenceStart must be an ISO 8601 datetime with offset"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        series = BookingSeries.objects.get(id=series_id)
+    except BookingSeries.DoesNotExist:
+        return Response(
+            {"success": False, "message": "Series not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    try:
+        with transaction.atomic():
+            lock_room(series.room_id)
+            booking = materialise_occurrence(series, start)
+    except ValueError as e:
+        return Response(
+            {"success": False, "message": str(e)},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except IntegrityError as e:
+        if not is_booking_overlap(e):
+            raise
+        return Response(
+            {"success": False, "message": "This occurrence's slot has been taken by another booking."},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    if request.method == "DELETE":
+        return cancel_booking_impl(request, booking.id)
+    return update_booking_impl(request, booking.id)
+
+
 # ---------------------------------------------------------------------------
 # POST /api/bookings/<id>/extend
 # ---------------------------------------------------------------------------
@@ -433,29 +813,32 @@ def extend_booking(request, booking_id):
     # Calculate new end time
     new_end_time = booking.end_time + timedelta(minutes=extension_minutes)
 
-    # Check for conflicts with the extended time
-    if check_booking_conflicts(
-        booking.room_id,
-        booking.end_time,  # Check from current end time
-        new_end_time,      # To new end time
-        exclude_booking_id=booking.id
-    ):
+    # Update booking end time; the exclusion constraint rejects an overlap
+    # with the next booking
+    booking.end_time = new_end_time
+    try:
+        with transaction.atomic():
+            if series_conflict(booking.room_id, booking.start_time, new_end_time):
+                return Response(
+                    {"success": False, "message": "Extension would conflict with another booking"},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            booking.save()
+
+            # Create extension record for audit trail
+            BookingExtension.objects.create(
+                booking=booking,
+                extended_by=request.user,
+                extension_minutes=extension_minutes,
+            )
+    except IntegrityError as e:
+        if not is_booking_overlap(e):
+            raise
         return Response(
             {"success": False, "message": "Extension would conflict with another booking"},
             status=status.HTTP_409_CONFLICT,
         )
 
-    # Update booking end time
-    booking.end_time = new_end_time
-    booking.save()
-
-    # Create extension record for audit trail
-    BookingExtension.objects.create(
-        booking=booking,
-        extended_by=request.user,
-        extension_minutes=extension_minutes,
-    )
-
     # Return updated booking
     serializer = BookingSerializer(booking)
     return Response(
@@ -508,13 +891,6 @@ def update_booking_impl(request, booking_id):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    # Conflict check (exclude self)
-    if _check_overlap(booking.room_id, start, end, exclude_booking_id=booking.id):
-        return Response(
-            {"success": False, "message": "Room is already booked for the requested time slot."},
-            status=status.HTTP_409_CONFLICT,
-        )
-
     if "title" in data:
         booking.title = data["title"]
     if "description" in data:
@@ -523,21 +899,34 @@ def update_booking_impl(request, booking_id):
         booking.start_time = data["startTime"]
     if "endTime" in data:
         booking.end_time = data["endTime"]
-    booking.save()
 
-    # Update attendees if provided
     if "attendeeIds" in data:
-        booking.booking_attendees.all().delete()
-        from accounts.models import User
-        for uid in data["attendeeIds"]:
-            try:
-                user = User.objects.get(id=uid)
-                BookingAttendee.objects.create(booking=booking, user=user)
-            except Exception:
-                pass
+        attendees, unknown_attendees = resolve_attendees(data["attendeeIds"])
+    else:
+        unknown_attendees = []
+
+    # Conflict check (against other bookings) happens in the exclusion
+    # constraint; virtual series occurrences are checked explicitly
+    try:
+        with transaction.atomic():
+            if ("startTime" in data or "endTime" in data) and series_conflict(booking.room_id, start, end):
+                return Response(
+                    {"success": False, "message": "Room is already booked for the requested time slot."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            booking.save()
+            if "attendeeIds" in data:
+                set_attendees(booking, attendees)
+    except IntegrityError as e:
+        if not is_booking_overlap(e):
+            raise
+        return Response(
+            {"success": False, "message": "Room is already booked for the requested time slot."},
+            status=status.HTTP_409_CONFLICT,
+        )
 
     serializer = BookingSerializer(booking)
-    return Response({"success": True, "data": serializer.data})
+    return Response({"success": True, "data": serializer.data, "unknownAttendeeIds": unknown_attendees})
 
 
 # ---------------------------------------------------------------------------
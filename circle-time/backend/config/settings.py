@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Third-party
     "rest_framework",
     "corsheaders",
@@ -90,6 +91,27 @@ DATABASES = {
     )
 }
 
+# Analytics responses and the bookings write generation live here. LocMem is
+# per-process, so multi-worker deployments should set REDIS_URL to share it;
+# without it, analytics responses are only cached for a minute.
+_redis_url = os.environ.get("REDIS_URL")
+CACHES = {
+    "default": (
+        {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": _redis_url}
+        if _redis_url
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "circletime"}
+    )
+}
+
+# Change notifications for the room-state stream and long-polls (panel.broker).
+# LocalBroker only reaches readers in the same process; REDIS_URL shares them
+# as above.
+ROOM_STATE_BROKER = (
+    {"BACKEND": "panel.broker.RedisBroker", "LOCATION": _redis_url}
+    if _redis_url
+    else {"BACKEND": "panel.broker.LocalBroker"}
+)
+
 AUTH_USER_MODEL = "accounts.User"
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -124,6 +146,8 @@ REST_FRAMEWORK = {
         "rest_framework.renderers.JSONRenderer",
     ),
     "EXCEPTION_HANDLER": "config.exceptions.custom_exception_handler",
+    # `?format=` is an endpoint parameter (analytics export), not a renderer override
+    "URL_FORMAT_OVERRIDE": None,
 }
 
 # ---------------------------------------------------------------------------
@@ -1,3 +1,7 @@
+from datetime import time
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
@@ -67,3 +71,30 @@ class OrganisationSettings(models.Model):
                 obj.business_days = [0, 1, 2, 3, 4]
                 obj.save(update_fields=["business_days"])
         return obj
+
+    # ── Business-hours helpers ───────────────────────────────────────────────
+
+    def get_business_days(self) -> list[int]:
+        """Active day numbers (0=Mon, 6=Sun), defaulting to Mon–Fri when unset."""
+        return sorted(self.business_days) if self.business_days else [0, 1, 2, 3, 4]
+
+    def get_business_hours(self) -> tuple[time, time]:
+        """
+        (start, end) business hours as datetime.time.
+
+        A freshly created row still holds the "HH:MM" string defaults until it
+        is re-read from the database, so both shapes are accepted.
+        """
+        start, end = self.business_start, self.business_end
+        if isinstance(start, str):
+            start = time.fromisoformat(start)
+        if isinstance(end, str):
+            end = time.fromisoformat(end)
+        return start, end
+
+    def get_tzinfo(self):
+        """ZoneInfo for the organisation timezone, falling back to settings.TIME_ZONE."""
+        try:
+            return ZoneInfo(self.timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            return ZoneInfo(settings.TIME_ZONE)
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class PanelConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "panel"
+
+    def ready(self):
+        from panel import signals  # noqa: F401 — registers receivers
@@ -0,0 +1,189 @@
+"""
+Change notifications for the streaming and long-poll panel endpoints.
+
+Writers publish on a channel (a room id, ``pairing:<code>``, or
+ALL_CHANNELS for changes that touch every room) after their transaction
+commits (panel.signals). Async readers hold a ``Subscription`` and wait on
+it; a notification carries no payload, it only tells the reader to re-read
+its snapshot.
+
+The backend is chosen by settings.ROOM_STATE_BROKER:
+
+  - LocalBroker fans out within the process. Enough for a single worker,
+    and used by tests.
+  - RedisBroker publishes through Redis and runs one listener per worker
+    that fans messages out locally, so a write handled by one worker reaches
+    readers held by every other.
+
+Any class with ``publish(channel)`` and ``subscribe(*channels)`` can be
+plugged in the same way.
+"""
+import asyncio
+import logging
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+ALL_CHANNELS = "*"
+
+
+class Subscription:
+    """
+    A reader's handle on some channels, bound to its event loop.
+
+    Use as ``async with broker.subscribe(channel) as subscription`` and call
+    ``wait()`` in a loop; notifications arriving between waits are not lost.
+    """
+
+    def __init__(self, broker, channels):
+        self._broker = broker
+        self.channels = frozenset(channels)
+        self._loop = None
+        self._event = None
+
+    async def __aenter__(self):
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        self._broker._add(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._broker._remove(self)
+
+    def notify(self):
+        """Wake the reader. Safe to call from any thread."""
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            pass  # Loop already closed: the reader is gone
+
+    async def wait(self, timeout):
+        """
+        Wait up to ``timeout`` seconds for a notification.
+
+        Returns:
+            bool — True if notified, False on timeout
+        """
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except TimeoutError:
+            return False
+        self._event.clear()
+        return True
+
+
+class LocalBroker:
+    """In-process fan-out."""
+
+    def __init__(self, **options):
+        self._lock = threading.Lock()
+        self._subscriptions = {}  # channel -> set of Subscription
+
+    def subscribe(self, *channels):
+        return Subscription(self, channels)
+
+    def publish(self, channel):
+        self._deliver(channel)
+
+    def _add(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+
+    def _remove(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def _deliver(self, channel):
+        with self._lock:
+            if channel == ALL_CHANNELS:
+                targets = {s for subscribers in self._subscriptions.values() for s in subscribers}
+            else:
+                targets = set(self._subscriptions.get(channel, ()))
+        for subscription in targets:
+            subscription.notify()
+
+
+class RedisBroker(LocalBroker):
+    """Fan-out across workers through a Redis pub/sub channel."""
+
+    REDIS_CHANNEL = "circletime:room_state"
+
+    def __init__(self, location, **options):
+        super().__init__(**options)
+        self._location = location
+        self._client = None
+        self._listener = None
+
+    def publish(self, channel):
+        import redis
+
+        try:
+            if self._client is None:
+                self._client = redis.Redis.from_url(self._location)
+            self._client.publish(self.REDIS_CHANNEL, channel)
+        except redis.RedisError:
+            # Readers still catch up at their next boundary or heartbeat
+            logger.warning("Failed to publish room-state change for %s", channel)
+
+    def _add(self, subscription):
+        super()._add(subscription)
+        # One listener per event loop; started lazily by the first reader
+        loop = asyncio.get_running_loop()
+        if self._listener is None or self._listener.done() or self._listener.get_loop() is not loop:
+            self._listener = loop.create_task(self._listen())
+
+    async def _listen(self):
+        import redis.asyncio as aioredis
+        from redis import RedisError
+
+        while True:
+            try:
+                client = aioredis.Redis.from_url(self._location)
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.REDIS_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._deliver(message["data"].decode())
+            except (RedisError, OSError):
+                logger.warning("Room-state listener lost its Redis connection; retrying")
+                # Anything published meanwhile is lost: make every reader re-read
+                self._deliver(ALL_CHANNELS)
+                await asyncio.sleep(1)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The configured broker, created on first use."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            config = dict(settings.ROOM_STATE_BROKER)
+            backend = import_string(config.pop("BACKEND"))
+            _broker = backend(**{name.lower(): value for name, value in config.items()})
+    return _broker
+
+
+def pairing_channel(code):
+    return f"pairing:{code}"
+
+
+def notify_room(room_id=None):
+    """Tell readers that a room's state (or, with no room, every room's) may have changed."""
+    get_broker().publish(str(room_id) if room_id is not None else ALL_CHANNELS)
+
+
+def notify_pairing(code):
+    """Tell readers waiting on a pairing code that its status changed."""
+    get_broker().publish(pairing_channel(code))
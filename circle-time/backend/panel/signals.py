@@ -0,0 +1,64 @@
+"""
+Panel model signal receivers.
+
+Room-state snapshots are keyed on room versions (bookings.utils), which
+bookings.signals already moves for Booking, Room and organisation settings
+writes. Device registration writes move their room's version and drop that
+serial's cached unpair check (see panel.state).
+
+Writes that can change what a room's panel shows are also announced on the
+room-state broker (panel.broker) after commit, so open streams and
+long-polls re-read their snapshot straight away instead of at their next
+boundary. Pairing-code writes are announced the same way.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bookings.models import Booking, BookingSeries
+from bookings.utils import bump_room_versions
+from organisation.models import OrganisationSettings
+from panel.broker import notify_pairing, notify_room
+from panel.models import DeviceRegistration, PairingCode
+from panel.state import forget_device
+from rooms.models import Room
+
+
+@receiver(post_save, sender=DeviceRegistration)
+@receiver(post_delete, sender=DeviceRegistration)
+def _device_changed(sender, instance, **kwargs):
+    serial, room_id = instance.device_serial, instance.room_id
+
+    def changed():
+        forget_device(serial)
+        bump_room_versions([room_id])
+        notify_room(room_id)
+
+    transaction.on_commit(changed)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+@receiver(post_save, sender=BookingSeries)
+@receiver(post_delete, sender=BookingSeries)
+def _room_bookings_changed(sender, instance, **kwargs):
+    room_id = instance.room_id
+    transaction.on_commit(lambda: notify_room(room_id))
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def _room_changed(sender, instance, **kwargs):
+    room_id = instance.pk
+    transaction.on_commit(lambda: notify_room(room_id))
+
+
+@receiver(post_save, sender=OrganisationSettings)
+def _settings_changed(sender, **kwargs):
+    transaction.on_commit(notify_room)
+
+
+@receiver(post_save, sender=PairingCode)
+def _pairing_changed(sender, instance, **kwargs):
+    code = instance.code
+    transaction.on_commit(lambda: notify_pairing(code))
@@ -0,0 +1,153 @@
+"""
+Cached room-state snapshots for the tablet panel and lobby displays.
+
+Every tablet polls GET /api/rooms/<id>/state every few seconds, but a room's
+state only changes when its bookings (or the room) are written, or when a
+time boundary passes: a meeting starts or ends, the next one comes within
+the upcoming threshold, a no-show reaches its auto-release deadline, or the
+day rolls over.
+
+States come from rooms.state.RoomStateEngine. Each is cached under its
+room's version (bookings.utils.get_room_versions), which only writes to
+that room's bookings, the room itself or its panel registrations move (and
+organisation settings writes, for every room), so a booking elsewhere
+doesn't invalidate it. Snapshots expire at the engine's
+``next_transition_at``. The unpair check is cached per device serial and
+dropped by DeviceRegistration writes (panel.signals). A poll between
+boundaries with no writes is served without touching the database; the
+snapshot rebuild is also where the room's no-shows are released, exactly
+when their deadline passes.
+"""
+import hashlib
+import json
+import math
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from bookings.utils import ROOM_LIST, get_room_versions
+from rooms.state import RoomStateEngine
+
+CACHE_PREFIX = "panel"
+
+# Upper bound on a snapshot's life whatever its next boundary. Keeps
+# per-process caches (LocMem) that don't see other workers' version bumps
+# from serving a stale room for long.
+SNAPSHOT_MAX_AGE = timedelta(seconds=60)
+
+DEVICE_TIMEOUT = 60 * 60 * 24
+
+
+def _snapshot_key(room_id, version):
+    return f"{CACHE_PREFIX}:room_state:{version}:{room_id}"
+
+
+def _device_key(device_serial):
+    return f"{CACHE_PREFIX}:device:{device_serial}"
+
+
+def _cache_until(key, value, expires, now):
+    if expires > now:
+        cache.set(key, value, timeout=math.ceil((expires - now).total_seconds()))
+
+
+def state_version(data):
+    """Short digest of a RoomState, ignoring ``lastUpdated``."""
+    content = {k: v for k, v in data.items() if k != "lastUpdated"}
+    return hashlib.sha1(json.dumps(content, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def get_room_snapshot(room_id, now=None):
+    """
+    Return the room's state snapshot, from the cache while it is valid.
+
+    Returns:
+        dict with ``data`` (the RoomState), ``version`` (its state_version)
+        and ``expires`` (when it must be rebuilt), or None if the room
+        doesn't exist
+    """
+    from bookings.utils import release_stale_bookings
+    from rooms.models import Room
+
+    now = now or timezone.now()
+    # Read before building: a write landing mid-build bumps past this
+    # version, so the snapshot can't outlive it
+    key = _snapshot_key(room_id, get_room_versions([room_id])[room_id])
+    snapshot = cache.get(key)
+    if snapshot is not None and snapshot["expires"] > now:
+        return snapshot
+
+    room = Room.objects.filter(id=room_id).first()
+    if room is None:
+        return None
+    state = RoomStateEngine(now).compute([room])[room.id]
+    if state.releasable is not None:
+        # The state already leaves it out; this marks it no-show and emails
+        release_stale_bookings(room=room)
+
+    data = state.as_dict()
+    snapshot = {
+        "data": data,
+        "version": state_version(data),
+        "expires": min(state.next_transition_at, now + SNAPSHOT_MAX_AGE),
+    }
+    _cache_until(key, snapshot, snapshot["expires"], now)
+    return snapshot
+
+
+def get_rooms_state(building=None, floor=None, now=None):
+    """
+    Compact states of the rooms in a building and/or on a floor, cached like
+    a single room's snapshot until the first of them changes.
+
+    The entry is keyed on the room list version (any Room write) and holds
+    the version of every room in it; a write to any of those rooms makes
+    it stale.
+
+    Doesn't release stale bookings (a query and an email each); the engine
+    already leaves them out.
+    """
+    from rooms.models import Room
+
+    now = now or timezone.now()
+    scope = hashlib.sha1(json.dumps([(building or "").lower(), floor]).encode()).hexdigest()[:16]
+    key = f"{CACHE_PREFIX}:rooms_state:{get_room_versions([ROOM_LIST])[ROOM_LIST]}:{scope}"
+    snapshot = cache.get(key)
+    if (
+        snapshot is not None
+        and snapshot["expires"] > now
+        and get_room_versions(snapshot["versions"]) == snapshot["versions"]
+    ):
+        return snapshot["data"]
+
+    rooms = Room.objects.order_by("building", "floor", "name")
+    if building:
+        rooms = rooms.filter(building__iexact=building)
+    if floor is not None:
+        rooms = rooms.filter(floor=floor)
+    rooms = list(rooms)
+    versions = get_room_versions([room.id for room in rooms])
+    states = RoomStateEngine(now, upcoming_limit=1).compute(rooms)
+
+    data = [states[room.id].as_compact() for room in rooms]
+    expires = min([now + SNAPSHOT_MAX_AGE] + [s.next_transition_at for s in states.values()])
+    _cache_until(key, {"data": data, "versions": versions, "expires": expires}, expires, now)
+    return data
+
+
+def device_registered(device_serial):
+    """Whether a DeviceRegistration exists for the serial, cached per serial."""
+    from panel.models import DeviceRegistration
+
+    key = _device_key(device_serial)
+    registered = cache.get(key)
+    if registered is None:
+        registered = DeviceRegistration.objects.filter(device_serial=device_serial).exists()
+        cache.set(key, registered, timeout=DEVICE_TIMEOUT)
+    return registered
+
+
+def forget_device(device_serial):
+    """Drop the cached registration check for a serial."""
+    cache.delete(_device_key(device_serial))
@@ -0,0 +1,248 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from bookings.models import Booking
+from organisation.models import OrganisationSettings
+from panel.models import DeviceRegistration, PairingCode
+from panel.state import get_room_snapshot, get_rooms_state
+from panel.views import _read_released
+from rooms.models import Room
+
+
+class PanelTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        OrganisationSettings.get()
+        self.user = User.objects.create_user(email="user@example.com", password="x")
+        self.room = Room.objects.create(name="Boardroom", building="HQ", floor=1, capacity=6)
+        self.other = Room.objects.create(name="Huddle", building="HQ", floor=1, capacity=2)
+        self.now = timezone.now()
+
+    def book(self, room, start, minutes=30, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Booking.objects.create(
+                room=room, title="Sync", organizer=self.user,
+                start_time=start, end_time=start + timedelta(minutes=minutes), **fields,
+            )
+
+
+class RoomSnapshotVersionTests(PanelTestCase):
+    def poll(self, room=None):
+        return get_room_snapshot((room or self.room).id, now=self.now)
+
+    def assertCached(self, room=None):
+        with self.assertNumQueries(0):
+            self.poll(room)
+
+    def assertRebuilt(self, room=None):
+        # The room, then the engine's settings, materialise_due and bookings
+        with self.assertNumQueries(4):
+            return self.poll(room)
+
+    def test_repeated_polls_are_served_from_the_cache(self):
+        self.poll()
+        self.assertCached()
+
+    def test_booking_in_another_room_keeps_the_snapshot(self):
+        self.poll()
+        self.book(self.other, self.now - timedelta(minutes=5))
+        self.assertCached()
+
+    def test_booking_in_the_room_rebuilds_the_snapshot(self):
+        self.poll()
+        self.book(self.room, self.now - timedelta(minutes=5), status="checked_in", checked_in=True)
+        snapshot = self.assertRebuilt()
+        self.assertEqual(snapshot["data"]["status"], "occupied")
+
+    def test_room_write_rebuilds_only_that_room(self):
+        self.poll()
+        self.poll(self.other)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.room.status = "maintenance"
+            self.room.save()
+        self.assertEqual(self.assertRebuilt()["data"]["status"], "offline")
+        self.assertCached(self.other)
+
+    def test_device_registration_rebuilds_its_room(self):
+        self.poll()
+        self.poll(self.other)
+        with self.captureOnCommitCallbacks(execute=True):
+            DeviceRegistration.objects.create(room=self.room, device_serial="SN-1")
+        self.assertRebuilt()
+        self.assertCached(self.other)
+
+    def test_organisation_settings_rebuild_every_room(self):
+        self.poll()
+        self.poll(self.other)
+        with self.captureOnCommitCallbacks(execute=True):
+            settings = OrganisationSettings.get()
+            settings.auto_release_minutes += 5
+            settings.save()
+        self.assertRebuilt()
+        self.assertRebuilt(self.other)
+
+
+class RoomsStateVersionTests(PanelTestCase):
+    def test_batch_is_cached_until_one_of_its_rooms_changes(self):
+        elsewhere = Room.objects.create(name="Annex", building="Annex", floor=1, capacity=4)
+        get_rooms_state(building="HQ", now=self.now)
+        with self.assertNumQueries(0):
+            get_rooms_state(building="HQ", now=self.now)
+
+        self.book(elsewhere, self.now + timedelta(minutes=5))
+        with self.assertNumQueries(0):
+            get_rooms_state(building="HQ", now=self.now)
+
+        self.book(self.other, self.now + timedelta(minutes=5))
+        data = get_rooms_state(building="HQ", now=self.now)
+        self.assertEqual({room["name"]: room["status"] for room in data},
+                         {"Boardroom": "available", "Huddle": "upcoming"})
+
+    def test_new_room_joins_the_batch(self):
+        get_rooms_state(building="HQ", now=self.now)
+        with self.captureOnCommitCallbacks(execute=True):
+            Room.objects.create(name="Studio", building="HQ", floor=2, capacity=8)
+        self.assertEqual(len(get_rooms_state(building="HQ", now=self.now)), 3)
+
+
+class RoomsStateEndpointTests(PanelTestCase):
+    url = "/api/rooms/state"
+
+    def test_anonymous_request_is_refused(self):
+        for headers in ({}, {"HTTP_X_DEVICE_SERIAL": "SN-UNKNOWN"}):
+            response = self.client.get(self.url, **headers)
+            self.assertEqual(response.status_code, 403)
+            self.assertFalse(response.json()["success"])
+
+    def test_paired_device(self):
+        DeviceRegistration.objects.create(room=self.room, device_serial="SN-1")
+        response = self.client.get(self.url, {"building": "hq"}, HTTP_X_DEVICE_SERIAL="SN-1")
+        self.assertEqual([room["name"] for room in response.json()["data"]], ["Boardroom", "Huddle"])
+
+    def test_signed_in_user(self):
+        api = APIClient()
+        api.force_authenticate(self.user)
+        self.assertEqual(api.get(self.url).status_code, 200)
+
+    def test_floor_must_be_an_integer(self):
+        api = APIClient()
+        api.force_authenticate(self.user)
+        response = api.get(self.url, {"floor": "one"})
+        self.assertEqual(response.status_code, 400)
+
+
+class RoomStateTests(PanelTestCase):
+    def url(self, room=None):
+        return f"/api/rooms/{(room or self.room).id}/state"
+
+    def test_state_carries_its_version(self):
+        body = self.client.get(self.url()).json()
+        self.assertTrue(body["success"])
+        self.assertEqual(body["data"]["status"], "available")
+        self.assertEqual(len(body["version"]), 16)
+
+    def test_unpaired_device(self):
+        body = self.client.get(self.url(), HTTP_X_DEVICE_SERIAL="SN-GONE").json()
+        self.assertEqual(body, {"success": True, "unpaired": True})
+
+    def test_errors_go_through_drf(self):
+        response = self.client.post(self.url())
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response.json(), {"success": False, "message": 'Method "POST" not allowed.'})
+
+        Room.objects.filter(id=self.other.id).delete()
+        response = self.client.get(self.url(self.other))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"success": False, "message": "Room not found"})
+
+    async def test_long_poll_answers_at_once_when_behind(self):
+        response = await self.async_client.get(self.url(), {"version": "stale"})
+        body = response.json()
+        self.assertEqual(body["data"]["status"], "available")
+
+    def test_wsgi_long_poll_answers_at_once(self):
+        version = self.client.get(self.url()).json()["version"]
+        with mock.patch("panel.views._watch", side_effect=AssertionError("held under WSGI")):
+            body = self.client.get(self.url(), {"version": version}).json()
+        self.assertEqual(body["version"], version)
+        self.assertEqual(body["data"]["status"], "available")
+
+    async def test_long_poll_is_held_while_unchanged(self):
+        version = (await self.async_client.get(self.url())).json()["version"]
+        with mock.patch("panel.views.LONG_POLL_SECONDS", 0.2):
+            body = (await self.async_client.get(self.url(), {"version": version})).json()
+        self.assertEqual(body["version"], version)
+
+    async def test_long_poll_keeps_the_envelope(self):
+        await Room.objects.filter(id=self.other.id).adelete()
+        response = await self.async_client.get(self.url(self.other), {"version": "stale"})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"success": False, "message": "Room not found"})
+
+
+class PairingStatusTests(PanelTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pairing = PairingCode.objects.create(
+            code="123456", device_serial="SN-1",
+            expires_at=timezone.now() + timedelta(minutes=PairingCode.EXPIRY_MINUTES),
+        )
+
+    def test_pending_code(self):
+        body = self.client.get("/api/panel/pairing-status/123456").json()
+        self.assertEqual(body["data"], {"status": "pending", "roomId": None, "roomName": None})
+
+    def test_unknown_code(self):
+        for params in ({}, {"version": "old"}):
+            response = self.client.get("/api/panel/pairing-status/000000", params)
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.json(), {"success": False, "message": "Pairing code not found"})
+
+    def test_wsgi_long_poll_answers_at_once(self):
+        version = self.client.get("/api/panel/pairing-status/123456").json()["version"]
+        with mock.patch("panel.views._watch", side_effect=AssertionError("held under WSGI")):
+            body = self.client.get("/api/panel/pairing-status/123456", {"version": version}).json()
+        self.assertEqual(body["data"]["status"], "pending")
+
+    async def test_long_poll_answers_once_paired(self):
+        await PairingCode.objects.filter(id=self.pairing.id).aupdate(status="paired", room=self.room)
+        response = await self.async_client.get("/api/panel/pairing-status/123456", {"version": "old"})
+        self.assertEqual(response.json()["data"]["roomName"], "Boardroom")
+
+
+class RoomStateStreamTests(PanelTestCase):
+    def url(self, room=None):
+        return f"/api/rooms/{(room or self.room).id}/state/stream"
+
+    def test_wsgi_request_is_refused(self):
+        response = self.client.get(self.url())
+        self.assertEqual(response.status_code, 501)
+        self.assertFalse(response.json()["success"])
+
+    async def test_asgi_request_streams_the_state(self):
+        response = await self.async_client.get(self.url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = aiter(response.streaming_content)
+        first = (await anext(events)).decode()
+        await events.aclose()
+        self.assertTrue(first.startswith("id: "))
+        self.assertIn('"status": "available"', first)
+
+    async def test_missing_room_is_404_before_streaming(self):
+        await Room.objects.filter(id=self.other.id).adelete()
+        response = await self.async_client.get(self.url(self.other))
+        self.assertEqual(response.status_code, 404)
+
+
+class ReadReleasedTests(TransactionTestCase):
+    def test_connection_is_closed_after_the_read(self):
+        self.assertEqual(_read_released(Room.objects.count), 0)
+        self.assertIsNone(connection.connection)
@@ -1,6 +1,8 @@
 from django.urls import path
 from panel.views import (
     room_state,
+    room_state_stream,
+    rooms_state,
     meeting_checkin,
     meeting_end_early,
     generate_pairing_code,
@@ -12,7 +14,9 @@ from panel.views import (
 
 urlpatterns = [
     # Existing panel endpoints
+    path("rooms/state", rooms_state, name="panel-rooms-state"),
     path("rooms/<uuid:room_id>/state", room_state, name="panel-room-state"),
+    path("rooms/<uuid:room_id>/state/stream", room_state_stream, name="panel-room-state-stream"),
     path("meetings/<uuid:meeting_id>/checkin", meeting_checkin, name="panel-meeting-checkin"),
     path("meetings/<uuid:meeting_id>/end", meeting_end_early, name="panel-meeting-end"),
     # Pairing flow
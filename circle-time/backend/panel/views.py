@@ -6,8 +6,18 @@ Key contract differences vs web:
   - Meeting.organizer = string (NOT User object)
   - RoomState = { room, status, currentMeeting, nextMeeting, upcomingMeetings, lastUpdated }
 """
+import json
+import time
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
 from django.conf import settings as django_settings
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
@@ -16,134 +26,259 @@ from datetime import timedelta
 
 from rooms.models import Room
 from bookings.models import Booking
-from bookings.utils import release_stale_bookings
 from panel.models import PairingCode, DeviceRegistration
+from panel.broker import get_broker, pairing_channel
+from panel.state import device_registered, get_room_snapshot, get_rooms_state, state_version
 
 
 # ---------------------------------------------------------------------------
-# Helpers
+# GET /api/rooms/<room_id>/state  (mobile panel)
 # ---------------------------------------------------------------------------
 
-def _meeting_to_mobile(booking):
-    """Convert a Booking ORM instance to the mobile Meeting shape."""
-    # Derive a display name for the organizer
-    organizer = booking.organizer
-    if organizer.email == "kiosk@circletime.io":
-        organizer_name = "Kiosk User"
-    else:
-        organizer_name = (
-            organizer.name
-            or organizer.email.split("@")[0].title()
+# How long a long-poll (?version=) is held open when nothing changes; under
+# nginx's default 60 s proxy_read_timeout
+LONG_POLL_SECONDS = 25
+
+# Returned by _read_room when the requesting device has been unpaired
+UNPAIRED = object()
+
+
+def _read_room(room_id, device_serial):
+    """The room's snapshot, UNPAIRED, or None if the room doesn't exist."""
+    if device_serial and not device_registered(device_serial):
+        return UNPAIRED
+    return get_room_snapshot(room_id)
+
+
+def _room_state_response(snapshot, response_class=Response):
+    if snapshot is UNPAIRED:
+        return response_class({"success": True, "unpaired": True})
+    if snapshot is None:
+        return response_class(
+            {"success": False, "message": "Room not found"},
+            status=status.HTTP_404_NOT_FOUND,
         )
+    return response_class({"success": True, "data": snapshot["data"], "version": snapshot["version"]})
 
-    return {
-        "id": str(booking.id),
-        "title": booking.title,
-        "organizer": organizer_name,
-        "organizerEmail": booking.organizer.email,
-        "startTime": booking.start_time.isoformat(),
-        "endTime": booking.end_time.isoformat(),
-        "attendeeCount": booking.attendee_count,
-        "checkedIn": booking.checked_in,
-        "checkedInAt": booking.checked_in_at.isoformat() if booking.checked_in_at else None,
-    }
 
+def _read_released(read):
+    """
+    ``read()``, then close this thread's database connections.
 
-def _derive_mobile_status(room, now, current, next_booking):
+    Streams and long-polls stay open longer than their reads are apart, up
+    to far longer than CONN_MAX_AGE; without this each one would pin a
+    connection in between. Connections inside a transaction are left alone.
     """
-    Derive mobile status enum:
-      available | occupied | upcoming | offline
+    try:
+        return read()
+    finally:
+        for conn in connections.all(initialized_only=True):
+            if not conn.in_atomic_block:
+                conn.close()
+
+
+def _long_poll(view):
     """
-    if room.status == "maintenance":
-        return "offline"
-    if current:
-        return "occupied"
-    if next_booking:
-        diff = (next_booking.start_time - now).total_seconds() / 60
-        if diff <= 15:
-            return "upcoming"
-    return "available"
+    Route ``GET ?version=`` requests to the decorated async long-poll and
+    everything else to the regular DRF ``view``.
 
+    DRF views can't be async, so the long-poll answers with JsonResponse and
+    bypasses DRF: no authentication, throttling or content negotiation
+    (these endpoints are AllowAny and JSON-only anyway). Its errors keep
+    the { success, message } envelope of config.exceptions.
+
+    Under WSGI a held request would block a sync worker for the whole wait,
+    so there ``?version=`` is ignored and the request is answered at once,
+    like a plain poll.
+    """
+    def decorator(poll):
+        @csrf_exempt  # as api_view does, so DRF answers unsafe methods
+        @wraps(poll)
+        async def dispatch(request, *args, **kwargs):
+            if (
+                isinstance(request, ASGIRequest)
+                and request.method == "GET"
+                and request.GET.get("version")
+            ):
+                return await poll(request, *args, **kwargs)
+            return await sync_to_async(view)(request, *args, **kwargs)
+        return dispatch
+    return decorator
+
+
+async def _watch(subscription, read, snapshot, timeout):
+    """
+    Wait until ``read()`` no longer returns ``snapshot``'s version.
+
+    ``read`` is a sync callable returning a snapshot (a dict with ``version``
+    and ``expires``) or a non-dict (None, UNPAIRED) that ends the wait. It
+    is re-run when the subscription is notified and when the snapshot
+    expires.
+
+    Returns:
+        What ``read()`` last returned, or the unchanged snapshot once
+        ``timeout`` seconds have passed
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return snapshot
+        wait = remaining
+        if snapshot["expires"] is not None:
+            # At least a second, so a snapshot that can't be cached (the last
+            # second of the day) doesn't spin the loop
+            expires_in = (snapshot["expires"] - timezone.now()).total_seconds()
+            wait = min(remaining, max(1.0, expires_in))
+        await subscription.wait(wait)
+        latest = await sync_to_async(read)()
+        if not isinstance(latest, dict) or latest["version"] != snapshot["version"]:
+            return latest
+        snapshot = latest
 
-# ---------------------------------------------------------------------------
-# GET /api/rooms/<room_id>/state  (mobile panel)
-# ---------------------------------------------------------------------------
 
 @api_view(["GET"])
 @permission_classes([AllowAny])  # Panel has no auth layer per contract
-def room_state(request, room_id):
+def _room_state(request, room_id):
+    device_serial = request.META.get("HTTP_X_DEVICE_SERIAL")
+    return _room_state_response(_read_room(room_id, device_serial))
+
+
+@_long_poll(_room_state)
+async def room_state(request, room_id):
     """
     Composite room-state endpoint for mobile panel.
-    Returns RoomState with mobile enums and organizer as string.
+    Returns RoomState with mobile enums and organizer as string, plus its
+    ``version``.
     If X-Device-Serial header is provided and that device has been
     deleted/unpaired, returns { success: true, unpaired: true }.
+
+    Long-poll: with ``?version=<last seen version>`` the request is held,
+    without a worker thread, until the state moves past that version or
+    LONG_POLL_SECONDS pass, and then answered the same way.
     """
-    # ── Unpair detection ─────────────────────────────────────────────────
     device_serial = request.META.get("HTTP_X_DEVICE_SERIAL")
-    if device_serial:
-        if not DeviceRegistration.objects.filter(device_serial=device_serial).exists():
-            return Response({"success": True, "unpaired": True})
+    read = partial(_read_released, partial(_read_room, room_id, device_serial))
 
-    try:
-        room = Room.objects.get(id=room_id)
-    except Room.DoesNotExist:
+    # Subscribe before reading, so a write between the two isn't missed
+    async with get_broker().subscribe(str(room_id)) as subscription:
+        snapshot = await sync_to_async(read)()
+        if isinstance(snapshot, dict) and snapshot["version"] == request.GET["version"]:
+            snapshot = await _watch(subscription, read, snapshot, LONG_POLL_SECONDS)
+    return _room_state_response(snapshot, JsonResponse)
+
+
+# ---------------------------------------------------------------------------
+# GET /api/rooms/state?building=&floor=  (lobby displays)
+# ---------------------------------------------------------------------------
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def rooms_state(request):
+    """
+    Live state of every room in a building and/or on a floor, for lobby
+    wayfinding screens: one compact entry per room with its mobile status
+    and current / next meeting. A constant number of queries however many
+    rooms match, and cached until the first of them changes state.
+
+    Lists meeting titles for every room, so unlike the single-room panel
+    endpoints it needs a credential: a paired device's X-Device-Serial or
+    a signed-in user.
+    """
+    device_serial = request.META.get("HTTP_X_DEVICE_SERIAL")
+    if not request.user.is_authenticated and not (device_serial and device_registered(device_serial)):
         return Response(
-            {"success": False, "message": "Room not found"},
-            status=status.HTTP_404_NOT_FOUND,
+            {"success": False, "message": "A paired device or a signed-in user is required"},
+            status=status.HTTP_403_FORBIDDEN,
         )
 
-    # Auto-release ghosted bookings for this room on every poll
-    release_stale_bookings(room=room)
+    building = request.query_params.get("building") or None
+    floor = request.query_params.get("floor") or None
+    if floor is not None:
+        try:
+            floor = int(floor)
+        except ValueError:
+            return Response(
+                {"success": False, "message": "floor must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-    now = timezone.now()
-    today_end = now.replace(hour=23, minute=59, second=59)
-
-    # Current meeting: started and not ended, status confirmed or checked_in
-    current = (
-        Booking.objects.filter(
-            room=room,
-            start_time__lte=now,
-            end_time__gt=now,
-            status__in=["confirmed", "checked_in"],
-        )
-        .select_related("organizer")
-        .first()
-    )
+    return Response({"success": True, "data": get_rooms_state(building, floor)})
 
-    # Upcoming meetings today (after now, excluding current)
-    upcoming_qs = (
-        Booking.objects.filter(
-            room=room,
-            start_time__gt=now,
-            start_time__lte=today_end,
-            status__in=["confirmed", "checked_in"],
-        )
-        .select_related("organizer")
-        .order_by("start_time")
-    )
-    upcoming_list = list(upcoming_qs[:10])
-    next_booking = upcoming_list[0] if upcoming_list else None
 
-    mobile_status = _derive_mobile_status(room, now, current, next_booking)
+# ---------------------------------------------------------------------------
+# GET /api/rooms/<room_id>/state/stream  (mobile panel, Server-Sent Events)
+# ---------------------------------------------------------------------------
 
-    room_info = {
-        "id": str(room.id),
-        "name": room.name,
-        "building": room.building,
-        "floor": room.floor,
-        "capacity": room.capacity,
-    }
+# Seconds of silence after which a comment line is sent to keep proxies and
+# the client from dropping the connection
+STREAM_HEARTBEAT_SECONDS = 20
 
-    data = {
-        "room": room_info,
-        "status": mobile_status,
-        "currentMeeting": _meeting_to_mobile(current) if current else None,
-        "nextMeeting": _meeting_to_mobile(next_booking) if next_booking else None,
-        "upcomingMeetings": [_meeting_to_mobile(b) for b in upcoming_list],
-        "lastUpdated": now.isoformat(),
-    }
 
-    return Response({"success": True, "data": data})
+def _sse_event(event, payload, event_id=None):
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+async def _room_state_events(read, snapshot):
+    """
+    Yield the room's state, then a new ``state`` frame whenever its snapshot
+    version changes, or a heartbeat after STREAM_HEARTBEAT_SECONDS without
+    one.
+    """
+    async with get_broker().subscribe(snapshot["data"]["room"]["id"]) as subscription:
+        yield _sse_event("state", {"success": True, "data": snapshot["data"]}, snapshot["version"])
+        while True:
+            latest = await _watch(subscription, read, snapshot, STREAM_HEARTBEAT_SECONDS)
+            if latest is UNPAIRED:
+                yield _sse_event("state", {"success": True, "unpaired": True})
+                return
+            if latest is None:
+                yield _sse_event("error", {"success": False, "message": "Room not found"})
+                return
+            if latest["version"] != snapshot["version"]:
+                yield _sse_event("state", {"success": True, "data": latest["data"]}, latest["version"])
+            else:
+                yield ": heartbeat\n\n"
+            snapshot = latest
+
+
+@require_GET
+async def room_state_stream(request, room_id):
+    """
+    Push the room state to the tablet as Server-Sent Events.
+
+    Sends a ``state`` event with the same payload as GET /state straight
+    away, then again only when the state changes; a comment line is sent
+    every STREAM_HEARTBEAT_SECONDS otherwise. Each state event's id is its
+    version. EventSource can't set headers, so the device serial may also be
+    passed as ``?device_serial=``; once that device is unpaired the stream
+    sends ``{ success: true, unpaired: true }`` and ends.
+
+    Async: an open stream holds no worker thread or database connection
+    between events. Needs config.asgi: under WSGI a stream would hold a
+    worker for as long as it is open, so it answers 501 and the tablet
+    falls back to polling GET /state.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"success": False, "message": "Streaming needs the ASGI server; poll the room state instead"},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+    device_serial = request.GET.get("device_serial") or request.META.get("HTTP_X_DEVICE_SERIAL")
+    read = partial(_read_released, partial(_read_room, room_id, device_serial))
+    snapshot = await sync_to_async(read)()
+    if not isinstance(snapshot, dict):
+        return _room_state_response(snapshot, JsonResponse)
+
+    response = StreamingHttpResponse(
+        _room_state_events(read, snapshot),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: pass events through unbuffered
+    return response
 
 
 # ---------------------------------------------------------------------------
@@ -273,20 +408,12 @@ def generate_pairing_code(request):
 # GET /api/panel/pairing-status/<code>  (tablet polls this)
 # ---------------------------------------------------------------------------
 
-@api_view(["GET"])
-@permission_classes([AllowAny])
-def pairing_status(request, code):
-    """
-    Tablet polls this every ~3 seconds to learn when it has been paired.
-    Returns status + roomId/roomName once an admin has paired it.
-    """
+def _read_pairing(code):
+    """The pairing code's status as a snapshot, or None if it doesn't exist."""
     try:
         pairing = PairingCode.objects.select_related("room").get(code=code)
     except PairingCode.DoesNotExist:
-        return Response(
-            {"success": False, "message": "Pairing code not found"},
-            status=status.HTTP_404_NOT_FOUND,
-        )
+        return None
 
     # Auto-expire if past the deadline
     if pairing.status == "pending" and pairing.is_expired:
@@ -298,8 +425,45 @@ def pairing_status(request, code):
         "roomId": str(pairing.room.id) if pairing.room else None,
         "roomName": pairing.room.name if pairing.room else None,
     }
+    return {
+        "data": data,
+        "version": state_version(data),
+        # A pending code changes by itself when it expires
+        "expires": pairing.expires_at if pairing.status == "pending" else None,
+    }
 
-    return Response({"success": True, "data": data})
+
+def _pairing_status_response(snapshot, response_class=Response):
+    if snapshot is None:
+        return response_class(
+            {"success": False, "message": "Pairing code not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return response_class({"success": True, "data": snapshot["data"], "version": snapshot["version"]})
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def _pairing_status(request, code):
+    return _pairing_status_response(_read_pairing(code))
+
+
+@_long_poll(_pairing_status)
+async def pairing_status(request, code):
+    """
+    Tablet polls this every ~3 seconds to learn when it has been paired.
+    Returns status + roomId/roomName once an admin has paired it, plus the
+    status ``version``.
+
+    Long-poll: with ``?version=<last seen version>`` the request is held
+    until the code is paired or expires, or LONG_POLL_SECONDS pass.
+    """
+    read = partial(_read_released, partial(_read_pairing, code))
+    async with get_broker().subscribe(pairing_channel(code)) as subscription:
+        snapshot = await sync_to_async(read)()
+        if snapshot is not None and snapshot["version"] == request.GET["version"]:
+            snapshot = await _watch(subscription, read, snapshot, LONG_POLL_SECONDS)
+    return _pairing_status_response(snapshot, JsonResponse)
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,241 @@
+"""
+Live room state, computed for any number of rooms in one pass.
+
+Every room-state reader is an adapter over RoomStateEngine:
+  - the panel poll, stream and long-poll (panel.state snapshots)
+  - the lobby batch endpoint
+  - rooms.views.room_state
+
+"Today" ends at midnight in the organisation timezone. A room's state is:
+  - offline   the room is under maintenance
+  - occupied  a confirmed / checked-in booking spans now
+  - upcoming  the next booking today starts within UPCOMING_THRESHOLD
+  - available otherwise
+
+The engine only reads. A confirmed booking still not checked in at its
+auto-release deadline is treated as released: it is left out of the state
+and flagged on ``RoomState.releasable``, so callers that own the release
+side effects (status change, email) know to run release_stale_bookings.
+"""
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from bookings.constants import BookingStatus
+
+# How long before its start the next booking makes the room "upcoming"
+UPCOMING_THRESHOLD = timedelta(minutes=15)
+
+# Upcoming meetings listed per room by default
+UPCOMING_LIMIT = 10
+
+ACTIVE_STATUSES = [BookingStatus.CONFIRMED.value, BookingStatus.CHECKED_IN.value]
+
+
+def meeting_to_mobile(booking):
+    """Convert a Booking ORM instance to the mobile Meeting shape."""
+    # Derive a display name for the organizer
+    organizer = booking.organizer
+    if organizer.email == "kiosk@circletime.io":
+        organizer_name = "Kiosk User"
+    else:
+        organizer_name = (
+            organizer.name
+            or organizer.email.split("@")[0].title()
+        )
+
+    return {
+        "id": str(booking.id),
+        "title": booking.title,
+        "organizer": organizer_name,
+        "organizerEmail": booking.organizer.email,
+        "startTime": booking.start_time.isoformat(),
+        "endTime": booking.end_time.isoformat(),
+        "attendeeCount": booking.attendee_count,
+        "checkedIn": booking.checked_in,
+        "checkedInAt": booking.checked_in_at.isoformat() if booking.checked_in_at else None,
+    }
+
+
+def _compact_meeting(booking):
+    if booking is None:
+        return None
+    return {
+        "id": str(booking.id),
+        "title": booking.title,
+        "startTime": booking.start_time.isoformat(),
+        "endTime": booking.end_time.isoformat(),
+        "checkedIn": booking.checked_in,
+    }
+
+
+class RoomState:
+    """
+    One room's state at ``now``.
+
+    Attributes:
+        room: The Room
+        current: Booking spanning now, or None
+        upcoming: Later bookings starting today, in start order
+        releasable: Booking past its auto-release deadline and left out of
+            ``current``, or None
+        next_transition_at: Earliest time after ``now`` at which the state
+            changes without any write (``now`` if none), for caching
+    """
+
+    def __init__(self, room, now, current, upcoming, releasable, next_transition_at):
+        self.room = room
+        self.now = now
+        self.current = current
+        self.upcoming = upcoming
+        self.releasable = releasable
+        self.next_transition_at = next_transition_at
+
+    @property
+    def next_booking(self):
+        return self.upcoming[0] if self.upcoming else None
+
+    @property
+    def status(self):
+        """Mobile status enum: available | occupied | upcoming | offline"""
+        if self.room.status == "maintenance":
+            return "offline"
+        if self.current:
+            return "occupied"
+        if self.next_booking and self.next_booking.start_time - self.now <= UPCOMING_THRESHOLD:
+            return "upcoming"
+        return "available"
+
+    def _room_info(self):
+        return {
+            "id": str(self.room.id),
+            "name": self.room.name,
+            "building": self.room.building,
+            "floor": self.room.floor,
+            "capacity": self.room.capacity,
+        }
+
+    def as_dict(self):
+        """The RoomState contract of the panel API."""
+        return {
+            "room": self._room_info(),
+            "status": self.status,
+            "currentMeeting": meeting_to_mobile(self.current) if self.current else None,
+            "nextMeeting": meeting_to_mobile(self.next_booking) if self.next_booking else None,
+            "upcomingMeetings": [meeting_to_mobile(b) for b in self.upcoming],
+            "lastUpdated": self.now.isoformat(),
+        }
+
+    def as_compact(self):
+        """One entry of the lobby batch: room, status, current / next meeting."""
+        return {
+            **self._room_info(),
+            "status": self.status,
+            "currentMeeting": _compact_meeting(self.current),
+            "nextMeeting": _compact_meeting(self.next_booking),
+        }
+
+
+class RoomStateEngine:
+    """
+    Computes RoomStates for many rooms from one bookings query.
+
+    Example:
+        >>> engine = RoomStateEngine()
+        >>> states = engine.compute(Room.objects.filter(floor=2))
+        >>> states[room.id].status, states[room.id].next_transition_at
+        ('upcoming', datetime(...))
+
+    Three queries whatever the number of rooms: organisation settings, the
+    materialise_due check for these rooms (so today's series occurrences are
+    rows), and the bookings. A window function keeps each room's first
+    ``upcoming_limit + 1`` live bookings (the current one and those after
+    it), so the rows fetched stay bounded however busy a room is.
+
+    Args:
+        now: Aware datetime to compute at (default: timezone.now())
+        upcoming_limit: Upcoming bookings kept per room
+    """
+
+    def __init__(self, now=None, upcoming_limit=UPCOMING_LIMIT):
+        self.now = now or timezone.now()
+        self.upcoming_limit = upcoming_limit
+
+    def day_end(self, tz):
+        """Midnight at the end of today in ``tz``."""
+        today = self.now.astimezone(tz).date()
+        return datetime.combine(today + timedelta(days=1), time.min, tzinfo=tz)
+
+    def compute(self, rooms):
+        """
+        Returns:
+            dict room id → RoomState, for every room in ``rooms``
+        """
+        from django.db.models import F, Window
+        from django.db.models.functions import RowNumber
+        from bookings.models import Booking
+        from bookings.recurrence import materialise_due
+        from organisation.models import OrganisationSettings
+
+        rooms = list(rooms)
+        if not rooms:
+            return {}
+        now = self.now
+        org = OrganisationSettings.get()
+        release_window = timedelta(minutes=org.auto_release_minutes)
+        day_end = self.day_end(org.get_tzinfo())
+
+        # Today's series occurrences of these rooms are read from rows below
+        materialise_due(now=now, rooms=rooms)
+        live = (
+            Booking.objects.filter(
+                room__in=[room.id for room in rooms],
+                end_time__gt=now,
+                start_time__lt=day_end,
+                status__in=ACTIVE_STATUSES,
+            )
+            .select_related("organizer")
+            .annotate(
+                position=Window(
+                    RowNumber(),
+                    partition_by=F("room_id"),
+                    order_by=[F("start_time").asc(), F("id").asc()],
+                ),
+            )
+            .filter(position__lte=self.upcoming_limit + 1)
+        )
+        by_room = {}
+        for booking in live:
+            by_room.setdefault(booking.room_id, []).append(booking)
+
+        states = {}
+        for room in rooms:
+            bookings = sorted(by_room.get(room.id, []), key=lambda b: (b.start_time, b.id))
+            current = bookings[0] if bookings and bookings[0].start_time <= now else None
+            upcoming = bookings[1:] if current else bookings
+            releasable = None
+            if (
+                current is not None
+                and current.status == BookingStatus.CONFIRMED.value
+                and not current.checked_in
+                and current.start_time + release_window <= now
+            ):
+                releasable, current = current, None
+            upcoming = upcoming[:self.upcoming_limit]
+            states[room.id] = RoomState(
+                room, now, current, upcoming, releasable,
+                self._next_transition(day_end, current, upcoming, release_window),
+            )
+        return states
+
+    def _next_transition(self, day_end, current, upcoming, release_window):
+        # The current booking ending or reaching its auto-release deadline,
+        # the next one starting or coming within UPCOMING_THRESHOLD, midnight
+        boundaries = [day_end]
+        if current:
+            boundaries.append(current.end_time)
+            if current.status == BookingStatus.CONFIRMED.value and not current.checked_in:
+                boundaries.append(current.start_time + release_window)
+        if upcoming:
+            boundaries += [upcoming[0].start_time, upcoming[0].start_time - UPCOMING_THRESHOLD]
+        return min((b for b in boundaries if b > self.now), default=self.now)
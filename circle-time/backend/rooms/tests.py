@@ -0,0 +1,182 @@
+from datetime import datetime, timedelta
+from unittest import skipUnless
+from zoneinfo import ZoneInfo
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from bookings.models import Booking, BookingSeries
+from bookings.recurrence import first_occurrence
+from organisation.models import OrganisationSettings
+from rooms.models import Room
+from rooms.state import UPCOMING_THRESHOLD, RoomStateEngine
+
+JOHANNESBURG = ZoneInfo("Africa/Johannesburg")
+
+
+class RoomStateEngineTests(TestCase):
+    def setUp(self):
+        self.org = OrganisationSettings.get()  # Africa/Johannesburg, 15 min auto-release
+        self.user = User.objects.create_user(email="user@example.com", password="x")
+        self.room = Room.objects.create(name="Boardroom", building="HQ", floor=1, capacity=6)
+        self.now = datetime(2026, 10, 14, 10, 0, tzinfo=JOHANNESBURG)
+        self.midnight = datetime(2026, 10, 15, 0, 0, tzinfo=JOHANNESBURG)
+
+    def book(self, start, minutes=30, room=None, **fields):
+        start = self.now + start
+        return Booking.objects.create(
+            room=room or self.room, title="Sync", organizer=self.user,
+            start_time=start, end_time=start + timedelta(minutes=minutes), **fields,
+        )
+
+    def state(self, now=None, room=None):
+        room = room or self.room
+        return RoomStateEngine(now or self.now).compute([room])[room.id]
+
+    def test_empty_room_is_available_until_midnight(self):
+        state = self.state()
+        self.assertEqual(state.status, "available")
+        self.assertIsNone(state.current)
+        self.assertEqual(state.next_transition_at, self.midnight)
+
+    def test_midnight_is_in_the_organisation_timezone(self):
+        # 23:30 UTC is already the next day in Johannesburg (UTC+2)
+        now = datetime(2026, 10, 14, 23, 30, tzinfo=ZoneInfo("UTC"))
+        self.assertEqual(
+            self.state(now=now).next_transition_at,
+            datetime(2026, 10, 16, 0, 0, tzinfo=JOHANNESBURG),
+        )
+
+    def test_maintenance_room_is_offline(self):
+        self.room.status = "maintenance"
+        self.room.save()
+        self.book(timedelta(minutes=-5), status="checked_in", checked_in=True)
+        self.assertEqual(self.state().status, "offline")
+
+    def test_checked_in_booking_occupies_until_it_ends(self):
+        booking = self.book(timedelta(minutes=-20), status="checked_in", checked_in=True)
+        state = self.state()
+        self.assertEqual(state.status, "occupied")
+        self.assertEqual(state.current, booking)
+        self.assertEqual(state.next_transition_at, booking.end_time)
+
+    def test_unchecked_booking_transitions_at_its_release_deadline(self):
+        booking = self.book(timedelta(minutes=-5))
+        state = self.state()
+        self.assertEqual(state.status, "occupied")
+        self.assertIsNone(state.releasable)
+        self.assertEqual(state.next_transition_at, booking.start_time + timedelta(minutes=15))
+
+    def test_no_show_past_its_deadline_is_releasable(self):
+        no_show = self.book(timedelta(minutes=-15))
+        state = self.state()
+        self.assertEqual(state.status, "available")
+        self.assertIsNone(state.current)
+        self.assertEqual(state.releasable, no_show)
+        self.assertEqual(state.next_transition_at, self.midnight)
+
+    def test_next_booking_within_the_threshold_is_upcoming(self):
+        booking = self.book(UPCOMING_THRESHOLD)
+        state = self.state()
+        self.assertEqual(state.status, "upcoming")
+        self.assertEqual(state.next_booking, booking)
+        self.assertEqual(state.next_transition_at, booking.start_time)
+
+    def test_later_booking_transitions_when_it_comes_within_the_threshold(self):
+        booking = self.book(timedelta(hours=1))
+        state = self.state()
+        self.assertEqual(state.status, "available")
+        self.assertEqual(state.next_transition_at, booking.start_time - UPCOMING_THRESHOLD)
+
+        later = self.state(now=state.next_transition_at)
+        self.assertEqual(later.status, "upcoming")
+        self.assertEqual(later.next_transition_at, booking.start_time)
+
+    def test_next_transition_is_the_earliest_boundary(self):
+        current = self.book(timedelta(minutes=-20), minutes=40, status="checked_in", checked_in=True)
+        following = self.book(timedelta(minutes=25))
+        state = self.state()
+        self.assertEqual(state.upcoming, [following])
+        # following comes within the threshold at 10:10, before current ends at 10:20
+        self.assertEqual(state.next_transition_at, following.start_time - UPCOMING_THRESHOLD)
+        self.assertLess(state.next_transition_at, current.end_time)
+
+    def test_only_live_bookings_today_count(self):
+        self.book(timedelta(minutes=-5), status="cancelled")
+        self.book(timedelta(minutes=-90))  # already ended
+        self.book(timedelta(hours=15))  # tomorrow
+        state = self.state()
+        self.assertEqual(state.status, "available")
+        self.assertEqual(state.upcoming, [])
+
+    def test_upcoming_limit(self):
+        bookings = [self.book(timedelta(hours=hour)) for hour in range(1, 5)]
+        engine = RoomStateEngine(self.now, upcoming_limit=2)
+        self.assertEqual(engine.compute([self.room])[self.room.id].upcoming, bookings[:2])
+
+    def test_query_count_is_independent_of_room_count(self):
+        rooms = [self.room] + [
+            Room.objects.create(name=f"Room {i}", building="HQ", floor=2, capacity=4) for i in range(9)
+        ]
+        for room in rooms:
+            self.book(timedelta(minutes=-5), room=room)
+            self.book(timedelta(hours=2), room=room)
+
+        # Organisation settings, the materialise_due check, the bookings
+        with self.assertNumQueries(3):
+            few = RoomStateEngine(self.now).compute(rooms[:1])
+        with self.assertNumQueries(3):
+            many = RoomStateEngine(self.now).compute(rooms)
+        self.assertEqual(len(few), 1)
+        self.assertEqual({state.status for state in many.values()}, {"occupied"})
+
+
+class BookAdhocTests(TestCase):
+    def setUp(self):
+        OrganisationSettings.get()
+        self.user = User.objects.create_user(email="user@example.com", password="x")
+        self.room = Room.objects.create(name="Boardroom", building="HQ", floor=1, capacity=6)
+        self.client = APIClient()
+        self.url = f"/api/rooms/{self.room.id}/book-adhoc"
+
+    def test_books_the_room_from_now(self):
+        response = self.client.post(self.url, {"durationMinutes": 30}, format="json")
+        self.assertEqual(response.status_code, 201)
+        data = response.json()["data"]
+        self.assertEqual(data["organizerEmail"], "kiosk@circletime.io")
+        booking = Booking.objects.get(id=data["id"])
+        self.assertEqual(booking.room, self.room)
+        self.assertEqual(booking.end_time - booking.start_time, timedelta(minutes=30))
+
+    def test_invalid_duration(self):
+        response = self.client.post(self.url, {"durationMinutes": 45}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    @skipUnless(connection.vendor == "postgresql", "booking_no_overlap is a PostgreSQL exclusion constraint")
+    def test_overlapping_booking_is_a_conflict(self):
+        now = timezone.now()
+        Booking.objects.create(
+            room=self.room, title="Sync", organizer=self.user,
+            start_time=now - timedelta(minutes=10), end_time=now + timedelta(minutes=20),
+        )
+        response = self.client.post(self.url, {"durationMinutes": 30}, format="json")
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(response.json()["success"])
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_virtual_series_occurrence_is_a_conflict(self):
+        local = timezone.now().astimezone(JOHANNESBURG)
+        series = BookingSeries(
+            room=self.room, organizer=self.user, title="Standup",
+            start_date=local.date(), start_time=local.time().replace(minute=0, second=0, microsecond=0),
+            duration=timedelta(hours=1), timezone="Africa/Johannesburg", recurrence_type="daily",
+        )
+        series.materialised_through = first_occurrence(series)[0]
+        series.save()
+
+        response = self.client.post(self.url, {"durationMinutes": 30}, format="json")
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Booking.objects.filter(title="Ad-hoc Booking").exists())
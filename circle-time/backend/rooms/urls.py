@@ -6,6 +6,7 @@ from rooms.views import (
     update_room,
     delete_room,
     room_availability,
+    search_availability,
     book_adhoc,
     list_buildings,
     get_floor_plan,
@@ -14,6 +15,7 @@ from rooms.views import (
 urlpatterns = [
     path("rooms", list_rooms, name="rooms-list"),
     path("rooms/new", create_room, name="rooms-create"),
+    path("rooms/search-availability", search_availability, name="rooms-search-availability"),
     path("rooms/<uuid:room_id>", get_room, name="rooms-detail"),
     path("rooms/<uuid:room_id>/edit", update_room, name="rooms-update"),
     path("rooms/<uuid:room_id>/delete", delete_room, name="rooms-delete"),
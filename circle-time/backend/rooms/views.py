@@ -18,21 +18,8 @@ def _param(request, *names):
     return None
 
 
-@api_view(["GET"])
-@permission_classes([IsAuthenticated])
-def list_rooms(request):
-    """
-    GET /api/rooms
-    List rooms with optional camelCase filters:
-      searchQuery, building, floor, minCapacity, amenities (comma-separated), status
-    """
-    queryset = Room.objects.all()
-
-    # Free-text search (camelCase canonical: searchQuery)
-    search = _param(request, "searchQuery", "search")
-    if search:
-        queryset = queryset.filter(Q(name__icontains=search) | Q(building__icontains=search))
-
+def _filter_rooms(request, queryset):
+    """Apply the building / floor / minCapacity / amenities query filters."""
     # Building filter
     building = _param(request, "building")
     if building:
@@ -61,6 +48,26 @@ def list_rooms(request):
         for amenity in amenity_list:
             queryset = queryset.filter(amenities__contains=[amenity])
 
+    return queryset
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def list_rooms(request):
+    """
+    GET /api/rooms
+    List rooms with optional camelCase filters:
+      searchQuery, building, floor, minCapacity, amenities (comma-separated), status
+    """
+    queryset = Room.objects.all()
+
+    # Free-text search (camelCase canonical: searchQuery)
+    search = _param(request, "searchQuery", "search")
+    if search:
+        queryset = queryset.filter(Q(name__icontains=search) | Q(building__icontains=search))
+
+    queryset = _filter_rooms(request, queryset)
+
     # Status filter
     status_filter = _param(request, "status")
     if status_filter:
@@ -311,10 +318,17 @@ def room_availability(request, room_id):
     """
     GET /api/rooms/<room_id>/availability?date=YYYY-MM-DD
     Return time slots with availability for the given date.
+
+    Optional query params:
+      slotMinutes  Slot length in minutes (default 30, 5–240)
+      from, to     HH:MM bounds (default: organisation business hours)
+
+    Bookings overlapping the window — including ones that started the
+    previous evening — are fetched in one query; slots are checked in memory.
     """
-    from bookings.models import Booking
-    from datetime import datetime, time
-    import pytz
+    from bookings.intervals import IntervalIndex
+    from datetime import datetime, time, timedelta
+    from organisation.models import OrganisationSettings
 
     date_str = request.query_params.get("date")
     if not date_str:
@@ -339,33 +353,51 @@ def room_availability(request, room_id):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    # Business hours: 07:00-19:00 in 30-min slots
-    from django.conf import settings as s
-    tz = pytz.timezone(s.TIME_ZONE)
+    try:
+        slot_minutes = int(request.query_params.get("slotMinutes", 30))
+    except ValueError:
+        slot_minutes = 0
+    if not 5 <= slot_minutes <= 240:
+        return Response(
+            {"success": False, "message": "slotMinutes must be an integer between 5 and 240."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
 
-    bookings = Booking.objects.filter(
-        room_id=room_id,
-        start_time__date=target_date,
-        status__in=["confirmed", "checked_in"],
-    )
+    # Window defaults to the organisation's business hours, in its timezone
+    org = OrganisationSettings.get()
+    tz = org.get_tzinfo()
+    business_start, business_end = org.get_business_hours()
+    try:
+        window_from = time.fromisoformat(request.query_params.get("from") or business_start.isoformat())
+        window_to = time.fromisoformat(request.query_params.get("to") or business_end.isoformat())
+    except ValueError:
+        return Response(
+            {"success": False, "message": "from and to must be HH:MM."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if window_from >= window_to:
+        return Response(
+            {"success": False, "message": "from must be before to."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    day_start = datetime.combine(target_date, window_from, tzinfo=tz)
+    day_end = datetime.combine(target_date, window_to, tzinfo=tz)
+    index = IntervalIndex(day_start, day_end, room_ids=[room_id])
 
+    # The last slot is cut short at ``to`` when the window isn't a whole
+    # number of slots
+    step = timedelta(minutes=slot_minutes)
     slots = []
-    for hour in range(7, 19):
-        for minute in (0, 30):
-            slot_start = datetime.combine(target_date, time(hour, minute), tzinfo=tz)
-            slot_end = datetime.combine(
-                target_date,
-                time(hour + (1 if minute == 30 else 0), 0 if minute == 30 else 30),
-                tzinfo=tz,
-            )
-            is_available = not bookings.filter(
-                start_time__lt=slot_end, end_time__gt=slot_start
-            ).exists()
-            slots.append({
-                "startTime": slot_start.isoformat(),
-                "endTime": slot_end.isoformat(),
-                "isAvailable": is_available,
-            })
+    slot_start = day_start
+    while slot_start < day_end:
+        slot_end = min(slot_start + step, day_end)
+        slots.append({
+            "startTime": slot_start.isoformat(),
+            "endTime": slot_end.isoformat(),
+            "isAvailable": not index.conflicts(room_id, slot_start, slot_end),
+        })
+        slot_start = slot_end
 
     return Response(
         {"success": True, "data": slots},
@@ -373,6 +405,123 @@ def room_availability(request, room_id):
     )
 
 
+# ---------------------------------------------------------------------------
+# GET /api/rooms/search-availability
+# ---------------------------------------------------------------------------
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def search_availability(request):
+    """
+    GET /api/rooms/search-availability?date=YYYY-MM-DD&durationMinutes=60
+    Find rooms free for ``durationMinutes`` on ``date``.
+
+    Optional query params:
+      minCapacity, amenities (comma-separated), building, floor
+                   Same room filters as GET /api/rooms
+      from, to     HH:MM search window (default: organisation business hours)
+      limit        Maximum candidates returned (default 20, max 100)
+
+    Rooms are filtered in SQL, their bookings for the window loaded in one
+    query, and each room's free gaps found with a sweep. Every gap long
+    enough yields one candidate starting at the gap's start. Candidates are
+    ranked best fit first: smallest sufficient capacity, then earliest start,
+    then room name.
+
+    Returns:
+        [{ room, startTime, endTime, gapStart, gapEnd }, ...]
+    """
+    from bookings.intervals import IntervalIndex
+    from datetime import datetime, time, timedelta
+    from organisation.models import OrganisationSettings
+
+    date_str = request.query_params.get("date")
+    if not date_str:
+        return Response(
+            {"success": False, "message": "date query parameter is required"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        return Response(
+            {"success": False, "message": "Invalid date format. Use YYYY-MM-DD."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        duration_minutes = int(request.query_params.get("durationMinutes", ""))
+    except ValueError:
+        duration_minutes = 0
+    if not 5 <= duration_minutes <= 24 * 60:
+        return Response(
+            {"success": False, "message": "durationMinutes is required and must be between 5 and 1440."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+    except ValueError:
+        limit = 20
+
+    org = OrganisationSettings.get()
+    tz = org.get_tzinfo()
+    business_start, business_end = org.get_business_hours()
+    try:
+        window_from = time.fromisoformat(request.query_params.get("from") or business_start.isoformat())
+        window_to = time.fromisoformat(request.query_params.get("to") or business_end.isoformat())
+    except ValueError:
+        return Response(
+            {"success": False, "message": "from and to must be HH:MM."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if window_from >= window_to:
+        return Response(
+            {"success": False, "message": "from must be before to."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    window_start = datetime.combine(target_date, window_from, tzinfo=tz)
+    window_end = datetime.combine(target_date, window_to, tzinfo=tz)
+    # Nothing can be booked in the past: start today's search from now
+    now = timezone.now().replace(second=0, microsecond=0) + timedelta(minutes=1)
+    window_start = max(window_start, now)
+    if window_start >= window_end:
+        return Response({"success": True, "data": []}, status=status.HTTP_200_OK)
+
+    rooms = list(_filter_rooms(request, Room.objects.exclude(status="maintenance")))
+    if not rooms:
+        return Response({"success": True, "data": []}, status=status.HTTP_200_OK)
+
+    duration = timedelta(minutes=duration_minutes)
+    index = IntervalIndex(window_start, window_end, room_ids=[room.id for room in rooms])
+    candidates = []
+    for room in rooms:
+        for gap_start, gap_end in index.free_gaps(room.id, (window_start, window_end), duration):
+            candidates.append((room, gap_start, gap_end))
+    candidates.sort(key=lambda c: (c[0].capacity, c[1], c[0].name))
+
+    room_data = {}
+    result = []
+    for room, gap_start, gap_end in candidates[:limit]:
+        if room.id not in room_data:
+            room_data[room.id] = RoomSerializer(room).data
+        # Gap edges taken from bookings come back in UTC
+        gap_start, gap_end = gap_start.astimezone(tz), gap_end.astimezone(tz)
+        result.append({
+            "room": room_data[room.id],
+            "startTime": gap_start.isoformat(),
+            "endTime": (gap_start + duration).isoformat(),
+            "gapStart": gap_start.isoformat(),
+            "gapEnd": gap_end.isoformat(),
+        })
+
+    return Response(
+        {"success": True, "data": result},
+        status=status.HTTP_200_OK,
+    )
+
+
 # ---------------------------------------------------------------------------
 # GET /api/rooms/<room_id>/state  (kiosk — no auth required)
 # ---------------------------------------------------------------------------
@@ -385,8 +534,7 @@ def room_state(request, room_id):
     Return the live state of a room for the tablet kiosk app.
     No authentication required.
     """
-    from bookings.models import Booking
-    from datetime import timedelta
+    from rooms.state import RoomStateEngine
 
     try:
         room = Room.objects.get(id=room_id)
@@ -396,100 +544,8 @@ def room_state(request, room_id):
             status=status.HTTP_404_NOT_FOUND,
         )
 
-    now = timezone.now()
-    today = now.date()
-
-    # Room offline when under maintenance
-    if room.status == "maintenance":
-        return Response({
-            "success": True,
-            "data": {
-                "room": {
-                    "id": str(room.id),
-                    "name": room.name,
-                    "building": room.building,
-                    "floor": room.floor,
-                    "capacity": room.capacity,
-                },
-                "status": "offline",
-                "currentMeeting": None,
-                "nextMeeting": None,
-                "upcomingMeetings": [],
-                "lastUpdated": now.isoformat(),
-            },
-        })
-
-    # Active booking: overlaps now
-    active_booking = (
-        Booking.objects
-        .filter(
-            room=room,
-            start_time__lte=now,
-            end_time__gte=now,
-            status__in=["confirmed", "checked_in"],
-        )
-        .select_related("organizer")
-        .first()
-    )
-
-    # All remaining bookings for today after now, ordered by start
-    upcoming_qs = (
-        Booking.objects
-        .filter(
-            room=room,
-            start_time__date=today,
-            start_time__gt=now,
-            status__in=["confirmed", "checked_in"],
-        )
-        .select_related("organizer")
-        .order_by("start_time")
-    )
-
-    # Determine status
-    if active_booking is not None:
-        room_status = "occupied"
-    elif upcoming_qs.filter(start_time__lte=now + timedelta(minutes=30)).exists():
-        room_status = "upcoming"
-    else:
-        room_status = "available"
-
-    def _meeting_shape(booking):
-        if booking is None:
-            return None
-        organizer = booking.organizer
-        attendee_count = booking.attendee_count
-        return {
-            "id": str(booking.id),
-            "title": booking.title,
-            "organizer": (organizer.name or organizer.email) if organizer else "",
-            "organizerEmail": organizer.email if organizer else "",
-            "startTime": booking.start_time.isoformat(),
-            "endTime": booking.end_time.isoformat(),
-            "attendeeCount": attendee_count,
-            "checkedIn": booking.checked_in,
-            "checkedInAt": booking.checked_in_at.isoformat() if booking.checked_in_at else None,
-        }
-
-    upcoming_list = list(upcoming_qs)
-    next_meeting = upcoming_list[0] if upcoming_list else None
-
-    return Response({
-        "success": True,
-        "data": {
-            "room": {
-                "id": str(room.id),
-                "name": room.name,
-                "building": room.building,
-                "floor": room.floor,
-                "capacity": room.capacity,
-            },
-            "status": room_status,
-            "currentMeeting": _meeting_shape(active_booking),
-            "nextMeeting": _meeting_shape(next_meeting),
-            "upcomingMeetings": [_meeting_shape(b) for b in upcoming_list],
-            "lastUpdated": now.isoformat(),
-        },
-    })
+    state = RoomStateEngine().compute([room])[room.id]
+    return Response({"success": True, "data": state.as_dict()})
 
 
 @api_view(["GET"])
@@ -542,8 +598,10 @@ def book_adhoc(request, room_id):
     """
     from datetime import timedelta
     from bookings.models import Booking
+    from django.db import IntegrityError, transaction
     from bookings.constants import BookingStatus
-    from bookings.utils import check_booking_conflicts
+    from bookings.recurrence import series_conflict
+    from bookings.utils import is_booking_overlap
     from accounts.models import User as AuthUser
 
     # Validate durationMinutes
@@ -586,13 +644,6 @@ def book_adhoc(request, room_id):
     start_time = timezone.now()
     end_time = start_time + timedelta(minutes=duration_minutes)
 
-    # Conflict check
-    if check_booking_conflicts(room_id, start_time, end_time):
-        return Response(
-            {"success": False, "message": "Room is already booked for the requested time slot."},
-            status=status.HTTP_409_CONFLICT,
-        )
-
     # Get or create the system kiosk user
     kiosk_user, _ = AuthUser.objects.get_or_create(
         email="kiosk@circletime.io",
@@ -601,17 +652,33 @@ def book_adhoc(request, room_id):
         },
     )
 
-    # Create booking
-    booking = Booking.objects.create(
-        room=room,
-        title="Ad-hoc Booking",
-        description="",
-        organizer=kiosk_user,
-        start_time=start_time,
-        end_time=end_time,
-        status=BookingStatus.CONFIRMED.value,
-        attendee_count=0,
-    )
+    # Create booking — the exclusion constraint is the conflict check, so two
+    # tablets (or a tablet and the web app) can't both take the slot
+    try:
+        with transaction.atomic():
+            # Virtual series occurrences aren't covered by the constraint
+            if series_conflict(room.id, start_time, end_time):
+                return Response(
+                    {"success": False, "message": "Room is already booked for the requested time slot."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            booking = Booking.objects.create(
+                room=room,
+                title="Ad-hoc Booking",
+                description="",
+                organizer=kiosk_user,
+                start_time=start_time,
+                end_time=end_time,
+                status=BookingStatus.CONFIRMED.value,
+                attendee_count=0,
+            )
+    except IntegrityError as e:
+        if not is_booking_overlap(e):
+            raise
+        return Response(
+            {"success": False, "message": "Room is already booked for the requested time slot."},
+            status=status.HTTP_409_CONFLICT,
+        )
 
     # Return in Meeting shape (matches mobile RoomState.Meeting interface)
     organizer_name = kiosk_user.name or kiosk_user.email